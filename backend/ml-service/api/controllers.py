@@ -1,24 +1,85 @@
+import atexit
 import json
 from datetime import datetime, timedelta
 import random
 from core.nlp_processor import NLPProcessor
 from core.recommendation_engine import RecommendationEngine
 from models.preference_model import PreferenceModel
+from models.preference_store import WriteBehindQueue, create_preference_store
 from models.activity_model import ActivityModel
+from models.neighbour_index import NeighbourIndex
+from models.cf_model import ImplicitALSModel
+from models.intent_classifier import HashedIntentClassifier
+from models.model_registry import ModelRegistry
+from core.warmup import Warmup
 from utils.data_processing import preprocess_user_data
-from utils.text_analysis import extract_entities, analyze_sentiment
+from utils.text_analysis import extract_entities
+from utils.profiler import RequestProfiler
+from utils.serialization import set_serializer
+from utils.single_flight import SingleFlight, SingleFlightTimeout, canonical_key
+from utils.deadline import Deadline
+from utils.job_queue import JobQueue
+from config import get_config
 import logging
 
 # Initialize logging
 logger = logging.getLogger(__name__)
 
+# Load configuration
+config = get_config()
+set_serializer(config.JSON_SERIALIZER)
+
 # Initialize core components
-nlp_processor = NLPProcessor()
-recommendation_engine = RecommendationEngine()
-preference_model = PreferenceModel()
-activity_model = ActivityModel()
+nlp_processor = NLPProcessor(
+    default_language=config.NLP_DEFAULT_LANGUAGE,
+    max_languages=config.NLP_MAX_LANGUAGES
+)
+recommendation_engine = RecommendationEngine(place_cell_km=config.PLACE_CELL_KM)
+preference_store = create_preference_store(config)
+preference_write_queue = None
+if preference_store is not None and config.PREFERENCE_WRITE_BEHIND:
+    preference_write_queue = WriteBehindQueue(
+        preference_store,
+        max_batch=config.PREFERENCE_FLUSH_BATCH_SIZE,
+        flush_interval=config.PREFERENCE_FLUSH_INTERVAL,
+        max_pending=config.PREFERENCE_MAX_PENDING_WRITES
+    )
+    # Drain buffered writes when the worker shuts down
+    atexit.register(preference_write_queue.close)
+preference_model = PreferenceModel(
+    store=preference_store, write_queue=preference_write_queue, similarity=config.SIMILARITY_MEASURE
+)
+activity_model = ActivityModel(diversity=config.ACTIVITY_DIVERSITY)
+request_profiler = RequestProfiler(
+    sample_rate=config.PROFILE_SAMPLE_RATE,
+    buffer_size=config.PROFILE_BUFFER_SIZE,
+    interval=config.PROFILE_INTERVAL_MS / 1000
+)
+neighbour_index = NeighbourIndex(
+    preference_model,
+    k=config.NEIGHBOUR_K,
+    block_size=config.NEIGHBOUR_BLOCK_SIZE,
+    workers=config.NEIGHBOUR_WORKERS
+)
+preference_model.neighbour_index = neighbour_index
+if config.NEIGHBOUR_REFRESH_SECONDS > 0:
+    neighbour_index.start(config.NEIGHBOUR_REFRESH_SECONDS)
+model_registry = ModelRegistry(config.MODEL_PATH)
+model_registry.register('cf', lambda path: ImplicitALSModel.load(path, mmap_mode='r'))
+model_registry.register('preferences', preference_model.load_snapshot)
+model_registry.register('activities', activity_model.load_catalog)
+model_registry.register('places', recommendation_engine.load_places)
+model_registry.register('intent', lambda path: HashedIntentClassifier.load(path, mmap_mode='r'))
+if config.MODEL_RELOAD_INTERVAL > 0:
+    model_registry.start_watching(config.MODEL_RELOAD_INTERVAL)
+recommendation_flight = SingleFlight(
+    timeout=config.SINGLE_FLIGHT_TIMEOUT,
+    lock_dir=config.SINGLE_FLIGHT_LOCK_DIR,
+    result_ttl=config.SINGLE_FLIGHT_RESULT_TTL
+)
+warmup = Warmup(retry_interval=config.WARMUP_RETRY_SECONDS)
 
-def get_recommendation(user_id, destination, start_date, end_date, preferences=None):
+def get_recommendation(user_id, destination, start_date, end_date, preferences=None, budget=None, deadline=None):
     """
     Generate travel recommendations based on user preferences and destination.
     
@@ -28,10 +89,60 @@ def get_recommendation(user_id, destination, start_date, end_date, preferences=N
         start_date: Trip start date
         end_date: Trip end date
         preferences: User preferences dict (optional)
+        budget: Dictionary with the trip's 'total' and optional 'daily' budget (optional)
+        deadline: Deadline of the request; stages fall back to cheaper answers near it (optional)
+        
+    Returns:
+        Dictionary with recommended itinerary, the degraded marker and per-stage timings
+    """
+    if deadline is None:
+        deadline = Deadline()
+    
+    # Identical concurrent requests share a single computation
+    key = canonical_key('recommendation', user_id, destination, start_date, end_date, preferences, budget)
+    computed = []
+    
+    def generate():
+        computed.append(True)
+        return _generate_recommendation(user_id, destination, start_date, end_date, preferences, budget, deadline)
+    
+    timeout = None if deadline.budget_ms is None else max(0.0, deadline.remaining_ms() / 1000.0)
+    try:
+        result = recommendation_flight.do(key, generate, timeout=timeout)
+    except SingleFlightTimeout:
+        # The shared computation outlived this request's budget; answer on our own, degraded
+        deadline.degrade('coalescing')
+        return _generate_recommendation(user_id, destination, start_date, end_date, preferences, budget, deadline)
+    
+    if result.get('degraded') and not computed:
+        # A degraded answer only fits the budget of the request that computed it
+        return _generate_recommendation(user_id, destination, start_date, end_date, preferences, budget, deadline)
+    
+    return result
+
+def _generate_recommendation(user_id, destination, start_date, end_date, preferences=None, budget=None, deadline=None):
+    """
+    Generate travel recommendations without request coalescing.
+    
+    Args:
+        user_id: User ID for personalization
+        destination: Travel destination
+        start_date: Trip start date
+        end_date: Trip end date
+        preferences: User preferences dict (optional)
+        budget: Dictionary with the trip's 'total' and optional 'daily' budget (optional)
+        deadline: Deadline of the request (optional)
         
     Returns:
-        Dictionary with recommended itinerary
+        Dictionary with recommended itinerary, the degraded marker and per-stage timings
+        
+    Raises:
+        ValueError: If the trip is shorter than a day or longer than PLAN_MAX_DAYS,
+            or the budget does not cover meals and transportation
     """
+    if deadline is None:
+        deadline = Deadline()
+    
     try:
         logger.info(f"Generating recommendations for user {user_id} to {destination}")
         
@@ -41,27 +152,63 @@ def get_recommendation(user_id, destination, start_date, end_date, preferences=N
         if isinstance(end_date, str):
             end_date = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
         
-        # Calculate trip duration in days
+        # Calculate trip duration in days; the itinerary and budget plan grow with it
         trip_duration = (end_date - start_date).days + 1
+        if trip_duration < 1 or trip_duration > config.PLAN_MAX_DAYS:
+            raise ValueError(f"Trip length must be between 1 and {config.PLAN_MAX_DAYS} days")
         
         # Preprocess user data
         user_data = preprocess_user_data(user_id, preferences)
         
-        # Get user preferences from model if available
-        user_preferences = preference_model.get_user_preferences(user_id)
-        if user_preferences and not preferences:
-            preferences = user_preferences
+        # Get user preferences from model if available; the lookup may reach the store, so skip it when short of time
+        if not preferences:
+            with deadline.stage('preferences'):
+                if deadline.nearly_spent():
+                    deadline.degrade('preferences')
+                else:
+                    preferences = preference_model.get_user_preferences(user_id) or preferences
         
-        # Get destination information and activities
-        destination_info = recommendation_engine.get_destination_info(destination)
+        # Resolve destination information once for the whole request
+        with deadline.stage('destination'):
+            cached_destination = recommendation_engine.resolve_destination(destination)
         
-        # Generate personalized itinerary
-        itinerary = recommendation_engine.generate_itinerary(
-            user_id, 
-            destination, 
-            trip_duration, 
-            preferences
-        )
+        # Pick activities that fit the budget instead of drawing random costs
+        budget_plan = None
+        if budget:
+            with deadline.stage('budget'):
+                activity_table = activity_model.activity_table
+                budget_plan = recommendation_engine.plan_within_budget(
+                    trip_duration,
+                    preferences,
+                    activity_table,
+                    activity_model.score_activities(preferences or {}, activity_table),
+                    budget['total'],
+                    budget.get('daily'),
+                    start_date=start_date
+                )
+        
+        with deadline.stage('itinerary'):
+            # Out of time: reuse a recent itinerary for the same trip if there is one
+            itinerary = None
+            if deadline.expired() and budget_plan is None:
+                itinerary = recommendation_engine.itinerary_template(
+                    cached_destination.info, trip_duration, preferences, start_date
+                )
+                if itinerary is not None:
+                    deadline.degrade('itinerary_template')
+            
+            # Generate personalized itinerary
+            if itinerary is None:
+                itinerary = recommendation_engine.generate_itinerary(
+                    user_id, 
+                    destination, 
+                    trip_duration, 
+                    preferences,
+                    destination_info=cached_destination.info,
+                    budget_plan=budget_plan,
+                    start_date=start_date,
+                    deadline=deadline
+                )
         
         # Add metadata
         result = {
@@ -70,22 +217,146 @@ def get_recommendation(user_id, destination, start_date, end_date, preferences=N
             'endDate': end_date.isoformat(),
             'duration': trip_duration,
             'itinerary': itinerary,
-            'destinationInfo': destination_info
+            'destinationInfo': cached_destination.fragment
         }
         
+        if budget_plan is not None:
+            result['budget'] = {
+                'total': budget['total'],
+                'daily': budget.get('daily'),
+                'estimatedCost': budget_plan['totalCost'],
+                'dailyCosts': budget_plan['dailyCosts'],
+                'score': budget_plan['score'],
+                'selectionScore': budget_plan['selectionScore']
+            }
+        
+        result.update(deadline.report())
+        
         return result
         
     except Exception as e:
         logger.error(f"Error generating recommendations: {str(e)}")
         raise
 
-def analyze_text(text, analysis_type='all'):
+def get_group_recommendation(user_ids, destination, start_date, end_date, strategy='average', budget=None,
+                             deadline=None):
+    """
+    Generate one itinerary for a group of travellers.
+    
+    Members' preferences are fetched in one batch and aggregated into a single
+    profile, so a group costs one recommendation instead of one per member.
+    
+    Args:
+        user_ids: List of member user IDs
+        destination: Travel destination
+        start_date: Trip start date
+        end_date: Trip end date
+        strategy: Aggregation strategy (average, least_misery or approval)
+        budget: Dictionary with the trip's 'total' and optional 'daily' budget (optional)
+        deadline: Deadline of the request (optional)
+        
+    Returns:
+        Dictionary with the recommended itinerary and the aggregated group profile
+        
+    Raises:
+        ValueError: If the strategy is unknown or the budget is too small
+    """
+    try:
+        logger.info(f"Generating group recommendations for {len(user_ids)} users to {destination}")
+        
+        if deadline is None:
+            deadline = Deadline()
+        
+        with deadline.stage('group_preferences'):
+            group = preference_model.aggregate_group_preferences(user_ids, strategy)
+        
+        # The group is keyed by its sorted members so identical groups share cached work
+        group_id = 'group:' + ','.join(sorted(map(str, group['members'] or user_ids)))
+        result = get_recommendation(group_id, destination, start_date, end_date, group['preferences'], budget, deadline)
+        
+        return {
+            **result,
+            'group': {
+                'strategy': strategy,
+                'members': group['members'],
+                'missing': group['missing'],
+                'preferences': group['preferences'],
+                'interestScores': group['interestScores']
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"Error generating group recommendations: {str(e)}")
+        raise
+
+def regenerate_itinerary(user_id, destination, itinerary, day, slot=None, preferences=None):
+    """
+    Regenerate one day or one activity slot of an existing itinerary.
+    
+    Args:
+        user_id: User ID for personalization
+        destination: Travel destination
+        itinerary: Existing itinerary (list of day entries)
+        day: Day number (1-based)
+        slot: Activity index within the day (default: regenerate the whole day)
+        preferences: User preferences dict (optional)
+        
+    Returns:
+        Dictionary with JSON Patch operations to apply to the itinerary
+        
+    Raises:
+        ValueError: If the day or slot cannot be regenerated
+    """
+    try:
+        logger.info(f"Regenerating day {day} slot {slot} for user {user_id} to {destination}")
+        
+        if not preferences:
+            preferences = preference_model.get_user_preferences(user_id)
+        
+        destination_info = recommendation_engine.resolve_destination(destination).info
+        
+        if slot is None:
+            patch = recommendation_engine.regenerate_day(itinerary, day, destination_info, preferences)
+        else:
+            patch = recommendation_engine.regenerate_slot(itinerary, day, slot, destination_info, preferences)
+        
+        return {
+            'day': day,
+            'slot': slot,
+            'patch': patch
+        }
+        
+    except Exception as e:
+        logger.error(f"Error regenerating itinerary: {str(e)}")
+        raise
+
+def get_destination(destination_id):
+    """
+    Get cached information about a destination.
+    
+    Args:
+        destination_id: Destination identifier (case-insensitive name)
+        
+    Returns:
+        CachedDestination with pre-serialized info and ETag
+    """
+    try:
+        logger.info(f"Getting destination {destination_id}")
+        
+        return recommendation_engine.resolve_destination(destination_id)
+        
+    except Exception as e:
+        logger.error(f"Error getting destination: {str(e)}")
+        raise
+
+def analyze_text(text, analysis_type='all', language=None):
     """
     Analyze text for sentiment, intent, and key entities.
     
     Args:
         text: Text to analyze
         analysis_type: Type of analysis (sentiment, entities, intent, or all)
+        language: Language code (detected if not given)
         
     Returns:
         Analysis results
@@ -93,54 +364,183 @@ def analyze_text(text, analysis_type='all'):
     try:
         logger.info(f"Analyzing text with analysis type: {analysis_type}")
         
-        result = {}
+        return _analyze_batch([text], analysis_type, language)[0]
         
-        if analysis_type in ['sentiment', 'all']:
-            result['sentiment'] = analyze_sentiment(text)
-            
-        if analysis_type in ['entities', 'all']:
+    except Exception as e:
+        logger.error(f"Error analyzing text: {str(e)}")
+        raise
+
+def analyze_texts(texts, analysis_type='all', language=None):
+    """
+    Analyze a batch of texts; intents are classified in a single pass.
+    
+    Args:
+        texts: List of texts to analyze
+        analysis_type: Type of analysis (sentiment, entities, intent, or all)
+        language: Language code for every text (detected per text if not given)
+        
+    Returns:
+        List of analysis results, in input order
+    """
+    try:
+        logger.info(f"Analyzing {len(texts)} texts with analysis type: {analysis_type}")
+        
+        return _analyze_batch(texts, analysis_type, language)
+        
+    except Exception as e:
+        logger.error(f"Error analyzing texts: {str(e)}")
+        raise
+
+def _analyze_batch(texts, analysis_type, language):
+    """Run the requested analyses over texts, detecting each text's language once."""
+    if language is not None:
+        # Fails fast on unsupported languages
+        nlp_processor.language_resources.get(language)
+        detected = [{'language': language, 'confidence': 1.0}] * len(texts)
+    else:
+        detected = [nlp_processor.detect_language(text) for text in texts]
+    languages = [entry['language'] for entry in detected]
+    
+    results = [{'language': entry} for entry in detected]
+    
+    if analysis_type in ['sentiment', 'all']:
+        for result, text, text_language in zip(results, texts, languages):
+            result['sentiment'] = nlp_processor.analyze_sentiment(text, text_language)
+    
+    if analysis_type in ['entities', 'all']:
+        for result, text in zip(results, texts):
             result['entities'] = extract_entities(text)
-            
-        if analysis_type in ['intent', 'all']:
-            result['intent'] = nlp_processor.extract_intent(text)
-            
-        return result
+    
+    if analysis_type in ['intent', 'all']:
+        for result, intent in zip(results, _classify_intents(texts, languages)):
+            result['intent'] = intent
+    
+    return results
+
+def _classify_intents(texts, languages):
+    """
+    Classify intents with the trained classifier, falling back to keyword matching.
+    
+    Args:
+        texts: List of texts
+        languages: Language code per text
+        
+    Returns:
+        List of intent results
+    """
+    classifier = model_registry.get_model('intent')
+    if classifier is None:
+        return [nlp_processor.extract_intent(text, language) for text, language in zip(texts, languages)]
+    
+    intents = classifier.classify(texts)
+    for intent, language in zip(intents, languages):
+        intent['language'] = language
+    return intents
+
+def plan_from_text(user_id, text, language=None, preferences=None, deadline=None):
+    """
+    Parse a free-text trip request and generate the itinerary in one call.
+    
+    Args:
+        user_id: User ID for personalization
+        text: Trip request, e.g. "5 days in Rome from 2024-06-01, we love food and museums"
+        language: Language code (detected if not given)
+        preferences: User preferences overriding stored ones (optional)
+        deadline: Deadline of the request, shared by parsing and the recommendation (optional)
+        
+    Returns:
+        Dictionary with the parsed request and the recommendation
+        
+    Raises:
+        ValueError: If no destination is found or the dates are invalid
+    """
+    try:
+        logger.info(f"Planning trip from text for user {user_id}")
+        
+        if deadline is None:
+            deadline = Deadline()
+        
+        with deadline.stage('nlp'):
+            parsed = nlp_processor.parse_trip_request(
+                text,
+                language=language,
+                destination_index=recommendation_engine.destination_index,
+                intent_classifier=model_registry.get_model('intent')
+            )
+        
+        # Fall back to an unknown place named after a location indicator ("in <place>")
+        destination = parsed['destination'] or (parsed['locations'][0] if parsed['locations'] else None)
+        if destination is None:
+            raise ValueError('No destination found in text')
+        
+        start_date = parsed['startDate'] or datetime.combine(datetime.now().date(), datetime.min.time())
+        if parsed['endDate'] is not None:
+            end_date = parsed['endDate']
+        else:
+            end_date = start_date + timedelta(days=(parsed['duration'] or config.PLAN_DEFAULT_DAYS) - 1)
+        
+        duration = (end_date - start_date).days + 1
+        if duration < 1 or duration > config.PLAN_MAX_DAYS:
+            raise ValueError(f"Trip length must be between 1 and {config.PLAN_MAX_DAYS} days")
+        
+        # Interests from the text refine stored (or supplied) preferences
+        trip_preferences = dict(preferences or preference_model.get_user_preferences(user_id) or {})
+        if parsed['interests']:
+            trip_preferences['interests'] = parsed['interests']
+        
+        recommendation = get_recommendation(
+            user_id,
+            destination,
+            start_date.isoformat(),
+            end_date.isoformat(),
+            trip_preferences,
+            deadline=deadline
+        )
+        
+        return {
+            'parsed': parsed,
+            'recommendation': recommendation
+        }
         
     except Exception as e:
-        logger.error(f"Error analyzing text: {str(e)}")
+        logger.error(f"Error planning trip from text: {str(e)}")
         raise
 
-def process_user_preferences(user_id, preferences):
+def process_user_preferences(user_id, preferences, deadline=None):
     """
     Process and store user preferences for better recommendations.
     
     Args:
         user_id: User ID
         preferences: User preferences dict
+        deadline: Deadline of the request; the similar-user scan is skipped near it (optional)
         
     Returns:
-        Processed preferences
+        Processed preferences; similarUserCount is None when the scan was skipped
     """
     try:
         logger.info(f"Processing preferences for user {user_id}")
         
-        # Save preferences to model
-        preference_model.update_preferences(user_id, preferences)
+        if deadline is None:
+            deadline = Deadline()
         
-        # Generate preference embeddings
-        embeddings = preference_model.generate_embeddings(preferences)
+        # Save preferences to model (this also refreshes the stored embedding)
+        with deadline.stage('store'):
+            preference_model.update_preferences(user_id, preferences)
         
         # Get similar users based on preferences
-        similar_users = preference_model.find_similar_users(user_id, embeddings)
+        similar_user_count = _count_similar_users(user_id, deadline)
         
         # Get recommended activities based on preferences
-        recommended_activities = activity_model.get_recommended_activities(preferences)
+        with deadline.stage('activities'):
+            recommended_activities = activity_model.get_recommended_activities(preferences)
         
         result = {
             'userId': user_id,
             'processedPreferences': preferences,
             'recommendedActivities': recommended_activities,
-            'similarUserCount': len(similar_users)
+            'similarUserCount': similar_user_count,
+            **deadline.report()
         }
         
         return result
@@ -149,6 +549,141 @@ def process_user_preferences(user_id, preferences):
         logger.error(f"Error processing preferences: {str(e)}")
         raise
 
+def patch_user_preferences(user_id, changes, deadline=None):
+    """
+    Apply a partial update to a user's stored preferences.
+    
+    Args:
+        user_id: User ID
+        changes: Dict with optional addInterests, removeInterests,
+            accommodationType and transportationPreference
+        deadline: Deadline of the request; the similar-user scan is skipped near it (optional)
+        
+    Returns:
+        Processed preferences; similarUserCount is None when the scan was skipped
+    """
+    try:
+        logger.info(f"Patching preferences for user {user_id}")
+        
+        if deadline is None:
+            deadline = Deadline()
+        
+        with deadline.stage('store'):
+            preferences = preference_model.patch_preferences(
+                user_id,
+                add_interests=changes.get('addInterests'),
+                remove_interests=changes.get('removeInterests'),
+                accommodation_type=changes.get('accommodationType'),
+                transportation_preference=changes.get('transportationPreference')
+            )
+        
+        result = {
+            'userId': user_id,
+            'processedPreferences': preferences,
+            'similarUserCount': _count_similar_users(user_id, deadline),
+            **deadline.report()
+        }
+        
+        return result
+        
+    except Exception as e:
+        logger.error(f"Error patching preferences: {str(e)}")
+        raise
+
+def _count_similar_users(user_id, deadline):
+    """Count a user's similar users, or return None when the deadline leaves no time for the scan."""
+    with deadline.stage('similar_users'):
+        if deadline.nearly_spent():
+            deadline.degrade('similar_users')
+            return None
+        return len(preference_model.get_similar_users(user_id))
+
+def get_activity_recommendations(user_id, limit=10, preferences=None):
+    """
+    Recommend activities from the collaborative-filtering model.
+    
+    Falls back to preference-based recommendations when no trained model is
+    loaded or the user has no interaction history.
+    
+    Args:
+        user_id: User ID
+        limit: Maximum number of activities to return
+        preferences: User preferences dict used for the fallback (optional)
+        
+    Returns:
+        Recommended activities and the source that produced them
+    """
+    try:
+        logger.info(f"Getting activity recommendations for user {user_id}")
+        
+        # Hold one model version for the whole request, even if a swap happens
+        cf_model = model_registry.get_model('cf')
+        scored = cf_model.recommend(user_id, limit) if cf_model is not None else None
+        if scored is not None:
+            return {
+                'userId': user_id,
+                'source': 'collaborative_filtering',
+                'activities': [
+                    {'activityId': activity_id, 'score': round(score, 4)}
+                    for activity_id, score in scored
+                ]
+            }
+        
+        preferences = preferences or preference_model.get_user_preferences(user_id) or {}
+        return {
+            'userId': user_id,
+            'source': 'preferences',
+            'activities': activity_model.get_recommended_activities(preferences, limit)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting activity recommendations: {str(e)}")
+        raise
+
+def find_nearby_activities(destination, lat, lon, radius_km=None, limit=10, category=None):
+    """
+    Find places of a destination near a point.
+    
+    Args:
+        destination: Destination name
+        lat: Latitude of the point
+        lon: Longitude of the point
+        radius_km: Search radius in kilometres (default: the nearest places)
+        limit: Maximum number of places to return
+        category: Only return places in this category (optional)
+        
+    Returns:
+        Dictionary with the places, closest first
+        
+    Raises:
+        ValueError: If no places are known for the destination
+    """
+    try:
+        logger.info(f"Finding activities near ({lat}, {lon}) in {destination}")
+        
+        places = recommendation_engine.find_nearby_places(destination, lat, lon, radius_km, limit, category)
+        
+        return {
+            'destination': destination,
+            'lat': lat,
+            'lon': lon,
+            'radiusKm': radius_km,
+            'places': places
+        }
+        
+    except Exception as e:
+        logger.error(f"Error finding nearby activities: {str(e)}")
+        raise
+
+def get_readiness():
+    """
+    Get readiness of the ML components.
+    
+    Returns:
+        Warmup status, including per-component timings
+    """
+    return warmup.get_status()
+
 def get_model_status():
     """
     Get status and information about the ML models.
@@ -169,7 +704,12 @@ def get_model_status():
             'nlpProcessor': nlp_status,
             'recommendationEngine': recommendation_status,
             'preferenceModel': preference_status,
+            'neighbourIndex': neighbour_index.get_status(),
+            'modelArtifacts': model_registry.get_status(),
             'activityModel': activity_status,
+            'readiness': warmup.get_status(),
+            'requestCoalescing': recommendation_flight.get_status(),
+            'jobQueue': job_queue.get_status() if job_queue is not None else None,
             'timestamp': datetime.now().isoformat()
         }
         
@@ -177,4 +717,224 @@ def get_model_status():
         
     except Exception as e:
         logger.error(f"Error getting model status: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+def reload_models(name=None, version=None):
+    """
+    Load and activate model artifact versions.
+    
+    Args:
+        name: Artifact name (default: all registered artifacts)
+        version: Version to activate (default: the published version)
+        
+    Returns:
+        Active versions and artifact status
+    """
+    try:
+        logger.info(f"Reloading models: {name or 'all'} {version or ''}")
+        
+        if name and name not in model_registry.loaders:
+            raise ValueError(f"Unknown model artifact: {name}")
+        if version and not name:
+            raise ValueError("A model name is required when activating a version")
+        
+        if version:
+            active_versions = model_registry.activate(name, version)
+        else:
+            active_versions = model_registry.reload(name)
+        
+        return {
+            'activeVersions': active_versions,
+            'artifacts': model_registry.get_status()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error reloading models: {str(e)}")
+        raise
+
+def get_profiles(name=None, limit=None, output_format='json'):
+    """
+    Get recorded request profiles.
+    
+    Args:
+        name: Only return profiles for this endpoint (optional)
+        limit: Maximum number of profiles to return (optional)
+        output_format: 'json' for profile records, 'collapsed' for flamegraph input
+        
+    Returns:
+        List of profiles, or collapsed-stack text
+    """
+    try:
+        logger.info(f"Getting request profiles in {output_format} format")
+        
+        if output_format == 'collapsed':
+            return request_profiler.get_collapsed(name=name)
+        
+        return {
+            'profiler': request_profiler.get_status(),
+            'profiles': request_profiler.get_profiles(name=name, limit=limit)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting profiles: {str(e)}")
+        raise
+
+def _recommendation_job(params, job):
+    """Job: generate an itinerary (e.g. a long trip) in a worker process."""
+    job.progress(0, message='Generating itinerary')
+    return _generate_recommendation(**params)
+
+def _analysis_job(params, job):
+    """Job: analyze a large batch of texts in chunks, reporting progress after each chunk."""
+    texts = params['texts']
+    results = []
+    
+    for start in range(0, len(texts), config.ANALYZE_MAX_BATCH):
+        chunk = texts[start:start + config.ANALYZE_MAX_BATCH]
+        results.extend(_analyze_batch(chunk, params['analysis_type'], params['language']))
+        job.progress(len(results), len(texts), message=f'Analyzed {len(results)} of {len(texts)} texts')
+    
+    return results
+
+# Background jobs run in separate worker processes so they never hold up interactive requests
+JOB_HANDLERS = {
+    'recommendation': _recommendation_job,
+    'analysis': _analysis_job
+}
+job_queue = None
+if config.JOB_WORKERS > 0:
+    job_queue = JobQueue(
+        config.JOB_DB_PATH,
+        JOB_HANDLERS,
+        workers=config.JOB_WORKERS,
+        reserved_workers=config.JOB_RESERVED_WORKERS,
+        lease_seconds=config.JOB_LEASE_SECONDS,
+        max_attempts=config.JOB_MAX_ATTEMPTS,
+        result_ttl=config.JOB_RESULT_TTL,
+        # Workers import this module too; keep them free of background threads and nested queues
+        worker_environment={
+            'JOB_WORKERS': '0',
+            'NEIGHBOUR_REFRESH_SECONDS': '0',
+            'MODEL_RELOAD_INTERVAL': '0',
+            'WARMUP_ON_START': 'false'
+        }
+    )
+    job_queue.start()
+    atexit.register(job_queue.close)
+
+def submit_job(job_type, params, lane='bulk', priority=0):
+    """
+    Queue a long-running job.
+    
+    Args:
+        job_type: Job type ('recommendation' or 'analysis')
+        params: Keyword arguments of the job function
+        lane: 'interactive' or 'bulk'
+        priority: Higher values run earlier within a lane
+        
+    Returns:
+        Job status dictionary
+        
+    Raises:
+        ValueError: If the job type or lane is unknown
+    """
+    try:
+        logger.info(f"Submitting {job_type} job in the {lane} lane")
+        
+        if job_type == 'recommendation':
+            # Workers do not share this process's preference state; pass the user's preferences along
+            params = dict(params)
+            params['preferences'] = params.get('preferences') \
+                or preference_model.get_user_preferences(params['user_id']) or {}
+        
+        return job_queue.submit(job_type, params, lane=lane, priority=priority)
+        
+    except Exception as e:
+        logger.error(f"Error submitting job: {str(e)}")
+        raise
+
+def get_job(job_id):
+    """
+    Get a job's status and progress, with its result once it has succeeded.
+    
+    Args:
+        job_id: Job ID
+        
+    Returns:
+        Job status dictionary, or None if the job is unknown
+    """
+    return job_queue.get(job_id)
+
+def cancel_job(job_id):
+    """
+    Cancel a queued or running job.
+    
+    Args:
+        job_id: Job ID
+        
+    Returns:
+        Job status dictionary, or None if the job is unknown
+    """
+    try:
+        logger.info(f"Cancelling job {job_id}")
+        
+        return job_queue.cancel(job_id)
+        
+    except Exception as e:
+        logger.error(f"Error cancelling job: {str(e)}")
+        raise
+
+# Synthetic requests used to warm up each component before reporting ready
+WARMUP_TEXT = "I want to visit Paris from 06/01/2025 to 06/05/2025 and find great food and museums"
+WARMUP_PREFERENCES = {
+    'interests': ['sightseeing', 'food', 'culture'],
+    'accommodationType': 'mid-range',
+    'transportationPreference': 'public',
+    'pacePreference': 'moderate'
+}
+
+def _warm_nlp_processor():
+    """Load NLTK tokenizer, stopwords and WordNet data through real calls."""
+    nlp_processor.detect_language(WARMUP_TEXT)
+    nlp_processor.extract_intent(WARMUP_TEXT)
+    nlp_processor.extract_locations(WARMUP_TEXT)
+    nlp_processor.extract_dates(WARMUP_TEXT)
+    nlp_processor.analyze_sentiment(WARMUP_TEXT)
+    extract_entities(WARMUP_TEXT)
+
+def _warm_recommendation_engine():
+    """Resolve every known destination and build a sample itinerary for each."""
+    for destination in recommendation_engine.destinations:
+        cached = recommendation_engine.resolve_destination(destination)
+        recommendation_engine.generate_itinerary(
+            'warmup', destination, 2, WARMUP_PREFERENCES, destination_info=cached.info
+        )
+
+def _warm_preference_model():
+    """Exercise embedding generation and similarity search without storing a user."""
+    embedding = preference_model.generate_embeddings(WARMUP_PREFERENCES)
+    preference_model.find_similar_users('warmup', embedding)
+
+def _warm_activity_model():
+    """Exercise activity recommendation."""
+    activity_model.get_recommended_activities(WARMUP_PREFERENCES)
+
+def _warm_model_artifacts():
+    """Touch loaded model artifacts so memory-mapped pages are resident."""
+    cf_model = model_registry.get_model('cf')
+    if cf_model is not None and cf_model.user_ids:
+        cf_model.recommend_batch(cf_model.user_ids[:32])
+    intent_classifier = model_registry.get_model('intent')
+    if intent_classifier is not None:
+        intent_classifier.classify([WARMUP_TEXT])
+
+warmup.add_step('nlpProcessor', _warm_nlp_processor)
+warmup.add_step('recommendationEngine', _warm_recommendation_engine)
+warmup.add_step('preferenceModel', _warm_preference_model)
+warmup.add_step('activityModel', _warm_activity_model)
+warmup.add_step('modelArtifacts', _warm_model_artifacts)
+if config.WARMUP_ON_START:
+    warmup.start()
+else:
+    # Nothing to wait for; e.g. job worker processes never warm up
+    warmup.skip()
\ No newline at end of file
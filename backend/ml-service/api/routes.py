@@ -1,99 +1,691 @@
-from flask import request, jsonify
+from functools import wraps
+import hmac
+import math
+import time
+import logging
+from flask import request, Response, stream_with_context
 from api import api_bp
+from utils.deadline import Deadline
+from utils.job_queue import TERMINAL_STATES
+from utils.single_flight import SingleFlightTimeout
+from utils.serialization import json_response, get_serializer, get_frame_codec, encode_frame, decode_frames
 from api.controllers import (
+    config,
+    request_profiler,
     get_recommendation,
+    get_group_recommendation,
+    regenerate_itinerary,
+    get_destination,
     analyze_text,
+    analyze_texts,
+    plan_from_text,
     process_user_preferences,
-    get_model_status
+    patch_user_preferences,
+    get_activity_recommendations,
+    find_nearby_activities,
+    get_model_status,
+    get_readiness,
+    reload_models,
+    get_profiles,
+    job_queue,
+    submit_job,
+    get_job,
+    cancel_job
 )
 
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+def _is_admin():
+    """Check the request's admin token; without a configured ADMIN_TOKEN nobody is an admin."""
+    token = request.headers.get('X-Admin-Token')
+    return bool(config.ADMIN_TOKEN) and token is not None and hmac.compare_digest(
+        token.encode('utf-8'), config.ADMIN_TOKEN.encode('utf-8'))
+
+def admin_required(f):
+    """Restrict an endpoint to callers presenting the admin token; denied while none is configured."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not _is_admin():
+            return json_response({
+                'status': 'error',
+                'message': 'Admin token required' if config.ADMIN_TOKEN else 'Admin endpoints are disabled'
+            }), 403
+        return f(*args, **kwargs)
+    return decorated
+
+def _requested_profile_mode():
+    """Get the profiling mode asked for by the request header, if the caller may ask for one."""
+    requested_mode = request.headers.get(config.PROFILE_HEADER)
+    if requested_mode and not _is_admin():
+        return None
+    return requested_mode
+
+def profiled(name):
+    """Profile the endpoint when requested via header or picked by random sampling."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            mode = request_profiler.select_mode(_requested_profile_mode())
+            if not mode:
+                return f(*args, **kwargs)
+            
+            with request_profiler.profile(name, mode):
+                return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+def jobs_enabled(f):
+    """Answer 503 for job endpoints when the job queue is disabled."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if job_queue is None:
+            return json_response({
+                'status': 'error',
+                'message': 'Background jobs are disabled'
+            }), 503
+        return f(*args, **kwargs)
+    return decorated
+
+def _is_amount(value):
+    """Check that a value is a non-negative number (booleans excluded)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+def _is_integer(value):
+    """Check that a value is an integer (booleans excluded)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_budget(budget):
+    """Check that a budget has a numeric total and an optional numeric daily amount."""
+    return isinstance(budget, dict) and _is_amount(budget.get('total')) \
+        and (budget.get('daily') is None or _is_amount(budget['daily']))
+
+def _request_deadline():
+    """Build the request's Deadline from the deadline header (a time budget in milliseconds)."""
+    return Deadline.from_header(
+        request.headers.get(config.DEADLINE_HEADER),
+        default_ms=config.DEADLINE_DEFAULT_MS or None,
+        reserve_ms=config.DEADLINE_RESERVE_MS
+    )
+
+def _require_fields(data, required_fields):
+    """Raise ValueError naming the required fields missing from a request payload."""
+    missing = [field for field in required_fields if field not in data]
+    if missing:
+        raise ValueError(f'Missing required fields: {", ".join(missing)}')
+
+def _budget_param(budget):
+    """Validate an optional budget ({"total": 1200, "daily": 300}) and normalize it for the controllers."""
+    if budget is None:
+        return None
+    if not _is_budget(budget):
+        raise ValueError('budget must have a non-negative numeric total and optional daily amount')
+    return {'total': budget['total'], 'daily': budget.get('daily')}
+
+# Operations shared by the JSON routes and the framed /rpc endpoint.
+# Each validates a request payload and returns the result, raising ValueError for bad input.
+
+def _recommend(data, deadline=None):
+    """Generate travel recommendations based on user preferences and destination."""
+    _require_fields(data, ['userId', 'destination', 'startDate', 'endDate'])
+    
+    return get_recommendation(
+        user_id=data.get('userId'),
+        destination=data.get('destination'),
+        start_date=data.get('startDate'),
+        end_date=data.get('endDate'),
+        preferences=data.get('preferences', {}),
+        budget=_budget_param(data.get('budget')),
+        deadline=deadline
+    )
+
+def _recommend_group(data, deadline=None):
+    """Generate one itinerary for a group of travellers from their aggregated preferences."""
+    _require_fields(data, ['userIds', 'destination', 'startDate', 'endDate'])
+    
+    user_ids = data['userIds']
+    if not isinstance(user_ids, list) or not 1 <= len(user_ids) <= config.GROUP_MAX_MEMBERS:
+        raise ValueError(f'userIds must be a list of 1 to {config.GROUP_MAX_MEMBERS} user IDs')
+    
+    return get_group_recommendation(
+        user_ids=user_ids,
+        destination=data.get('destination'),
+        start_date=data.get('startDate'),
+        end_date=data.get('endDate'),
+        strategy=data.get('strategy', 'average'),
+        budget=_budget_param(data.get('budget')),
+        deadline=deadline
+    )
+
+def _regenerate(data):
+    """Regenerate one day or one activity slot of an itinerary as a JSON Patch."""
+    _require_fields(data, ['userId', 'destination', 'itinerary', 'day'])
+    
+    day, slot = data['day'], data.get('slot')
+    if not isinstance(data['itinerary'], list) or not _is_integer(day) or (slot is not None and not _is_integer(slot)):
+        raise ValueError('itinerary must be a list and day/slot must be integers')
+    
+    return regenerate_itinerary(
+        user_id=data.get('userId'),
+        destination=data.get('destination'),
+        itinerary=data.get('itinerary'),
+        day=data.get('day'),
+        slot=slot,
+        preferences=data.get('preferences')
+    )
+
+def _analyze(data):
+    """Analyze text (or a batch of texts) for sentiment, intent, and key entities."""
+    if 'text' not in data and 'texts' not in data:
+        raise ValueError('Text field is required')
+    
+    texts = data.get('texts')
+    if texts is None:
+        return analyze_text(
+            text=data.get('text'),
+            analysis_type=data.get('analysisType', 'all'),
+            language=data.get('language')
+        )
+    
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts) \
+            or len(texts) > config.ANALYZE_MAX_BATCH:
+        raise ValueError(f'texts must be a list of at most {config.ANALYZE_MAX_BATCH} strings')
+    
+    return analyze_texts(
+        texts=texts,
+        analysis_type=data.get('analysisType', 'all'),
+        language=data.get('language')
+    )
+
+def _plan_from_text(data, deadline=None):
+    """Parse a free-text trip request and return the generated itinerary."""
+    _require_fields(data, ['userId', 'text'])
+    
+    if not isinstance(data['text'], str):
+        raise ValueError('text must be a string')
+    
+    return plan_from_text(
+        user_id=data.get('userId'),
+        text=data.get('text'),
+        language=data.get('language'),
+        preferences=data.get('preferences'),
+        deadline=deadline
+    )
+
+def _save_preferences(data, deadline=None):
+    """Process user preferences for better recommendations."""
+    if 'userId' not in data:
+        raise ValueError('User ID is required')
+    
+    return process_user_preferences(
+        user_id=data.get('userId'),
+        preferences=data.get('preferences', {}),
+        deadline=deadline
+    )
+
+def _patch_preferences(data, deadline=None):
+    """Apply a partial update (add/remove interests, change tiers) to user preferences."""
+    if 'userId' not in data:
+        raise ValueError('User ID is required')
+    
+    for field in ('addInterests', 'removeInterests'):
+        value = data.get(field)
+        if value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+            raise ValueError(f"{field} must be a list of strings")
+    for field in ('accommodationType', 'transportationPreference'):
+        if data.get(field) is not None and not isinstance(data[field], str):
+            raise ValueError(f"{field} must be a string")
+    
+    return patch_user_preferences(
+        user_id=data.get('userId'),
+        changes=data,
+        deadline=deadline
+    )
+
+def _recommend_activities(data):
+    """Recommend activities from the collaborative-filtering model."""
+    if 'userId' not in data:
+        raise ValueError('User ID is required')
+    
+    limit = data.get('limit', 10)
+    if not _is_integer(limit) or limit < 1:
+        raise ValueError('limit must be a positive integer')
+    
+    return get_activity_recommendations(
+        user_id=data.get('userId'),
+        limit=limit,
+        preferences=data.get('preferences')
+    )
+
+def _submit_job(data):
+    """Validate a background job request and queue it."""
+    _require_fields(data, ['type', 'params'])
+    
+    params = data['params']
+    if not isinstance(params, dict):
+        raise ValueError('params must be an object')
+    
+    if data['type'] == 'recommendation':
+        _require_fields(params, ['userId', 'destination', 'startDate', 'endDate'])
+        job_params = {
+            'user_id': params['userId'],
+            'destination': params['destination'],
+            'start_date': params['startDate'],
+            'end_date': params['endDate'],
+            'preferences': params.get('preferences', {}),
+            'budget': _budget_param(params.get('budget'))
+        }
+    elif data['type'] == 'analysis':
+        texts = params.get('texts')
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts) \
+                or not 1 <= len(texts) <= config.JOB_MAX_TEXTS:
+            raise ValueError(f'texts must be a list of 1 to {config.JOB_MAX_TEXTS} strings')
+        job_params = {
+            'texts': texts,
+            'analysis_type': params.get('analysisType', 'all'),
+            'language': params.get('language')
+        }
+    else:
+        raise ValueError('type must be recommendation or analysis')
+    
+    priority = data.get('priority', 0)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        raise ValueError('priority must be an integer')
+    
+    return submit_job(data['type'], job_params, lane=data.get('lane', 'bulk'), priority=priority)
+
+# Operations honouring the request deadline; they take it as a second argument
+DEADLINE_OPERATIONS = {
+    'recommendations', 'group_recommendations', 'plan_from_text', 'preferences', 'preferences_patch'
+}
+
+# Operations callable through /rpc, named like their JSON route profiles
+OPERATIONS = {
+    'recommendations': _recommend,
+    'group_recommendations': _recommend_group,
+    'regenerate': _regenerate,
+    'analyze': _analyze,
+    'plan_from_text': _plan_from_text,
+    'preferences': _save_preferences,
+    'preferences_patch': _patch_preferences,
+    'activity_recommendations': _recommend_activities
+}
+
+def _read_body(limit):
+    """Read the request body, or return None as soon as it exceeds limit bytes."""
+    chunks, size = [], 0
+    while True:
+        chunk = request.stream.read(min(64 * 1024, limit + 1 - size))
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            return None
+
+# Answer for requests that gave up waiting on an identical in-flight request
+BUSY_MESSAGE = 'An identical request is still being processed, try again later'
+
+def _json_result(operation, data, with_deadline=False):
+    """Run an operation for a JSON route: 400 for rejected input or deadline headers, 503 when stuck behind an identical request."""
+    try:
+        result = operation(data, _request_deadline()) if with_deadline else operation(data)
+    except ValueError as e:
+        return json_response({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except SingleFlightTimeout:
+        return json_response({
+            'status': 'error',
+            'message': BUSY_MESSAGE
+        }), 503
+    
+    return json_response({
+        'status': 'success',
+        'data': result
+    }), 200
+
+def _rpc_result(call, requested_mode, deadline):
+    """Run one decoded /rpc call frame and build its response frame."""
+    call_id = call.get('id') if isinstance(call, dict) else None
+    name = call.get('op') if isinstance(call, dict) else None
+    params = call.get('params', {}) if isinstance(call, dict) else None
+    
+    if name not in OPERATIONS or not isinstance(params, dict):
+        return {
+            'id': call_id,
+            'status': 'error',
+            'message': f'Calls need an op ({", ".join(OPERATIONS)}) and a params object'
+        }
+    
+    # Every call of a batch shares the batch's deadline but reports its own timings
+    args = (params, deadline.child()) if name in DEADLINE_OPERATIONS else (params,)
+    try:
+        mode = request_profiler.select_mode(requested_mode)
+        if mode:
+            with request_profiler.profile(name, mode):
+                result = OPERATIONS[name](*args)
+        else:
+            result = OPERATIONS[name](*args)
+    except ValueError as e:
+        return {'id': call_id, 'status': 'error', 'message': str(e)}
+    except SingleFlightTimeout:
+        return {'id': call_id, 'status': 'error', 'message': BUSY_MESSAGE}
+    except Exception:
+        # One failing call must not abort the rest of the batch
+        logger.exception(f"RPC call {name} failed")
+        return {'id': call_id, 'status': 'error', 'message': 'Internal server error'}
+    
+    return {'id': call_id, 'status': 'success', 'data': result}
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for the API."""
-    return jsonify({
+    return json_response({
         'status': 'success',
         'message': 'ML service is running'
     }), 200
 
+@api_bp.route('/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness endpoint: the worker process is up and serving requests."""
+    return json_response({
+        'status': 'success',
+        'message': 'ML service is alive'
+    }), 200
+
+@api_bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint: answers 200 only once every component has been warmed up."""
+    readiness = get_readiness()
+    
+    return json_response({
+        'status': 'success' if readiness['ready'] else 'error',
+        'data': readiness
+    }), 200 if readiness['ready'] else 503
+
 @api_bp.route('/recommendations', methods=['POST'])
+@profiled('recommendations')
 def recommendations():
     """Generate travel recommendations based on user preferences and destination."""
-    data = request.get_json()
+    return _json_result(_recommend, request.get_json(), with_deadline=True)
+
+@api_bp.route('/recommendations/group', methods=['POST'])
+@profiled('group_recommendations')
+def group_recommendations():
+    """Generate one itinerary for a group of travellers from their aggregated preferences."""
+    return _json_result(_recommend_group, request.get_json(), with_deadline=True)
+
+@api_bp.route('/recommendations/regenerate', methods=['POST'])
+@profiled('regenerate')
+def regenerate():
+    """Regenerate one day or one activity slot of an itinerary and return a JSON Patch."""
+    return _json_result(_regenerate, request.get_json())
+
+@api_bp.route('/destinations/<destination_id>', methods=['GET'])
+def destination(destination_id):
+    """Get destination information, honouring If-None-Match for conditional requests."""
+    cached = get_destination(destination_id)
     
-    # Validate required fields
-    required_fields = ['userId', 'destination', 'startDate', 'endDate']
-    if not all(field in data for field in required_fields):
-        return jsonify({
+    if request.if_none_match.contains(cached.etag):
+        response = Response(status=304)
+    else:
+        response = json_response({
+            'status': 'success',
+            'data': cached.fragment
+        })
+    
+    response.set_etag(cached.etag)
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+@api_bp.route('/analyze', methods=['POST'])
+@profiled('analyze')
+def analyze():
+    """Analyze text (or a batch of texts) for sentiment, intent, and key entities."""
+    return _json_result(_analyze, request.get_json())
+
+@api_bp.route('/plan-from-text', methods=['POST'])
+@profiled('plan_from_text')
+def plan_from_text_route():
+    """Parse a free-text trip request and return the generated itinerary."""
+    return _json_result(_plan_from_text, request.get_json(), with_deadline=True)
+
+@api_bp.route('/preferences', methods=['POST'])
+@profiled('preferences')
+def preferences():
+    """Process user preferences for better recommendations."""
+    return _json_result(_save_preferences, request.get_json(), with_deadline=True)
+
+@api_bp.route('/preferences', methods=['PATCH'])
+@profiled('preferences_patch')
+def patch_preferences():
+    """Apply a partial update (add/remove interests, change tiers) to user preferences."""
+    return _json_result(_patch_preferences, request.get_json(), with_deadline=True)
+
+@api_bp.route('/activities/recommendations', methods=['POST'])
+@profiled('activity_recommendations')
+def activity_recommendations():
+    """Recommend activities from the collaborative-filtering model."""
+    return _json_result(_recommend_activities, request.get_json())
+
+@api_bp.route('/activities/nearby', methods=['GET'])
+def nearby_activities():
+    """Find a destination's places near a point, by radius or nearest first."""
+    args = request.args
+    
+    if not args.get('destination') or 'lat' not in args or 'lon' not in args:
+        return json_response({
             'status': 'error',
-            'message': f'Missing required fields: {", ".join(set(required_fields) - set(data.keys()))}'
+            'message': 'destination, lat and lon are required'
         }), 400
     
-    # Get recommendations
-    result = get_recommendation(
-        user_id=data.get('userId'),
-        destination=data.get('destination'),
-        start_date=data.get('startDate'),
-        end_date=data.get('endDate'),
-        preferences=data.get('preferences', {})
-    )
+    try:
+        lat = float(args['lat'])
+        lon = float(args['lon'])
+        radius_km = float(args['radius']) if 'radius' in args else None
+        limit = int(args.get('limit', 10))
+    except ValueError:
+        return json_response({
+            'status': 'error',
+            'message': 'lat, lon and radius must be numbers and limit an integer'
+        }), 400
     
-    return jsonify({
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) \
+            or (radius_km is not None and not (radius_km > 0 and math.isfinite(radius_km))) \
+            or not 1 <= limit <= config.NEARBY_MAX_RESULTS:
+        return json_response({
+            'status': 'error',
+            'message': f'Coordinates out of range, radius must be positive and limit between 1 and {config.NEARBY_MAX_RESULTS}'
+        }), 400
+    
+    try:
+        result = find_nearby_activities(
+            destination=args['destination'],
+            lat=lat,
+            lon=lon,
+            radius_km=radius_km,
+            limit=limit,
+            category=args.get('category')
+        )
+    except ValueError as e:
+        return json_response({
+            'status': 'error',
+            'message': str(e)
+        }), 404
+    
+    return json_response({
         'status': 'success',
         'data': result
     }), 200
 
-@api_bp.route('/analyze', methods=['POST'])
-def analyze():
-    """Analyze text for sentiment, intent, and key entities."""
-    data = request.get_json()
+@api_bp.route('/rpc', methods=['POST'])
+def rpc():
+    """
+    Run a pipelined batch of operations sent as length-prefixed binary frames.
+    
+    Each request frame is {"id", "op", "params"}, encoded as MessagePack or JSON
+    according to the Content-Type. One response frame {"id", "status", "data" or
+    "message"} per call is streamed back in order as soon as the call completes.
+    """
+    codec = get_frame_codec(request.mimetype)
+    if codec is None:
+        return json_response({
+            'status': 'error',
+            'message': f'Unsupported frame encoding: {request.mimetype}'
+        }), 415
+    
+    # Chunked bodies have no Content-Length, so the limit is also enforced while reading
+    body = None
+    if request.content_length is None or request.content_length <= config.RPC_MAX_BYTES:
+        body = _read_body(config.RPC_MAX_BYTES)
+    if body is None:
+        return json_response({
+            'status': 'error',
+            'message': f'Request body exceeds {config.RPC_MAX_BYTES} bytes'
+        }), 413
     
-    # Validate required fields
-    if 'text' not in data:
-        return jsonify({
+    try:
+        deadline = _request_deadline()
+        calls = decode_frames(body, codec, max_frames=config.RPC_MAX_CALLS)
+    except ValueError as e:
+        return json_response({
             'status': 'error',
-            'message': 'Text field is required'
+            'message': str(e)
         }), 400
     
-    # Analyze text
-    result = analyze_text(
-        text=data.get('text'),
-        analysis_type=data.get('analysisType', 'all')
-    )
+    requested_mode = _requested_profile_mode()
     
-    return jsonify({
+    def frames():
+        for call in calls:
+            yield encode_frame(codec, _rpc_result(call, requested_mode, deadline))
+    
+    return Response(stream_with_context(frames()), mimetype=codec.content_type)
+
+@api_bp.route('/jobs', methods=['POST'])
+@jobs_enabled
+def jobs():
+    """Queue a long-running job (a long itinerary or bulk analysis) and return its ID."""
+    try:
+        result = _submit_job(request.get_json())
+    except ValueError as e:
+        return json_response({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    return json_response({
         'status': 'success',
         'data': result
-    }), 200
+    }), 202
 
-@api_bp.route('/preferences', methods=['POST'])
-def preferences():
-    """Process user preferences for better recommendations."""
-    data = request.get_json()
-    
-    # Validate required fields
-    if 'userId' not in data:
-        return jsonify({
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+@jobs_enabled
+def job_status(job_id):
+    """Get a job's status and progress, with its result once it has succeeded."""
+    result = get_job(job_id)
+    if result is None:
+        return json_response({
             'status': 'error',
-            'message': 'User ID is required'
-        }), 400
+            'message': f'Unknown job: {job_id}'
+        }), 404
     
-    # Process preferences
-    result = process_user_preferences(
-        user_id=data.get('userId'),
-        preferences=data.get('preferences', {})
-    )
+    return json_response({
+        'status': 'success',
+        'data': result
+    }), 200
+
+@api_bp.route('/jobs/<job_id>', methods=['DELETE'])
+@jobs_enabled
+def job_cancel(job_id):
+    """Cancel a queued or running job."""
+    result = cancel_job(job_id)
+    if result is None:
+        return json_response({
+            'status': 'error',
+            'message': f'Unknown job: {job_id}'
+        }), 404
     
-    return jsonify({
+    return json_response({
         'status': 'success',
         'data': result
     }), 200
 
+@api_bp.route('/jobs/<job_id>/events', methods=['GET'])
+@jobs_enabled
+def job_events(job_id):
+    """Stream a job's status and progress as server-sent events until it finishes."""
+    if get_job(job_id) is None:
+        return json_response({
+            'status': 'error',
+            'message': f'Unknown job: {job_id}'
+        }), 404
+    
+    def events():
+        last_state = None
+        while True:
+            job = get_job(job_id)
+            if job is None:
+                return
+            
+            state = (job['status'], job['progress'], job['message'])
+            if state != last_state:
+                # Results can be large; clients fetch them from /jobs/<id>
+                job.pop('result', None)
+                yield b'data: ' + get_serializer().dumps(job) + b'\n\n'
+                last_state = state
+            
+            if job['status'] in TERMINAL_STATES:
+                return
+            time.sleep(config.JOB_EVENT_INTERVAL)
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 @api_bp.route('/models/status', methods=['GET'])
 def model_status():
     """Get status and information about the ML models."""
     result = get_model_status()
     
-    return jsonify({
+    return json_response({
+        'status': 'success',
+        'data': result
+    }), 200
+
+@api_bp.route('/admin/profiles', methods=['GET'])
+@admin_required
+def profiles():
+    """Get recorded request profiles as JSON or collapsed stacks for flamegraphs."""
+    output_format = request.args.get('format', 'json')
+    result = get_profiles(
+        name=request.args.get('name'),
+        limit=request.args.get('limit', type=int),
+        output_format=output_format
+    )
+    
+    if output_format == 'collapsed':
+        return Response(result, mimetype='text/plain'), 200
+    
+    return json_response({
+        'status': 'success',
+        'data': result
+    }), 200
+
+@api_bp.route('/admin/models/reload', methods=['POST'])
+@admin_required
+def models_reload():
+    """Load and activate model artifact versions without restarting the worker."""
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        result = reload_models(name=data.get('name'), version=data.get('version'))
+    except ValueError as e:
+        return json_response({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    return json_response({
         'status': 'success',
         'data': result
     }), 200
\ No newline at end of file
@@ -1,10 +1,14 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request
 from flask_cors import CORS
 import random
 import os
+from config import get_config
+from utils.serialization import json_response, set_serializer
+from core.warmup import Warmup
 
 app = Flask(__name__)
 CORS(app)
+set_serializer(get_config().JSON_SERIALIZER)
 
 # Sample activities for different categories
 activities = {
@@ -34,9 +38,21 @@ activities = {
     ]
 }
 
+# Readiness is reported once the handlers below have served synthetic requests
+warmup = Warmup(retry_interval=get_config().WARMUP_RETRY_SECONDS)
+
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({"status": "ok", "message": "ML service is running"})
+    return json_response({"status": "ok", "message": "ML service is running"})
+
+@app.route('/health/live', methods=['GET'])
+def liveness():
+    return json_response({"status": "ok", "message": "ML service is alive"})
+
+@app.route('/health/ready', methods=['GET'])
+def readiness():
+    status = warmup.get_status()
+    return json_response({"status": "ok" if status['ready'] else "unavailable", "data": status}), 200 if status['ready'] else 503
 
 @app.route('/api/analyze-text', methods=['POST'])
 def analyze_text():
@@ -62,7 +78,7 @@ def analyze_text():
                 if pref not in preferences:
                     preferences.append(pref)
     
-    return jsonify({
+    return json_response({
         "success": True,
         "data": {
             "analyzed_text": text,
@@ -133,7 +149,7 @@ def generate_itinerary():
                 })
                 activity_id += 1
     
-    return jsonify({
+    return json_response({
         "success": True,
         "data": itinerary
     })
@@ -159,11 +175,27 @@ def recommend_activities():
     random.shuffle(recommended)
     recommended = recommended[:10]
     
-    return jsonify({
+    return json_response({
         "success": True,
         "data": recommended
     })
 
+def _warm_endpoint(path, payload):
+    """Send a synthetic request through the app so first real requests are not cold."""
+    def step():
+        response = app.test_client().post(path, json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+    return step
+
+warmup.add_step('analyzeText', _warm_endpoint('/api/analyze-text', {"text": "Beach and food in Lisbon"}))
+warmup.add_step('generateItinerary', _warm_endpoint('/api/generate-itinerary', {"destination": "Lisbon", "duration": 2}))
+warmup.add_step('recommendActivities', _warm_endpoint('/api/recommend-activities', {"destination": "Lisbon"}))
+if get_config().WARMUP_ON_START:
+    warmup.start()
+else:
+    warmup.skip()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5001))
     app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 from dotenv import load_dotenv
 
@@ -9,9 +10,71 @@ class Config:
     """Base config class."""
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev_key_for_development')
     MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/itinera')
+    MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '50'))
+    MONGO_PREFERENCES_COLLECTION = os.environ.get('MONGO_PREFERENCES_COLLECTION', 'ml_preferences')
+    PREFERENCE_STORE = os.environ.get('PREFERENCE_STORE', 'none')  # none, memory or mongo
+    PREFERENCE_CACHE_SIZE = int(os.environ.get('PREFERENCE_CACHE_SIZE', '100000'))
+    PREFERENCE_NEGATIVE_TTL = float(os.environ.get('PREFERENCE_NEGATIVE_TTL', '30'))  # seconds a miss is cached
+    PREFERENCE_WRITE_BEHIND = os.environ.get('PREFERENCE_WRITE_BEHIND', 'true').lower() == 'true'
+    PREFERENCE_FLUSH_BATCH_SIZE = int(os.environ.get('PREFERENCE_FLUSH_BATCH_SIZE', '500'))
+    PREFERENCE_FLUSH_INTERVAL = float(os.environ.get('PREFERENCE_FLUSH_INTERVAL', '1'))
+    PREFERENCE_MAX_PENDING_WRITES = int(os.environ.get('PREFERENCE_MAX_PENDING_WRITES', '10000'))
     MODEL_PATH = os.environ.get('MODEL_PATH', 'models/trained_models')
+    MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', '10'))  # 0 disables polling
+    NLP_DEFAULT_LANGUAGE = os.environ.get('NLP_DEFAULT_LANGUAGE', 'en')
+    ACTIVITY_DIVERSITY = float(os.environ.get('ACTIVITY_DIVERSITY', '0.3'))  # 0 ranks by relevance only
+    PLACE_CELL_KM = float(os.environ.get('PLACE_CELL_KM', '0.5'))  # spatial index grid size
+    NEARBY_MAX_RESULTS = int(os.environ.get('NEARBY_MAX_RESULTS', '100'))
+    GROUP_MAX_MEMBERS = int(os.environ.get('GROUP_MAX_MEMBERS', '50'))
+    PLAN_DEFAULT_DAYS = int(os.environ.get('PLAN_DEFAULT_DAYS', '3'))
+    PLAN_MAX_DAYS = int(os.environ.get('PLAN_MAX_DAYS', '60'))
+    ANALYZE_MAX_BATCH = int(os.environ.get('ANALYZE_MAX_BATCH', '256'))
+    NLP_MAX_LANGUAGES = int(os.environ.get('NLP_MAX_LANGUAGES', '4'))  # languages kept loaded per worker
+    WARMUP_ON_START = os.environ.get('WARMUP_ON_START', 'true').lower() == 'true'
+    WARMUP_RETRY_SECONDS = float(os.environ.get('WARMUP_RETRY_SECONDS', '30'))  # 0 disables retries of failed steps
     API_PREFIX = os.environ.get('API_PREFIX', '/api/v1')
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    JSON_SERIALIZER = os.environ.get('JSON_SERIALIZER', 'auto')  # auto, orjson or stdlib
+
+    # Framed binary transport (/rpc)
+    RPC_MAX_CALLS = int(os.environ.get('RPC_MAX_CALLS', '256'))  # frames per request
+    RPC_MAX_BYTES = int(os.environ.get('RPC_MAX_BYTES', str(16 * 1024 * 1024)))
+
+    # Request deadlines: callers send their time budget in milliseconds in DEADLINE_HEADER
+    DEADLINE_HEADER = os.environ.get('DEADLINE_HEADER', 'X-Deadline-Ms')
+    DEADLINE_DEFAULT_MS = float(os.environ.get('DEADLINE_DEFAULT_MS', '0'))  # 0 = no deadline without the header
+    DEADLINE_RESERVE_MS = float(os.environ.get('DEADLINE_RESERVE_MS', '50'))  # below this, stages fall back
+
+    # Request profiling
+    PROFILE_HEADER = os.environ.get('PROFILE_HEADER', 'X-Profile')
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_BUFFER_SIZE = int(os.environ.get('PROFILE_BUFFER_SIZE', '100'))
+    PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '5'))
+
+    # Request coalescing for identical concurrent recommendations
+    SINGLE_FLIGHT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', '30'))
+    SINGLE_FLIGHT_LOCK_DIR = os.environ.get('SINGLE_FLIGHT_LOCK_DIR')  # enables cross-worker coalescing
+    SINGLE_FLIGHT_RESULT_TTL = float(os.environ.get('SINGLE_FLIGHT_RESULT_TTL', '2'))
+
+    # Precomputed similar-user neighbour lists
+    NEIGHBOUR_K = int(os.environ.get('NEIGHBOUR_K', '20'))
+    NEIGHBOUR_BLOCK_SIZE = int(os.environ.get('NEIGHBOUR_BLOCK_SIZE', '2048'))
+    NEIGHBOUR_WORKERS = int(os.environ.get('NEIGHBOUR_WORKERS', '0')) or None  # 0 = CPU count
+    NEIGHBOUR_REFRESH_SECONDS = float(os.environ.get('NEIGHBOUR_REFRESH_SECONDS', '300'))  # 0 disables
+
+    # Similar-user measure: cosine, jaccard_bits or hamming_bits (the *_bits ones scan packed signatures)
+    SIMILARITY_MEASURE = os.environ.get('SIMILARITY_MEASURE', 'cosine')
+
+    # Background jobs for long itineraries and bulk analysis
+    JOB_DB_PATH = os.environ.get('JOB_DB_PATH', os.path.join(tempfile.gettempdir(), 'ml-service-jobs.sqlite3'))
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))  # 0 disables the job queue
+    JOB_RESERVED_WORKERS = int(os.environ.get('JOB_RESERVED_WORKERS', '1'))  # kept for the interactive lane
+    JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', '60'))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+    JOB_RESULT_TTL = float(os.environ.get('JOB_RESULT_TTL', '86400'))
+    JOB_MAX_TEXTS = int(os.environ.get('JOB_MAX_TEXTS', '100000'))
+    JOB_EVENT_INTERVAL = float(os.environ.get('JOB_EVENT_INTERVAL', '0.5'))  # seconds between progress polls
 
 
 class DevelopmentConfig(Config):
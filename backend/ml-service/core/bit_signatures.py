@@ -0,0 +1,78 @@
+import logging
+import numpy as np
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+# Binary features that fit in one signature word
+SIGNATURE_BITS = 64
+
+# Set bits per byte value, for numpy versions without bitwise_count
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def pack_signatures(matrix):
+    """
+    Pack binary feature rows into one uint64 word each (feature i -> bit i).
+
+    Args:
+        matrix: Array of shape (n, d) with d <= 64; non-zero entries are set bits
+
+    Returns:
+        uint64 array of shape (n,)
+    """
+    matrix = np.asarray(matrix)
+    if matrix.shape[1] > SIGNATURE_BITS:
+        raise ValueError(f"Cannot pack {matrix.shape[1]} features into a {SIGNATURE_BITS}-bit signature")
+
+    weights = np.left_shift(np.uint64(1), np.arange(matrix.shape[1], dtype=np.uint64))
+    return np.bitwise_or.reduce(np.where(matrix != 0, weights, np.uint64(0)), axis=1)
+
+
+def popcount(words):
+    """
+    Count the set bits of each uint64 word.
+
+    Args:
+        words: uint64 array
+
+    Returns:
+        Array of bit counts
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    return POPCOUNT_TABLE[words.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.uint8)
+
+
+def jaccard_similarities(signature, signatures):
+    """
+    Jaccard similarity |a & b| / |a | b| between one signature and many.
+
+    Args:
+        signature: uint64 signature to compare
+        signatures: Contiguous uint64 array of signatures
+
+    Returns:
+        float32 array of similarities (0 where both signatures are empty)
+    """
+    signature = np.uint64(signature)
+    intersection = popcount(np.bitwise_and(signatures, signature)).astype(np.float32)
+    union = popcount(np.bitwise_or(signatures, signature)).astype(np.float32)
+    return np.divide(intersection, union, out=np.zeros_like(union), where=union > 0)
+
+
+def hamming_similarities(signature, signatures, n_bits):
+    """
+    Share of matching feature bits between one signature and many.
+
+    Args:
+        signature: uint64 signature to compare
+        signatures: Contiguous uint64 array of signatures
+        n_bits: Number of features used in the signatures
+
+    Returns:
+        float32 array of similarities between 0 and 1
+    """
+    differing = popcount(np.bitwise_xor(signatures, np.uint64(signature))).astype(np.float32)
+    return 1.0 - differing / n_bits
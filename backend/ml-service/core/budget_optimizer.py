@@ -0,0 +1,178 @@
+import logging
+import numpy as np
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+def select_within_budget(costs, scores, max_items, budget, max_cells=256):
+    """
+    Pick items maximizing total score under a budget and an item count limit.
+
+    Cardinality-constrained 0/1 knapsack solved by dynamic programming over
+    discretized cost. Costs are rounded up to the grid, so the selection never
+    exceeds the budget.
+
+    Args:
+        costs: Array of item costs
+        scores: Array of item scores
+        max_items: Maximum number of items to pick
+        budget: Total budget
+        max_cells: Maximum number of budget grid cells
+
+    Returns:
+        Tuple of (selected item indices, total score of the selection)
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    # No more items than there are can be picked; this also bounds the table sizes
+    max_items = min(max_items, len(costs))
+    if budget < 0 or max_items <= 0:
+        return [], 0.0
+
+    step = max(1.0, budget / max_cells)
+    weights = np.ceil(costs / step - 1e-9).astype(np.int64)
+    capacity = int(budget // step)
+
+    # best[c, b]: best score using c items and b grid cells
+    best = np.full((max_items + 1, capacity + 1), -np.inf)
+    best[0, 0] = 0.0
+    taken = np.zeros((len(costs), max_items + 1, capacity + 1), dtype=bool)
+
+    for i in range(len(costs)):
+        weight = weights[i]
+        if weight > capacity:
+            continue
+        candidate = best[:-1, :capacity + 1 - weight] + scores[i]
+        target = best[1:, weight:]
+        improved = candidate > target
+        target[improved] = candidate[improved]
+        taken[i, 1:, weight:] = improved
+
+    count, cells = np.unravel_index(np.argmax(best), best.shape)
+    total_score = float(best[count, cells])
+
+    selected = []
+    for i in range(len(costs) - 1, -1, -1):
+        if count == 0:
+            break
+        if taken[i, count, cells]:
+            selected.append(i)
+            count -= 1
+            cells -= weights[i]
+
+    return selected[::-1], total_score
+
+
+def assign_to_days(selected, pool, costs, scores, days, slots_per_day, daily_budget, total_budget, allowed=None):
+    """
+    Spread selected items over days within per-day slot and budget limits.
+
+    Items are placed most expensive first into the day with the most budget
+    left; items that fit nowhere are dropped, and free slots are then filled
+    greedily with the best remaining pool items that still fit.
+
+    Args:
+        selected: Item indices chosen by select_within_budget
+        pool: Item indices that may fill free slots
+        costs: Array of item costs
+        scores: Array of item scores
+        days: Number of days
+        slots_per_day: Maximum items per day
+        daily_budget: Budget per day
+        total_budget: Budget for the whole trip
+        allowed: Boolean array of shape (n_items, days); items are only placed
+            on days where it is True (default: every day)
+
+    Returns:
+        List with the item indices of each day
+    """
+    plan = [[] for _ in range(days)]
+    remaining = [daily_budget] * days
+    spent = 0.0
+
+    def place(item):
+        open_days = [
+            day for day in range(days)
+            if len(plan[day]) < slots_per_day and remaining[day] >= costs[item]
+            and (allowed is None or allowed[item, day])
+        ]
+        if not open_days or spent + costs[item] > total_budget:
+            return False
+        day = max(open_days, key=lambda d: remaining[d])
+        plan[day].append(item)
+        remaining[day] -= costs[item]
+        return True
+
+    for item in sorted(selected, key=lambda i: -costs[i]):
+        if place(item):
+            spent += costs[item]
+
+    chosen = {item for day_items in plan for item in day_items}
+    for item in sorted(pool, key=lambda i: -scores[i]):
+        if item not in chosen and place(item):
+            spent += costs[item]
+            chosen.add(item)
+
+    return plan
+
+
+def optimize_trip(costs, scores, days, slots_per_day, total_budget, daily_budget=None, max_candidates=None,
+                  allowed=None):
+    """
+    Choose distinct activities for every day of a trip under total and per-day budgets.
+
+    Args:
+        costs: Array of activity costs
+        scores: Array of activity preference scores
+        days: Number of days
+        slots_per_day: Activity slots per day
+        total_budget: Budget available for activities over the whole trip
+        daily_budget: Budget available for activities per day (default: no daily limit)
+        max_candidates: Best-scoring activities considered by the exact selection
+            (default: four per slot, at most 256)
+        allowed: Boolean array of shape (n_items, days) marking the days an
+            activity may be scheduled on, e.g. the days it is open (default: every day)
+
+    Returns:
+        Dictionary with the activity indices per day, the achieved score and
+        the selection score: the score of the activities picked under the
+        trip-wide budget before they are spread over days (items dropped then
+        make the achieved score lower). Costs are rounded up for the
+        selection, so it is a lower bound on the best selection under exact
+        costs, not an upper bound.
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    if daily_budget is None:
+        daily_budget = total_budget
+
+    max_items = days * slots_per_day
+    if max_candidates is None:
+        max_candidates = min(256, 4 * max_items)
+
+    # Any item dearer than a day's budget, or allowed on no day, can never be scheduled
+    schedulable = costs <= daily_budget
+    if allowed is not None:
+        allowed = np.asarray(allowed, dtype=bool)
+        schedulable &= allowed.any(axis=1)
+    candidates = np.flatnonzero(schedulable)
+    if len(candidates) > max_candidates:
+        order = np.lexsort((costs[candidates], -scores[candidates]))
+        candidates = candidates[order[:max_candidates]]
+
+    budget = min(total_budget, daily_budget * days)
+    selected, selection_score = select_within_budget(costs[candidates], scores[candidates], max_items, budget)
+
+    candidates = [int(item) for item in candidates]
+    plan = assign_to_days(
+        [candidates[i] for i in selected], candidates, costs, scores,
+        days, slots_per_day, daily_budget, total_budget, allowed
+    )
+    score = float(sum(scores[item] for day_items in plan for item in day_items))
+
+    return {
+        'days': plan,
+        'score': score,
+        'selection_score': selection_score
+    }
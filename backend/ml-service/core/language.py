@@ -0,0 +1,280 @@
+import json
+import os
+import re
+import threading
+from collections import Counter, OrderedDict, namedtuple
+import logging
+import numpy as np
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+# One <code>.json resource file per supported language
+LANGUAGE_DIR = os.path.join(os.path.dirname(__file__), 'languages')
+
+# Letters only; digits and punctuation carry no language signal
+WORD_PATTERN = re.compile(r'[^\W\d_]+')
+
+# Per-language vocabularies used by the NLP pipeline
+LanguageResources = namedtuple('LanguageResources', [
+    'code', 'name', 'stopwords', 'intents', 'intent_index',
+    'positive_words', 'negative_words', 'location_indicators',
+    'interest_index', 'day_words', 'date_order'
+])
+
+
+def available_languages(language_dir=LANGUAGE_DIR):
+    """
+    List the languages with a resource file.
+
+    Args:
+        language_dir: Directory holding the resource files
+
+    Returns:
+        Sorted list of language codes
+    """
+    return sorted(
+        name[:-len('.json')] for name in os.listdir(language_dir) if name.endswith('.json')
+    )
+
+
+def _read_resource_file(code, language_dir=LANGUAGE_DIR):
+    """Read a language's raw resource file."""
+    with open(os.path.join(language_dir, f"{code}.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def char_ngrams(text, max_n=3):
+    """
+    Count the character n-grams of a text, with words padded by spaces.
+
+    Args:
+        text: Text to split
+        max_n: Longest n-gram length
+
+    Returns:
+        Counter of n-grams
+    """
+    counts = Counter()
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = f" {word} "
+        for n in range(1, max_n + 1):
+            for i in range(len(padded) - n + 1):
+                counts[padded[i:i + n]] += 1
+    return counts
+
+
+class LanguageDetector:
+    """Naive Bayes language detector over character n-gram profiles."""
+
+    def __init__(self, language_dir=LANGUAGE_DIR, profile_size=500, max_n=3):
+        """
+        Initialize the detector; profiles are built on first use.
+
+        Args:
+            language_dir: Directory holding the resource files
+            profile_size: Most frequent n-grams kept per language
+            max_n: Longest n-gram length
+        """
+        self.language_dir = language_dir
+        self.profile_size = profile_size
+        self.max_n = max_n
+        self.languages = None
+        self.vocabulary = None
+        self.log_probs = None
+        self._lock = threading.Lock()
+
+    def _build_profiles(self):
+        """Build n-gram log-probabilities from each language's sample text and vocabularies."""
+        languages = available_languages(self.language_dir)
+        profiles = []
+
+        for code in languages:
+            resource = _read_resource_file(code, self.language_dir)
+            words = [resource.get('sample', '')]
+            words.extend(resource.get('stopwords', []))
+            words.extend(resource.get('location_indicators', []))
+            for lexicon in resource.get('sentiment', {}).values():
+                words.extend(lexicon)
+            for keywords in resource.get('intents', {}).values():
+                words.extend(keywords)
+            for keywords in resource.get('interests', {}).values():
+                words.extend(keywords)
+            profiles.append(dict(char_ngrams(' '.join(words), self.max_n).most_common(self.profile_size)))
+
+        vocabulary = {}
+        for profile in profiles:
+            for ngram in profile:
+                vocabulary.setdefault(ngram, len(vocabulary))
+
+        # Last column scores n-grams outside every profile
+        counts = np.zeros((len(languages), len(vocabulary) + 1), dtype=np.float64)
+        for row, profile in enumerate(profiles):
+            for ngram, count in profile.items():
+                counts[row, vocabulary[ngram]] = count
+
+        # Add-one smoothing over the shared vocabulary
+        totals = counts.sum(axis=1, keepdims=True) + counts.shape[1]
+        log_probs = np.log((counts + 1.0) / totals)
+
+        self.languages, self.vocabulary, self.log_probs = languages, vocabulary, log_probs
+        logger.info(f"Built language profiles for {len(languages)} languages ({len(vocabulary)} n-grams)")
+
+    def detect(self, text, default='en', min_confidence=0.6):
+        """
+        Detect the language of a text.
+
+        Args:
+            text: Text to classify
+            default: Language returned when the text is too short or ambiguous
+            min_confidence: Posterior below which the default language is returned
+
+        Returns:
+            Tuple of (language code, confidence between 0 and 1)
+        """
+        if self.log_probs is None:
+            with self._lock:
+                if self.log_probs is None:
+                    self._build_profiles()
+
+        counts = char_ngrams(text, self.max_n)
+        if not counts:
+            return default, 0.0
+
+        unknown = len(self.vocabulary)
+        columns = np.fromiter((self.vocabulary.get(ngram, unknown) for ngram in counts), dtype=np.int64, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+
+        scores = self.log_probs[:, columns] @ weights
+        posterior = np.exp(scores - scores.max())
+        posterior /= posterior.sum()
+
+        best = int(np.argmax(posterior))
+        if posterior[best] < min_confidence and default in self.languages:
+            best = self.languages.index(default)
+        return self.languages[best], float(posterior[best])
+
+
+def load_language_resources(code, language_dir=LANGUAGE_DIR):
+    """
+    Load a language's stopwords, lexicons and intent vocabularies.
+
+    NLTK's stopword list for the language is merged in when its corpus is installed.
+
+    Args:
+        code: Language code
+        language_dir: Directory holding the resource files
+
+    Returns:
+        LanguageResources
+    """
+    resource = _read_resource_file(code, language_dir)
+
+    stop_words = set(resource.get('stopwords', []))
+    corpus = resource.get('stopwords_corpus')
+    if corpus:
+        try:
+            from nltk.corpus import stopwords
+            stop_words.update(stopwords.words(corpus))
+        except (LookupError, OSError):
+            logger.warning(f"NLTK stopwords for {corpus} not installed, using bundled list")
+
+    intents = {intent: tuple(keywords) for intent, keywords in resource.get('intents', {}).items()}
+
+    # Keyword -> intents, so scoring is one lookup per token
+    intent_index = {}
+    for intent, keywords in intents.items():
+        for keyword in keywords:
+            intent_index.setdefault(keyword, []).append(intent)
+
+    # Keyword -> preference interest category
+    interest_index = {}
+    for category, keywords in resource.get('interests', {}).items():
+        for keyword in keywords:
+            interest_index.setdefault(keyword, category)
+
+    sentiment = resource.get('sentiment', {})
+
+    return LanguageResources(
+        code=code,
+        name=resource.get('name', code),
+        stopwords=frozenset(stop_words),
+        intents=intents,
+        intent_index=intent_index,
+        positive_words=frozenset(sentiment.get('positive', [])),
+        negative_words=frozenset(sentiment.get('negative', [])),
+        location_indicators=frozenset(resource.get('location_indicators', [])),
+        interest_index=interest_index,
+        day_words=frozenset(resource.get('day_words', [])),
+        date_order=resource.get('date_order', 'mdy')
+    )
+
+
+class LanguageResourceCache:
+    """Loads language resources on demand and keeps the most recently used ones."""
+
+    def __init__(self, language_dir=LANGUAGE_DIR, max_languages=4):
+        """
+        Initialize the cache.
+
+        Args:
+            language_dir: Directory holding the resource files
+            max_languages: Maximum number of languages held in memory
+        """
+        self.language_dir = language_dir
+        self.max_languages = max_languages
+        self.supported = frozenset(available_languages(language_dir))
+        self.cache = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, code):
+        """
+        Get a language's resources, loading them if needed.
+
+        Args:
+            code: Language code
+
+        Returns:
+            LanguageResources
+
+        Raises:
+            ValueError: If the language is not supported
+        """
+        if code not in self.supported:
+            raise ValueError(f"Unsupported language: {code}")
+
+        with self._lock:
+            resources = self.cache.get(code)
+            if resources is not None:
+                self.cache.move_to_end(code)
+                return resources
+
+        resources = load_language_resources(code, self.language_dir)
+
+        with self._lock:
+            self.cache[code] = resources
+            self.cache.move_to_end(code)
+            self.loads += 1
+            while len(self.cache) > self.max_languages:
+                evicted, _ = self.cache.popitem(last=False)
+                self.evictions += 1
+                logger.info(f"Evicted language resources for {evicted}")
+
+        return resources
+
+    def get_status(self):
+        """
+        Get status information about loaded languages.
+
+        Returns:
+            Status information
+        """
+        return {
+            'supported': sorted(self.supported),
+            'loaded': list(self.cache),
+            'max_loaded': self.max_languages,
+            'loads': self.loads,
+            'evictions': self.evictions
+        }
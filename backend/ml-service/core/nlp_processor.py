@@ -4,8 +4,9 @@ from datetime import datetime
 import logging
 import nltk
 from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
+from core.language import LanguageDetector, LanguageResourceCache
+from utils.text_analysis import analyze_sentiment
 
 # Download required NLTK data
 try:
@@ -20,71 +21,150 @@ except LookupError:
 # Initialize logging
 logger = logging.getLogger(__name__)
 
+# ASCII punctuation plus the marks used by the supported non-English languages
+PUNCTUATION_PATTERN = re.compile('[' + re.escape(string.punctuation + '¿¡«»“”„’') + ']')
+
+# Simple regex pattern for dates (MM/DD/YYYY or similar)
+DATE_PATTERN = re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b')
+
+# ISO dates (YYYY-MM-DD)
+ISO_DATE_PATTERN = re.compile(r'\b\d{4}-\d{1,2}-\d{1,2}\b')
+
+# Longest destination name, in words, matched against the destination index
+MAX_DESTINATION_WORDS = 3
+
 class NLPProcessor:
     """Natural Language Processing for text analysis and understanding."""
     
-    def __init__(self):
-        """Initialize NLP processor."""
-        self.stop_words = set(stopwords.words('english'))
+    def __init__(self, default_language='en', max_languages=4):
+        """
+        Initialize NLP processor.
+        
+        Args:
+            default_language: Language used when detection finds no signal
+            max_languages: Maximum number of languages whose resources stay loaded
+        """
         self.lemmatizer = WordNetLemmatizer()
         self.initialized_date = datetime.now()
+        self.default_language = default_language
         
-        # Travel-related intents
-        self.travel_intents = {
-            'find_places': ['find', 'discover', 'recommend', 'suggestion', 'places', 'attractions'],
-            'plan_itinerary': ['plan', 'itinerary', 'schedule', 'agenda', 'trip'],
-            'food_dining': ['food', 'restaurant', 'eat', 'dining', 'cuisine', 'meal'],
-            'accommodation': ['hotel', 'stay', 'accommodation', 'lodge', 'sleep', 'room'],
-            'transportation': ['transport', 'travel', 'bus', 'train', 'taxi', 'car', 'flight'],
-            'activity': ['activity', 'tour', 'sightseeing', 'adventure', 'experience'],
-            'budget': ['cost', 'price', 'expense', 'budget', 'cheap', 'expensive'],
-            'weather': ['weather', 'climate', 'temperature', 'rain', 'sunny']
-        }
+        # Language profiles and per-language vocabularies load on first use
+        self.language_detector = LanguageDetector()
+        self.language_resources = LanguageResourceCache(max_languages=max_languages)
         
         logger.info("NLP Processor initialized")
     
-    def preprocess_text(self, text):
+    @property
+    def stop_words(self):
+        """Stopwords of the default language."""
+        return self.language_resources.get(self.default_language).stopwords
+    
+    @property
+    def travel_intents(self):
+        """Intent keywords of the default language."""
+        return self.language_resources.get(self.default_language).intents
+    
+    def detect_language(self, text):
+        """
+        Detect the language of a text.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            Dictionary with the language code and detection confidence
+        """
+        language, confidence = self.language_detector.detect(text, default=self.default_language)
+        return {
+            'language': language,
+            'confidence': round(confidence, 4)
+        }
+    
+    def _resources_for(self, text, language=None):
+        """Get the resources of the given language, detecting it if not given."""
+        if language is None:
+            language = self.detect_language(text)['language']
+        return self.language_resources.get(language)
+    
+    def preprocess_text(self, text, language=None):
         """
         Preprocess text for analysis.
         
         Args:
             text: Text to preprocess
+            language: Language code (detected if not given)
             
         Returns:
             Preprocessed tokens
         """
+        resources = self._resources_for(text, language)
+        
+        return self._content_tokens(self.tokenize(text), resources)
+    
+    def tokenize(self, text):
+        """
+        Lowercase, strip punctuation and tokenize, keeping stopwords.
+        
+        Args:
+            text: Text to tokenize
+            
+        Returns:
+            List of tokens
+        """
         # Convert to lowercase
         text = text.lower()
         
         # Remove punctuation
-        text = re.sub(f'[{string.punctuation}]', ' ', text)
+        text = PUNCTUATION_PATTERN.sub(' ', text)
         
         # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stopwords and lemmatize
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens if token not in self.stop_words]
+        return word_tokenize(text)
+    
+    def _content_tokens(self, tokens, resources):
+        """Remove stopwords; the WordNet lemmatizer only covers English."""
+        tokens = [token for token in tokens if token not in resources.stopwords]
+        if resources.code == 'en':
+            tokens = [self.lemmatizer.lemmatize(token) for token in tokens]
         
         return tokens
     
-    def extract_intent(self, text):
+    def extract_intent(self, text, language=None):
         """
         Extract user intent from text.
         
         Args:
             text: User text
+            language: Language code (detected if not given)
+            
+        Returns:
+            Dictionary with detected intents and confidence scores
+        """
+        resources = self._resources_for(text, language)
+        
+        return self._score_intents(self.preprocess_text(text, resources.code), resources)
+    
+    def _score_intents(self, tokens, resources):
+        """
+        Score intents by keyword matches among preprocessed tokens.
+        
+        Args:
+            tokens: Preprocessed tokens
+            resources: LanguageResources of the text
             
         Returns:
             Dictionary with detected intents and confidence scores
         """
-        tokens = self.preprocess_text(text)
+        # Count keyword matches per intent
+        matches = {}
+        for token in tokens:
+            for intent in resources.intent_index.get(token, ()):
+                matches[intent] = matches.get(intent, 0) + 1
         
         # Calculate intent scores
-        intent_scores = {}
-        for intent, keywords in self.travel_intents.items():
-            matches = sum(1 for token in tokens if token in keywords)
-            if matches > 0:
-                intent_scores[intent] = min(1.0, matches / len(keywords))
+        intent_scores = {
+            intent: min(1.0, count / len(resources.intents[intent]))
+            for intent, count in matches.items()
+        }
         
         # Sort by confidence score
         sorted_intents = sorted(intent_scores.items(), key=lambda x: x[1], reverse=True)
@@ -93,17 +173,19 @@ class NLPProcessor:
         result = {
             'primary': sorted_intents[0][0] if sorted_intents else 'unknown',
             'confidence': sorted_intents[0][1] if sorted_intents else 0.0,
-            'all_intents': dict(sorted_intents)
+            'all_intents': dict(sorted_intents),
+            'language': resources.code
         }
         
         return result
     
-    def extract_locations(self, text):
+    def extract_locations(self, text, language=None):
         """
         Extract location mentions from text.
         
         Args:
             text: Text to analyze
+            language: Language code (detected if not given)
             
         Returns:
             List of detected locations
@@ -111,15 +193,25 @@ class NLPProcessor:
         # This is a placeholder for more advanced NER
         # In a real implementation, use spaCy or another NER system
         
-        tokens = self.preprocess_text(text)
+        resources = self._resources_for(text, language)
+        
+        return self._locations_from_tokens(self.tokenize(text), resources)
+    
+    def _locations_from_tokens(self, tokens, resources):
+        """
+        Take the word after each location indicator as a location candidate.
         
+        Indicators such as "in" or "to" are stopwords, so this works on raw
+        tokens and skips candidates that are stopwords or numbers.
+        """
         # Simple pattern matching for demonstration
         locations = []
-        location_indicators = ['in', 'to', 'from', 'at', 'visit']
+        location_indicators = resources.location_indicators
         
-        for i, token in enumerate(tokens):
-            if token in location_indicators and i < len(tokens) - 1:
-                locations.append(tokens[i + 1])
+        for i, token in enumerate(tokens[:-1]):
+            candidate = tokens[i + 1]
+            if token in location_indicators and candidate not in resources.stopwords and not candidate.isdigit():
+                locations.append(candidate)
         
         return locations
     
@@ -136,9 +228,7 @@ class NLPProcessor:
         # This is a placeholder for more advanced date extraction
         # In a real implementation, use libraries like dateparser
         
-        # Simple regex pattern for dates (MM/DD/YYYY or similar)
-        date_pattern = r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b'
-        dates = re.findall(date_pattern, text)
+        dates = DATE_PATTERN.findall(text)
         
         result = {}
         if len(dates) >= 1:
@@ -148,6 +238,152 @@ class NLPProcessor:
             
         return result
     
+    def parse_dates(self, text, date_order='mdy'):
+        """
+        Parse the dates mentioned in text, in order of appearance.
+        
+        Args:
+            text: Text to analyze
+            date_order: 'mdy' or 'dmy' for slash/dash dates; ISO dates are always year first
+            
+        Returns:
+            List of datetime objects (unparseable mentions are skipped)
+        """
+        matches = [(match.start(), match.group(), True) for match in ISO_DATE_PATTERN.finditer(text)]
+        iso_spans = [(start, start + len(value)) for start, value, _ in matches]
+        matches.extend(
+            (match.start(), match.group(), False) for match in DATE_PATTERN.finditer(text)
+            if not any(start <= match.start() < end for start, end in iso_spans)
+        )
+        
+        dates = []
+        for _, value, is_iso in sorted(matches):
+            parts = [int(part) for part in re.split('[/-]', value)]
+            if is_iso:
+                year, month, day = parts
+            elif date_order == 'dmy':
+                day, month, year = parts
+            else:
+                month, day, year = parts
+            if year < 100:
+                year += 2000
+            try:
+                dates.append(datetime(year, month, day))
+            except ValueError:
+                continue
+        
+        return dates
+    
+    def _duration_from_tokens(self, tokens, resources):
+        """Find a trip length such as "5 days" among raw tokens."""
+        for i, token in enumerate(tokens[:-1]):
+            if token.isdigit() and tokens[i + 1] in resources.day_words:
+                return int(token)
+        return None
+    
+    def _interests_from_tokens(self, tokens, resources):
+        """Map raw tokens to preference interest categories, in order of first mention."""
+        interests = []
+        for token in tokens:
+            category = resources.interest_index.get(token)
+            if category is not None and category not in interests:
+                interests.append(category)
+        return interests
+    
+    def _match_destinations(self, tokens, destination_index):
+        """
+        Find known destinations among raw tokens, preferring the longest name.
+        
+        Args:
+            tokens: Raw tokens
+            destination_index: Dictionary mapping lowercase names to destination keys
+            
+        Returns:
+            List of destination keys in order of mention
+        """
+        matches = []
+        i = 0
+        while i < len(tokens):
+            for length in range(min(MAX_DESTINATION_WORDS, len(tokens) - i), 0, -1):
+                key = destination_index.get(' '.join(tokens[i:i + length]))
+                if key is not None:
+                    if key not in matches:
+                        matches.append(key)
+                    i += length
+                    break
+            else:
+                i += 1
+        return matches
+    
+    def parse_trip_request(self, text, language=None, destination_index=None, intent_classifier=None):
+        """
+        Parse a free-text trip request into structured fields.
+        
+        The text is tokenized once; intent, destination, duration and interest
+        extraction all reuse the same tokens.
+        
+        Args:
+            text: User text
+            language: Language code (detected if not given)
+            destination_index: Dictionary mapping lowercase names to destination keys (optional)
+            intent_classifier: Trained intent classifier (optional, keyword scoring otherwise)
+            
+        Returns:
+            Dictionary with language, intent, destination, dates, duration and interests
+        """
+        if language is None:
+            detected = self.detect_language(text)
+        else:
+            detected = {'language': language, 'confidence': 1.0}
+        resources = self.language_resources.get(detected['language'])
+        
+        tokens = self.tokenize(text)
+        
+        if intent_classifier is not None:
+            intent = intent_classifier.classify_tokens([tokens])[0]
+            intent['language'] = resources.code
+        else:
+            intent = self._score_intents(self._content_tokens(tokens, resources), resources)
+        
+        destinations = self._match_destinations(tokens, destination_index or {})
+        dates = self.parse_dates(text, resources.date_order)
+        duration = self._duration_from_tokens(tokens, resources)
+        interests = self._interests_from_tokens(tokens, resources)
+        
+        # Short texts are often misdetected; retry with the default language's vocabulary
+        if resources.code != self.default_language and (duration is None or not interests):
+            default_resources = self.language_resources.get(self.default_language)
+            if duration is None:
+                duration = self._duration_from_tokens(tokens, default_resources)
+            if not interests:
+                interests = self._interests_from_tokens(tokens, default_resources)
+        
+        return {
+            'language': detected,
+            'intent': intent,
+            'destination': destinations[0] if destinations else None,
+            'destinations': destinations,
+            'locations': self._locations_from_tokens(tokens, resources),
+            'startDate': dates[0] if dates else None,
+            'endDate': dates[1] if len(dates) > 1 else None,
+            'duration': duration,
+            'interests': interests
+        }
+    
+    def analyze_sentiment(self, text, language=None):
+        """
+        Analyze sentiment of text with the language's lexicon.
+        
+        Args:
+            text: Text to analyze
+            language: Language code (detected if not given)
+            
+        Returns:
+            Sentiment analysis results
+        """
+        resources = self._resources_for(text, language)
+        return analyze_sentiment(text, resources.positive_words, resources.negative_words)
+    
     def get_status(self):
         """
         Get status information about the NLP processor.
@@ -159,5 +395,6 @@ class NLPProcessor:
             'initialized': self.initialized_date.isoformat(),
             'uptime_seconds': (datetime.now() - self.initialized_date).total_seconds(),
             'models_loaded': ['basic_nltk'],
-            'intents_available': list(self.travel_intents.keys())
+            'intents_available': list(self.travel_intents.keys()),
+            'languages': self.language_resources.get_status()
         }
\ No newline at end of file
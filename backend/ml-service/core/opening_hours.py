@@ -0,0 +1,170 @@
+import logging
+import numpy as np
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Spread of one place's keys in the composite index: shifted starts lie in [0, 2 weeks + 1 day)
+KEY_SPAN = 3 * MINUTES_PER_WEEK
+
+
+def _parse_time(value):
+    """Convert an "HH:MM" time to minutes after midnight."""
+    hours, minutes = value.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_opening_hours(hours):
+    """
+    Convert weekly opening hours to merged minute-of-week intervals.
+
+    Args:
+        hours: Dictionary mapping weekday abbreviations ('mon'..'sun') to lists
+            of ["HH:MM", "HH:MM"] pairs; a closing time at or before the
+            opening time runs past midnight
+
+    Returns:
+        Sorted list of non-overlapping (start, end) minute-of-week intervals;
+        intervals running past the end of the week end after MINUTES_PER_WEEK
+    """
+    intervals = []
+    for weekday, periods in hours.items():
+        offset = WEEKDAYS.index(weekday.lower()[:3]) * MINUTES_PER_DAY
+        for opens, closes in periods:
+            start, end = _parse_time(opens), _parse_time(closes)
+            if end <= start:
+                end += MINUTES_PER_DAY
+            intervals.append((offset + start, offset + end))
+
+    return _merge(intervals)
+
+
+def _merge(intervals):
+    """Merge overlapping or touching intervals into a sorted list."""
+    # Touching periods merge so a window spanning e.g. 12:00 is still inside one interval
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _weekly_intervals(hours):
+    """
+    Merged intervals of a week together with a copy one week earlier.
+
+    The copy covers periods running past Sunday midnight into Monday; it is
+    merged with the real intervals so Monday windows covered by the two
+    together are found in a single interval.
+    """
+    intervals = parse_opening_hours(hours)
+    return _merge(intervals + [(start - MINUTES_PER_WEEK, end - MINUTES_PER_WEEK) for start, end in intervals])
+
+
+def is_open(hours, weekday, start_minute, end_minute):
+    """
+    Check whether a place is open for a whole time window.
+
+    Args:
+        hours: Opening hours in the format of parse_opening_hours, or None for always open
+        weekday: Day of the window (0 = Monday)
+        start_minute: Window start in minutes after midnight
+        end_minute: Window end in minutes after midnight
+
+    Returns:
+        True if one opening period covers the window
+    """
+    if not hours:
+        return True
+
+    start = weekday * MINUTES_PER_DAY + start_minute
+    end = weekday * MINUTES_PER_DAY + end_minute
+    return any(opens <= start and end <= closes for opens, closes in _weekly_intervals(hours))
+
+
+class OpeningHoursIndex:
+    """
+    Answers "which of these candidate places are open for this whole window".
+
+    The opening intervals of all places live in one array sorted by
+    (place, start). Per-place intervals, including the copies one week earlier
+    covering periods past Sunday midnight, are merged and do not overlap, so
+    only a place's last interval starting at or before the window can cover
+    it; one vectorized binary search finds that interval for every candidate
+    at once, so a query costs O(c log n) for c candidates.
+    """
+
+    def __init__(self, places):
+        """
+        Build the index.
+
+        Args:
+            places: Place dicts; 'hours' holds weekly opening hours (places without are always open)
+        """
+        owners, starts, ends = [], [], []
+        always_open = np.zeros(len(places), dtype=bool)
+
+        for i, place in enumerate(places):
+            hours = place.get('hours')
+            if not hours:
+                always_open[i] = True
+                continue
+            for start, end in _weekly_intervals(hours):
+                owners.append(i)
+                starts.append(start)
+                ends.append(end)
+
+        owners = np.asarray(owners, dtype=np.int64)
+        starts = np.asarray(starts, dtype=np.int64)
+        order = np.lexsort((starts, owners))
+
+        # Composite (place, start) keys; starts are shifted to be non-negative
+        self.keys = owners[order] * KEY_SPAN + starts[order] + MINUTES_PER_WEEK
+        self.owners = owners[order]
+        self.ends = np.asarray(ends, dtype=np.int64)[order]
+        self.always_open = always_open
+
+    def open_mask(self, candidates, weekday, start_minute, end_minute):
+        """
+        Check which candidate places are open for a whole time window.
+
+        Args:
+            candidates: Array of place indices
+            weekday: Day of the window (0 = Monday)
+            start_minute: Window start in minutes after midnight
+            end_minute: Window end in minutes after midnight
+
+        Returns:
+            Boolean array aligned with candidates
+        """
+        candidates = np.asarray(candidates, dtype=np.int64)
+        start = weekday * MINUTES_PER_DAY + start_minute
+        end = weekday * MINUTES_PER_DAY + end_minute
+
+        # Last interval of each candidate starting at or before the window start
+        positions = np.searchsorted(self.keys, candidates * KEY_SPAN + start + MINUTES_PER_WEEK, side='right') - 1
+        positions = np.maximum(positions, 0)
+
+        covered = np.zeros(len(candidates), dtype=bool)
+        if len(self.keys):
+            covered = (self.owners[positions] == candidates) & (self.ends[positions] >= end)
+        return covered | self.always_open[candidates]
+
+    def get_status(self):
+        """
+        Get status information about the index.
+
+        Returns:
+            Status information
+        """
+        return {
+            'places': len(self.always_open),
+            'intervals': len(self.keys),
+            'always_open': int(self.always_open.sum())
+        }
@@ -1,22 +1,194 @@
+import copy
 import json
 import random
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
 from datetime import datetime, timedelta
+from itertools import permutations
+from types import MappingProxyType
 import logging
 import os
+from core.budget_optimizer import optimize_trip
+from core.opening_hours import OpeningHoursIndex, is_open
+from core.spatial_index import SpatialIndex
+from utils.serialization import RawJSON
 
 # Initialize logging
 logger = logging.getLogger(__name__)
 
+# Other names users write for the sample destinations, matched in free-text requests
+DESTINATION_ALIASES = {
+    "new york": ["nyc", "nueva york", "nova york", "new york city"],
+    "paris": ["parís", "parigi"],
+    "tokyo": ["tokio", "tóquio"],
+    "rome": ["roma", "rom"],
+    "london": ["londres", "londra", "londen"]
+}
+
+# Cost ranges per budget level and transportation type
+COST_RANGES = {
+    "budget": (5, 25),
+    "mid-range": (25, 75),
+    "luxury": (75, 200)
+}
+
+TRANSPORTATION_COST_RANGES = {
+    "public": (2, 10),
+    "rental": (20, 50),
+    "tour": (10, 30)
+}
+
+# Closest places the scheduler picks from when choosing the next stop
+NEAREST_CHOICES = 3
+
+# Per-destination place indexes over the same place list, with the weekly hours of places that have them
+PlaceIndexes = namedtuple('PlaceIndexes', ['spatial', 'hours', 'hours_by_name'])
+
+# Resolved destination: frozen info, its pre-serialized JSON and a strong ETag
+CachedDestination = namedtuple('CachedDestination', ['key', 'info', 'fragment', 'etag'])
+
+
+def _freeze(value):
+    """
+    Recursively convert dicts and lists into read-only equivalents.
+    
+    Args:
+        value: Value to freeze
+        
+    Returns:
+        MappingProxyType/tuple based copy of the value
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _to_minutes(value):
+    """Convert an "H:MM" time to minutes after midnight."""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def _format_minutes(minutes):
+    """Convert minutes after midnight to an "H:MM" time."""
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+def _settings_key(settings):
+    """Hashable key of itinerary settings, used to share templates between identical settings."""
+    return (
+        tuple(sorted(settings['preferred_categories'])), settings['accommodation_type'],
+        settings['transportation_preference'], settings['activities_per_day']
+    )
+
+def _activity_span(activity):
+    """Get an activity's (start, end) minutes, raising ValueError if its times are missing or malformed."""
+    try:
+        start, end = _to_minutes(activity["startTime"]), _to_minutes(activity["endTime"])
+    except (KeyError, AttributeError, ValueError):
+        start = end = None
+    if start is None or not 0 <= start <= 24 * 60 or not 0 <= end <= 24 * 60:
+        raise ValueError(f"Activity {activity.get('title')!r} needs startTime and endTime as H:MM")
+    return start, end
+
+def _validate_itinerary(itinerary):
+    """Check the shape of a client-supplied itinerary, raising ValueError if it is malformed."""
+    for number, entry in enumerate(itinerary, start=1):
+        if not isinstance(entry, dict) or not isinstance(entry.get("activities", []), list):
+            raise ValueError(f"Day {number} must be an object with a list of activities")
+        if entry.get("date") is not None:
+            try:
+                _entry_date(entry)
+            except (TypeError, ValueError):
+                raise ValueError(f"Day {number} has an invalid date")
+        for activity in entry.get("activities", []):
+            if not isinstance(activity, dict) or not isinstance(activity.get("title", ""), str):
+                raise ValueError(f"Day {number} has an activity that is not an object with a title")
+
+def _entry_date(day_entry):
+    """Get the calendar date of an itinerary day entry, or None if it has none."""
+    value = day_entry.get("date")
+    return datetime.fromisoformat(value).date() if value else None
+
+def _last_location(activities):
+    """Get the (lat, lon) of the latest activity that has coordinates, or None."""
+    for activity in reversed(activities):
+        lat, lon = activity.get("lat"), activity.get("lon")
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in (lat, lon)):
+            return lat, lon
+    return None
+
+def _fit_to_slots(items, open_slots, n_slots):
+    """
+    Order a day's planned items into its slots so that each is open during its slot.
+    
+    Args:
+        items: Item indices planned for the day
+        open_slots: Per item, whether it is open during each of the day's slots
+        n_slots: Number of activity slots in the day
+        
+    Returns:
+        List with an item index, or None for a free slot, per slot; items open in no free slot are dropped
+    """
+    # Days have at most three activity slots, so every order can be tried
+    best = []
+    for order in permutations(range(n_slots), len(items)):
+        fitted = [(slot, item) for item, slot, open_then in zip(items, order, open_slots)
+                  if open_then[slot]]
+        if len(fitted) > len(best):
+            best = fitted
+    
+    slots = [None] * n_slots
+    for slot, item in best:
+        slots[slot] = item
+    return slots
+
 class RecommendationEngine:
     """Recommendation engine for generating personalized travel itineraries."""
     
-    def __init__(self):
-        """Initialize recommendation engine."""
+    def __init__(self, unknown_cache_size=1024, place_cell_km=0.5, template_cache_size=256):
+        """
+        Initialize recommendation engine.
+        
+        Args:
+            unknown_cache_size: Maximum number of cached stubs for unknown destinations
+            place_cell_km: Grid cell size of the per-destination place indexes
+            template_cache_size: Maximum number of itineraries kept as fallback templates
+        """
         self.initialized_date = datetime.now()
         
         # Load destination data (in a real system, this would come from a database)
         self.destinations = self._load_sample_destinations()
         
+        # Immutable, pre-serialized destination info keyed by lowercase name
+        self.destination_cache = {
+            key: self._build_cached_destination(key, info)
+            for key, info in self.destinations.items()
+        }
+        
+        # Lowercase destination keys and display names -> destination key, for text matching
+        self.destination_index = {}
+        for key, info in self.destinations.items():
+            self.destination_index[key] = key
+            self.destination_index[info['name'].lower()] = key
+            for alias in DESTINATION_ALIASES.get(key, []):
+                self.destination_index[alias] = key
+        
+        # Spatial index of places per destination key; replaced wholesale by load_places
+        self.place_cell_km = place_cell_km
+        self.place_indexes = self._sample_place_indexes()
+        
+        # Bounded LRU of generic stubs for destinations we have no data for
+        self.unknown_cache_size = unknown_cache_size
+        self.unknown_destination_cache = OrderedDict()
+        self._unknown_cache_lock = threading.Lock()
+        
+        # Bounded LRU of recent full itineraries per (destination, duration, itinerary settings),
+        # served when a deadline runs out
+        self.template_cache_size = template_cache_size
+        self.itinerary_templates = OrderedDict()
+        self._template_lock = threading.Lock()
+        
         # Activity categories
         self.activity_categories = [
             'sightseeing', 'food', 'shopping', 'entertainment', 
@@ -38,91 +210,256 @@ class RecommendationEngine:
         return {
             "new york": {
                 "name": "New York City",
+                "lat": 40.7128,
+                "lon": -74.006,
                 "country": "United States",
                 "description": "The Big Apple, known for its iconic skyline, diverse culture, and vibrant arts scene.",
                 "popular_activities": [
-                    {"name": "Visit Times Square", "category": "sightseeing"},
-                    {"name": "Explore Central Park", "category": "nature"},
-                    {"name": "Visit the Metropolitan Museum of Art", "category": "culture"},
-                    {"name": "Walk across Brooklyn Bridge", "category": "sightseeing"},
-                    {"name": "See a Broadway show", "category": "entertainment"}
+                    {"name": "Visit Times Square", "category": "sightseeing", "lat": 40.758, "lon": -73.9855},
+                    {"name": "Explore Central Park", "category": "nature", "lat": 40.7829, "lon": -73.9654,
+                     "hours": {"mon": [["06:00", "01:00"]], "tue": [["06:00", "01:00"]], "wed": [["06:00", "01:00"]], "thu": [["06:00", "01:00"]], "fri": [["06:00", "01:00"]], "sat": [["06:00", "01:00"]], "sun": [["06:00", "01:00"]]}},
+                    {"name": "Visit the Metropolitan Museum of Art", "category": "culture", "lat": 40.7794, "lon": -73.9632,
+                     "hours": {"mon": [["10:00", "17:00"]], "tue": [["10:00", "17:00"]], "thu": [["10:00", "17:00"]], "fri": [["10:00", "17:00"]], "sat": [["10:00", "17:00"]], "sun": [["10:00", "17:00"]]}},
+                    {"name": "Walk across Brooklyn Bridge", "category": "sightseeing", "lat": 40.7061, "lon": -73.9969},
+                    {"name": "See a Broadway show", "category": "entertainment", "lat": 40.759, "lon": -73.9845,
+                     "hours": {"tue": [["19:00", "22:30"]], "wed": [["19:00", "22:30"]], "thu": [["19:00", "22:30"]], "fri": [["19:00", "22:30"]], "sat": [["19:00", "22:30"]], "sun": [["19:00", "22:30"]]}}
                 ]
             },
             "paris": {
                 "name": "Paris",
+                "lat": 48.8566,
+                "lon": 2.3522,
                 "country": "France",
                 "description": "The City of Light, famous for its art, fashion, gastronomy, and culture.",
                 "popular_activities": [
-                    {"name": "Visit the Eiffel Tower", "category": "sightseeing"},
-                    {"name": "Explore the Louvre Museum", "category": "culture"},
-                    {"name": "Walk along the Seine River", "category": "sightseeing"},
-                    {"name": "Visit Notre-Dame Cathedral", "category": "culture"},
-                    {"name": "Enjoy French cuisine", "category": "food"}
+                    {"name": "Visit the Eiffel Tower", "category": "sightseeing", "lat": 48.8584, "lon": 2.2945,
+                     "hours": {"mon": [["09:30", "23:45"]], "tue": [["09:30", "23:45"]], "wed": [["09:30", "23:45"]], "thu": [["09:30", "23:45"]], "fri": [["09:30", "23:45"]], "sat": [["09:30", "23:45"]], "sun": [["09:30", "23:45"]]}},
+                    {"name": "Explore the Louvre Museum", "category": "culture", "lat": 48.8606, "lon": 2.3376,
+                     "hours": {"mon": [["09:00", "18:00"]], "wed": [["09:00", "18:00"]], "thu": [["09:00", "18:00"]], "fri": [["09:00", "18:00"]], "sat": [["09:00", "18:00"]], "sun": [["09:00", "18:00"]]}},
+                    {"name": "Walk along the Seine River", "category": "sightseeing", "lat": 48.857, "lon": 2.3413},
+                    {"name": "Visit Notre-Dame Cathedral", "category": "culture", "lat": 48.853, "lon": 2.3499,
+                     "hours": {"mon": [["07:45", "19:00"]], "tue": [["07:45", "19:00"]], "wed": [["07:45", "19:00"]], "thu": [["07:45", "19:00"]], "fri": [["07:45", "19:00"]], "sat": [["07:45", "19:00"]], "sun": [["07:45", "19:00"]]}},
+                    {"name": "Enjoy French cuisine", "category": "food", "lat": 48.859, "lon": 2.362}
                 ]
             },
             "tokyo": {
                 "name": "Tokyo",
+                "lat": 35.6762,
+                "lon": 139.6503,
                 "country": "Japan",
                 "description": "A dynamic blend of traditional culture and cutting-edge technology.",
                 "popular_activities": [
-                    {"name": "Visit Senso-ji Temple", "category": "culture"},
-                    {"name": "Explore Shibuya Crossing", "category": "sightseeing"},
-                    {"name": "Shop in Ginza", "category": "shopping"},
-                    {"name": "Visit Tokyo Skytree", "category": "sightseeing"},
-                    {"name": "Try authentic Japanese cuisine", "category": "food"}
+                    {"name": "Visit Senso-ji Temple", "category": "culture", "lat": 35.7148, "lon": 139.7967,
+                     "hours": {"mon": [["06:00", "17:00"]], "tue": [["06:00", "17:00"]], "wed": [["06:00", "17:00"]], "thu": [["06:00", "17:00"]], "fri": [["06:00", "17:00"]], "sat": [["06:00", "17:00"]], "sun": [["06:00", "17:00"]]}},
+                    {"name": "Explore Shibuya Crossing", "category": "sightseeing", "lat": 35.6595, "lon": 139.7005},
+                    {"name": "Shop in Ginza", "category": "shopping", "lat": 35.6717, "lon": 139.765},
+                    {"name": "Visit Tokyo Skytree", "category": "sightseeing", "lat": 35.7101, "lon": 139.8107,
+                     "hours": {"mon": [["10:00", "21:00"]], "tue": [["10:00", "21:00"]], "wed": [["10:00", "21:00"]], "thu": [["10:00", "21:00"]], "fri": [["10:00", "21:00"]], "sat": [["10:00", "21:00"]], "sun": [["10:00", "21:00"]]}},
+                    {"name": "Try authentic Japanese cuisine", "category": "food", "lat": 35.6655, "lon": 139.7707}
                 ]
             },
             "rome": {
                 "name": "Rome",
+                "lat": 41.9028,
+                "lon": 12.4964,
                 "country": "Italy",
                 "description": "The Eternal City with thousands of years of history and culture.",
                 "popular_activities": [
-                    {"name": "Visit the Colosseum", "category": "sightseeing"},
-                    {"name": "Explore the Vatican Museums", "category": "culture"},
-                    {"name": "Throw a coin in the Trevi Fountain", "category": "sightseeing"},
-                    {"name": "Try authentic Italian pizza and pasta", "category": "food"},
-                    {"name": "Visit the Roman Forum", "category": "culture"}
+                    {"name": "Visit the Colosseum", "category": "sightseeing", "lat": 41.8902, "lon": 12.4922,
+                     "hours": {"mon": [["09:00", "19:00"]], "tue": [["09:00", "19:00"]], "wed": [["09:00", "19:00"]], "thu": [["09:00", "19:00"]], "fri": [["09:00", "19:00"]], "sat": [["09:00", "19:00"]], "sun": [["09:00", "19:00"]]}},
+                    {"name": "Explore the Vatican Museums", "category": "culture", "lat": 41.9065, "lon": 12.4536,
+                     "hours": {"mon": [["08:00", "19:00"]], "tue": [["08:00", "19:00"]], "wed": [["08:00", "19:00"]], "thu": [["08:00", "19:00"]], "fri": [["08:00", "19:00"]], "sat": [["08:00", "19:00"]]}},
+                    {"name": "Throw a coin in the Trevi Fountain", "category": "sightseeing", "lat": 41.9009, "lon": 12.4833},
+                    {"name": "Try authentic Italian pizza and pasta", "category": "food", "lat": 41.8894, "lon": 12.47},
+                    {"name": "Visit the Roman Forum", "category": "culture", "lat": 41.8925, "lon": 12.4853,
+                     "hours": {"mon": [["09:00", "19:00"]], "tue": [["09:00", "19:00"]], "wed": [["09:00", "19:00"]], "thu": [["09:00", "19:00"]], "fri": [["09:00", "19:00"]], "sat": [["09:00", "19:00"]], "sun": [["09:00", "19:00"]]}}
                 ]
             },
             "london": {
                 "name": "London",
+                "lat": 51.5074,
+                "lon": -0.1278,
                 "country": "United Kingdom",
                 "description": "A diverse and historic city with iconic landmarks and cultural attractions.",
                 "popular_activities": [
-                    {"name": "Visit the Tower of London", "category": "culture"},
-                    {"name": "Explore the British Museum", "category": "culture"},
-                    {"name": "Watch the Changing of the Guard at Buckingham Palace", "category": "sightseeing"},
-                    {"name": "Shop at Camden Market", "category": "shopping"},
-                    {"name": "Ride the London Eye", "category": "sightseeing"}
+                    {"name": "Visit the Tower of London", "category": "culture", "lat": 51.5081, "lon": -0.0759,
+                     "hours": {"mon": [["09:00", "17:30"]], "tue": [["09:00", "17:30"]], "wed": [["09:00", "17:30"]], "thu": [["09:00", "17:30"]], "fri": [["09:00", "17:30"]], "sat": [["09:00", "17:30"]], "sun": [["09:00", "17:30"]]}},
+                    {"name": "Explore the British Museum", "category": "culture", "lat": 51.5194, "lon": -0.127,
+                     "hours": {"mon": [["10:00", "17:00"]], "tue": [["10:00", "17:00"]], "wed": [["10:00", "17:00"]], "thu": [["10:00", "17:00"]], "fri": [["10:00", "17:00"]], "sat": [["10:00", "17:00"]], "sun": [["10:00", "17:00"]]}},
+                    {"name": "Watch the Changing of the Guard at Buckingham Palace", "category": "sightseeing", "lat": 51.5014, "lon": -0.1419},
+                    {"name": "Shop at Camden Market", "category": "shopping", "lat": 51.5415, "lon": -0.1466},
+                    {"name": "Ride the London Eye", "category": "sightseeing", "lat": 51.5033, "lon": -0.1196,
+                     "hours": {"mon": [["11:00", "18:00"]], "tue": [["11:00", "18:00"]], "wed": [["11:00", "18:00"]], "thu": [["11:00", "18:00"]], "fri": [["11:00", "18:00"]], "sat": [["11:00", "18:00"]], "sun": [["11:00", "18:00"]]}}
                 ]
             }
         }
     
-    def get_destination_info(self, destination):
+    def _build_place_indexes(self, places):
+        """Build the spatial and opening-hours indexes of one destination's places."""
+        spatial = SpatialIndex(places, cell_km=self.place_cell_km)
+        hours_by_name = {place['name']: place['hours'] for place in spatial.places if place.get('name') and place.get('hours')}
+        return PlaceIndexes(spatial, OpeningHoursIndex(spatial.places), hours_by_name)
+    
+    def _sample_place_indexes(self):
+        """Build place indexes over the sample destinations' popular activities."""
+        return {
+            key: self._build_place_indexes(info['popular_activities'])
+            for key, info in self.destinations.items()
+        }
+    
+    def load_places(self, path):
         """
-        Get information about a destination.
+        Index the places written by the ingestion pipeline.
+        
+        Args:
+            path: Directory containing places.json, mapping destination names to
+                lists of places with name, category, lat, lon and optional weekly hours
+            
+        Returns:
+            Dictionary of PlaceIndexes by destination key, now active; requests
+            that already read the previous one keep using it
+        """
+        with open(os.path.join(path, 'places.json')) as f:
+            places_by_destination = json.load(f)
+        
+        place_indexes = self._sample_place_indexes()
+        for destination, places in places_by_destination.items():
+            key = self.destination_index.get(destination.lower(), destination.lower())
+            place_indexes[key] = self._build_place_indexes(places)
+        
+        # Swap all indexes at once so readers never see a partial update
+        self.place_indexes = place_indexes
+        
+        logger.info(f"Indexed {sum(len(index.spatial) for index in place_indexes.values())} places from {path}")
+        return place_indexes
+    
+    def get_place_index(self, destination):
+        """
+        Get the indexes of a destination's places.
+        
+        Args:
+            destination: Destination name, alias or display name
+            
+        Returns:
+            PlaceIndexes, or None if no places are known
+        """
+        key = destination.lower()
+        return self.place_indexes.get(self.destination_index.get(key, key))
+    
+    def find_nearby_places(self, destination, lat, lon, radius_km=None, limit=10, category=None):
+        """
+        Find a destination's places near a point.
+        
+        Args:
+            destination: Destination name
+            lat: Latitude of the point
+            lon: Longitude of the point
+            radius_km: Only return places within this distance (default: the nearest places)
+            limit: Maximum number of places to return
+            category: Only return places in this category (optional)
+            
+        Returns:
+            List of places with their distance, closest first
+            
+        Raises:
+            ValueError: If no places are known for the destination
+        """
+        indexes = self.get_place_index(destination)
+        if indexes is None or not len(indexes.spatial):
+            raise ValueError(f"No places known for {destination}")
+        index = indexes.spatial
+        
+        categories = [category] if category else None
+        if radius_km is not None:
+            matches = index.within_radius(lat, lon, radius_km, limit=limit, categories=categories)
+        else:
+            matches = index.nearest(lat, lon, k=limit, categories=categories)
+        
+        return [
+            {**match.place, "distanceKm": round(match.distance_km, 3)}
+            for match in matches
+        ]
+    
+    def _build_cached_destination(self, key, info):
+        """
+        Freeze and pre-serialize destination information.
+        
+        Args:
+            key: Destination key (lowercase name)
+            info: Destination information dict
+            
+        Returns:
+            CachedDestination entry
+        """
+        fragment = RawJSON.from_obj(info)
+        etag = hashlib.sha1(fragment.data).hexdigest()
+        
+        return CachedDestination(key, _freeze(info), fragment, etag)
+    
+    def resolve_destination(self, destination):
+        """
+        Resolve a destination to its cached, immutable entry.
         
         Args:
             destination: Destination name
             
         Returns:
-            Destination information or None if not found
+            CachedDestination entry (a generic stub if the destination is unknown)
         """
         destination_key = destination.lower()
         
         # Check if destination exists in our data
-        if destination_key in self.destinations:
-            return self.destinations[destination_key]
+        cached = self.destination_cache.get(destination_key)
+        if cached is not None:
+            return cached
         
-        # If not found, return a generic response
-        return {
+        with self._unknown_cache_lock:
+            cached = self.unknown_destination_cache.get(destination_key)
+            if cached is not None:
+                self.unknown_destination_cache.move_to_end(destination_key)
+                return cached
+        
+        # If not found, cache a generic response
+        cached = self._build_cached_destination(destination_key, {
             "name": destination.title(),
             "country": "Unknown",
             "description": f"Information about {destination} is currently limited.",
             "popular_activities": []
-        }
+        })
+        
+        with self._unknown_cache_lock:
+            self.unknown_destination_cache[destination_key] = cached
+            if len(self.unknown_destination_cache) > self.unknown_cache_size:
+                self.unknown_destination_cache.popitem(last=False)
+        
+        return cached
+    
+    def get_destination_info(self, destination):
+        """
+        Get information about a destination.
+        
+        Args:
+            destination: Destination name
+            
+        Returns:
+            Read-only destination information
+        """
+        return self.resolve_destination(destination).info
+    
+    def get_destination_fragment(self, destination):
+        """
+        Get pre-serialized information about a destination.
+        
+        Args:
+            destination: Destination name
+            
+        Returns:
+            RawJSON fragment with the destination information
+        """
+        return self.resolve_destination(destination).fragment
     
-    def generate_itinerary(self, user_id, destination, duration, preferences=None):
+    def generate_itinerary(self, user_id, destination, duration, preferences=None, destination_info=None,
+                           budget_plan=None, start_date=None, deadline=None):
         """
         Generate a personalized itinerary.
         
@@ -131,6 +468,11 @@ class RecommendationEngine:
             destination: Travel destination
             duration: Trip duration in days
             preferences: User preferences dict
+            destination_info: Already resolved destination information (optional)
+            budget_plan: Plan from plan_within_budget fixing activities and costs (optional)
+            start_date: Date of day 1; activities are then only scheduled while open (optional)
+            deadline: Request Deadline; once nearly spent, the remaining days use
+                popular activities only instead of the place index (optional)
             
         Returns:
             Generated itinerary
@@ -138,11 +480,220 @@ class RecommendationEngine:
         logger.info(f"Generating itinerary for user {user_id} to {destination} for {duration} days")
         
         # Get destination information
-        destination_info = self.get_destination_info(destination)
+        if destination_info is None:
+            destination_info = self.get_destination_info(destination)
+        
+        settings = self._itinerary_settings(preferences)
+        
+        # Read the place index once, so a concurrent reload does not change it mid-request
+        places = self.get_place_index(destination_info.get("name", ""))
         
-        # Initialize itinerary
+        # Generate daily activities, avoiding a repeat of the previous day's picks
         itinerary = []
+        previous_titles = set()
+        popular_only = False
+        for day in range(1, duration + 1):
+            if not popular_only and deadline is not None and deadline.nearly_spent():
+                popular_only = True
+                deadline.degrade('itinerary')
+            
+            date = start_date + timedelta(days=day - 1) if start_date is not None else None
+            day_entry = self._generate_day(
+                day, destination_info, settings, exclude_titles=previous_titles, budget_plan=budget_plan, date=date,
+                places=None if popular_only else places
+            )
+            previous_titles = {activity["title"] for activity in day_entry["activities"]}
+            itinerary.append(day_entry)
+        
+        # Only complete itineraries become fallback templates; store a copy, the caller owns this one
+        if not popular_only and budget_plan is None:
+            template_key = (destination_info.get("name", ""), duration, _settings_key(settings))
+            template = copy.deepcopy(itinerary)
+            with self._template_lock:
+                self.itinerary_templates[template_key] = template
+                self.itinerary_templates.move_to_end(template_key)
+                if len(self.itinerary_templates) > self.template_cache_size:
+                    self.itinerary_templates.popitem(last=False)
+        
+        return itinerary
+    
+    def itinerary_template(self, destination_info, duration, preferences=None, start_date=None):
+        """
+        Get a copy of a recent itinerary for the same destination, trip length and itinerary settings.
+        
+        Used as the cheapest answer when a request's deadline has run out. Only
+        itineraries generated for the same interests, tiers and pace are reused.
+        After re-dating, activities closed on their new weekday are replaced
+        with popular activities that are open.
+        
+        Args:
+            destination_info: Destination information
+            duration: Trip duration in days
+            preferences: User preferences dict (optional)
+            start_date: Date of day 1, used to re-date the days (optional)
+            
+        Returns:
+            Itinerary, or None if no template is cached
+        """
+        settings = self._itinerary_settings(preferences)
+        with self._template_lock:
+            template = self.itinerary_templates.get(
+                (destination_info.get("name", ""), duration, _settings_key(settings))
+            )
+        if template is None:
+            return None
+        
+        itinerary = copy.deepcopy(template)
+        places = self.get_place_index(destination_info.get("name", ""))
+        for day_entry in itinerary:
+            day_entry.pop("date", None)
+            if start_date is not None:
+                date = start_date + timedelta(days=day_entry["day"] - 1)
+                day_entry["date"] = date.date().isoformat()
+                self._replace_closed_activities(day_entry, destination_info, settings, places, date.weekday())
+        return itinerary
+    
+    def _replace_closed_activities(self, day_entry, destination_info, settings, places, weekday):
+        """
+        Swap activities of a re-dated day that are closed during their slot for open popular activities.
+        
+        Args:
+            day_entry: Day entry, changed in place
+            destination_info: Destination information
+            settings: Itinerary settings from _itinerary_settings
+            places: PlaceIndexes of the destination (optional)
+            weekday: New day of the week (0 = Monday)
+        """
+        activities = day_entry["activities"]
+        used_titles = {activity["title"] for activity in activities}
+        
+        for index, activity in enumerate(activities):
+            if activity["title"] in ("Lunch", "Dinner") or activity.get("category") == "transportation":
+                continue
+            
+            hours = places.hours_by_name.get(activity["title"]) if places is not None else None
+            if hours is None:
+                hours = next(
+                    (popular.get("hours") for popular in destination_info.get("popular_activities", [])
+                     if popular.get("name") == activity["title"]),
+                    None
+                )
+            start, end = _to_minutes(activity["startTime"]), _to_minutes(activity["endTime"])
+            if is_open(hours, weekday, start, end):
+                continue
+            
+            time_of_day = "morning" if start < 12 * 60 else "afternoon" if start < 19 * 60 else "evening"
+            activities[index] = self._generate_activity(
+                destination_info, time_of_day, settings['preferred_categories'], used_titles,
+                weekday=weekday, window=(activity["startTime"], activity["endTime"])
+            )
+            used_titles.add(activities[index]["title"])
+    
+    def plan_within_budget(self, duration, preferences, activity_table, scores, total_budget, daily_budget=None,
+                           start_date=None):
+        """
+        Choose catalog activities maximizing preference score within a trip budget.
+        
+        Meals and transportation are charged at the top of their price range, so
+        the planned total is a conservative estimate. The slot times are fixed
+        here; with a start date, activities are only planned on days and in
+        slots during which they are open.
+        
+        Args:
+            duration: Trip duration in days
+            preferences: User preferences dict (optional)
+            activity_table: ActivityTable with the catalog's costs
+            scores: Preference score per catalog activity
+            total_budget: Budget for the whole trip
+            daily_budget: Budget per day (optional)
+            start_date: Date of day 1 (optional)
+            
+        Returns:
+            Dictionary with the activities per day (None for a free slot), the
+            slot windows per day, fixed and daily costs, the achieved score and
+            the score of the selection before it was spread over days
+            
+        Raises:
+            ValueError: If the budget does not cover meals and transportation
+        """
+        settings = self._itinerary_settings(preferences)
+        
+        meal_cost = COST_RANGES.get(settings['accommodation_type'], COST_RANGES["luxury"])[1]
+        transportation_cost = 0
+        if settings['transportation_preference'] != 'walking':
+            transportation_cost = TRANSPORTATION_COST_RANGES.get(
+                settings['transportation_preference'], TRANSPORTATION_COST_RANGES["tour"]
+            )[1]
+        fixed_cost = 2 * meal_cost + transportation_cost
+        
+        if total_budget < fixed_cost * duration or (daily_budget is not None and daily_budget < fixed_cost):
+            raise ValueError(f"Budget does not cover meals and transportation ({fixed_cost} per day)")
+        
+        # Every activity slot except lunch and dinner is open to the optimizer
+        slots = ["morning"] + ["afternoon"] * (settings['activities_per_day'] - 2)
+        windows = [[self._slot_times(time_of_day) for time_of_day in slots] for _ in range(duration)]
+        
+        # Activities closed during every slot of a day are kept off that day before the selection runs
+        open_slots = allowed = None
+        if start_date is not None:
+            weekdays = [(start_date + timedelta(days=day)).weekday() for day in range(duration)]
+            open_slots = [
+                [
+                    [is_open(activity.get("hours"), weekday, _to_minutes(start), _to_minutes(end))
+                     for start, end in day_windows]
+                    for weekday, day_windows in zip(weekdays, windows)
+                ]
+                for activity in activity_table.activities
+            ]
+            allowed = [[any(day_slots) for day_slots in activity_slots] for activity_slots in open_slots]
+        
+        plan = optimize_trip(
+            activity_table.costs,
+            scores,
+            duration,
+            len(slots),
+            total_budget - fixed_cost * duration,
+            daily_budget=None if daily_budget is None else daily_budget - fixed_cost,
+            allowed=allowed
+        )
+        
+        plan_days = plan['days']
+        if open_slots is not None:
+            plan_days = [
+                _fit_to_slots(day_items, [open_slots[i][day] for i in day_items], len(slots))
+                for day, day_items in enumerate(plan_days)
+            ]
+        
+        days = [
+            [activity_table.activities[i] if i is not None else None for i in day_items] for day_items in plan_days
+        ]
+        daily_costs = [
+            fixed_cost + sum(activity.get('cost', 0) for activity in day if activity is not None) for day in days
+        ]
+        score = sum(scores[i] for day_items in plan_days for i in day_items if i is not None)
+        
+        return {
+            'days': days,
+            'windows': windows,
+            'mealCost': meal_cost,
+            'transportationCost': transportation_cost,
+            'dailyCosts': daily_costs,
+            'totalCost': sum(daily_costs),
+            'score': round(float(score), 4),
+            'selectionScore': round(plan['selection_score'], 4)
+        }
+    
+    def _itinerary_settings(self, preferences):
+        """
+        Derive itinerary settings from user preferences.
         
+        Args:
+            preferences: User preferences dict (optional)
+            
+        Returns:
+            Dictionary with preferred categories, accommodation type,
+            transportation preference and activities per day
+        """
         # Process preferences
         if preferences:
             preferred_categories = preferences.get('interests', [])
@@ -163,63 +714,225 @@ class RecommendationEngine:
         else:  # intense
             activities_per_day = 4
         
-        # Generate daily activities
-        for day in range(1, duration + 1):
-            daily_activities = []
-            
-            # Morning activity
-            daily_activities.append(self._generate_activity(
-                destination_info, "morning", preferred_categories
-            ))
+        return {
+            'preferred_categories': preferred_categories,
+            'accommodation_type': accommodation_type,
+            'transportation_preference': transportation_preference,
+            'activities_per_day': activities_per_day
+        }
+    
+    def _generate_day(self, day, destination_info, settings, exclude_titles=None, budget_plan=None, date=None,
+                      places=None):
+        """
+        Generate one day of an itinerary.
+        
+        Args:
+            day: Day number (1-based)
+            destination_info: Destination information
+            settings: Itinerary settings from _itinerary_settings
+            exclude_titles: Activity titles used elsewhere in the trip (optional)
+            budget_plan: Plan from plan_within_budget fixing activities and costs (optional)
+            date: Calendar date of the day, used to respect opening hours (optional)
+            places: PlaceIndexes of the destination; without them activities are
+                picked from its popular activities only (optional)
             
-            # Lunch
-            daily_activities.append({
-                "title": "Lunch",
-                "description": f"Enjoy local cuisine at a {accommodation_type} restaurant",
-                "startTime": "12:30",
-                "endTime": "14:00",
-                "category": "food",
-                "cost": self._generate_cost(accommodation_type)
+        Returns:
+            Day entry with its activities
+        """
+        preferred_categories = settings['preferred_categories']
+        accommodation_type = settings['accommodation_type']
+        transportation_preference = settings['transportation_preference']
+        activities_per_day = settings['activities_per_day']
+        
+        daily_activities = []
+        
+        # Activities picked for this day are not repeated within it either
+        if exclude_titles is not None:
+            exclude_titles = set(exclude_titles)
+        
+        if budget_plan is not None:
+            planned = list(budget_plan['days'][day - 1])
+            planned_windows = list(budget_plan['windows'][day - 1])
+            meal_cost = budget_plan['mealCost']
+            transportation_cost = budget_plan['transportationCost']
+        else:
+            planned = None
+            meal_cost = self._generate_cost(accommodation_type)
+            transportation_cost = self._generate_transportation_cost(transportation_preference)
+        
+        def next_activity(time_of_day):
+            if planned is None:
+                return self._generate_activity(
+                    destination_info, time_of_day, preferred_categories, exclude_titles,
+                    near=_last_location(daily_activities),
+                    weekday=date.weekday() if date is not None else None,
+                    places=places
+                )
+            return self._planned_activity(
+                planned.pop(0) if planned else None, destination_info, time_of_day,
+                planned_windows.pop(0) if planned_windows else None
+            )
+        
+        # Morning activity
+        daily_activities.append(next_activity("morning"))
+        if exclude_titles is not None:
+            exclude_titles.add(daily_activities[-1]["title"])
+        
+        # Lunch
+        daily_activities.append({
+            "title": "Lunch",
+            "description": f"Enjoy local cuisine at a {accommodation_type} restaurant",
+            "startTime": "12:30",
+            "endTime": "14:00",
+            "category": "food",
+            "cost": meal_cost
+        })
+        
+        # Afternoon activities
+        for _ in range(activities_per_day - 2):  # -2 for morning and evening
+            daily_activities.append(next_activity("afternoon"))
+            if exclude_titles is not None:
+                exclude_titles.add(daily_activities[-1]["title"])
+        
+        # Dinner
+        daily_activities.append({
+            "title": "Dinner",
+            "description": f"Experience local dining at a {accommodation_type} establishment",
+            "startTime": "19:00",
+            "endTime": "20:30",
+            "category": "food",
+            "cost": meal_cost if budget_plan is not None else self._generate_cost(accommodation_type)
+        })
+        
+        # Add transportation if necessary
+        if transportation_preference != 'walking':
+            daily_activities.insert(1, {
+                "title": f"{transportation_preference.title()} Transportation",
+                "description": f"Travel by {transportation_preference} transportation to next activity",
+                "startTime": "11:30",
+                "endTime": "12:30",
+                "category": "transportation",
+                "cost": transportation_cost
             })
+        
+        # Create the day entry
+        day_entry = {
+            "day": day,
+            "activities": daily_activities
+        }
+        if date is not None:
+            day_entry["date"] = date.date().isoformat() if isinstance(date, datetime) else date.isoformat()
+        
+        return day_entry
+    
+    def regenerate_day(self, itinerary, day, destination_info, preferences=None):
+        """
+        Regenerate one day of an existing itinerary.
+        
+        Activities used on other days are avoided where possible.
+        
+        Args:
+            itinerary: Existing itinerary (list of day entries)
+            day: Day number to regenerate (1-based)
+            destination_info: Destination information
+            preferences: User preferences dict (optional)
             
-            # Afternoon activities
-            for _ in range(activities_per_day - 2):  # -2 for morning and evening
-                daily_activities.append(self._generate_activity(
-                    destination_info, "afternoon", preferred_categories
-                ))
-            
-            # Dinner
-            daily_activities.append({
-                "title": "Dinner",
-                "description": f"Experience local dining at a {accommodation_type} establishment",
-                "startTime": "19:00",
-                "endTime": "20:30",
-                "category": "food",
-                "cost": self._generate_cost(accommodation_type)
-            })
+        Returns:
+            List of JSON Patch operations against the itinerary
             
-            # Add transportation if necessary
-            if transportation_preference != 'walking':
-                daily_activities.insert(1, {
-                    "title": f"{transportation_preference.title()} Transportation",
-                    "description": f"Travel by {transportation_preference} transportation to next activity",
-                    "startTime": "11:30",
-                    "endTime": "12:30",
-                    "category": "transportation",
-                    "cost": self._generate_transportation_cost(transportation_preference)
-                })
+        Raises:
+            ValueError: If the day is out of range
+        """
+        self._day_activities(itinerary, day)
+        
+        used_titles = {
+            activity.get("title")
+            for number, entry in enumerate(itinerary, start=1) if number != day
+            for activity in entry.get("activities", [])
+        }
+        
+        new_day = self._generate_day(
+            day, destination_info, self._itinerary_settings(preferences), used_titles,
+            date=_entry_date(itinerary[day - 1]), places=self.get_place_index(destination_info.get("name", ""))
+        )
+        
+        return [{"op": "replace", "path": f"/{day - 1}", "value": new_day}]
+    
+    def regenerate_slot(self, itinerary, day, slot, destination_info, preferences=None):
+        """
+        Regenerate a single activity of an existing itinerary.
+        
+        The replacement avoids every activity already in the trip (including
+        the rejected one) and stays inside the time window left free by the
+        surrounding activities of that day.
+        
+        Args:
+            itinerary: Existing itinerary (list of day entries)
+            day: Day number (1-based)
+            slot: Index of the activity within the day
+            destination_info: Destination information
+            preferences: User preferences dict (optional)
             
-            # Create the day entry
-            day_entry = {
-                "day": day,
-                "activities": daily_activities
-            }
+        Returns:
+            List of JSON Patch operations against the itinerary
             
-            itinerary.append(day_entry)
+        Raises:
+            ValueError: If the itinerary is malformed, the day or slot is out of range
+                or the slot is a meal or transfer
+        """
+        activities = self._day_activities(itinerary, day)
+        if not 0 <= slot < len(activities):
+            raise ValueError(f"Day {day} has no activity slot {slot}")
+        spans = [_activity_span(activity) for activity in activities]
         
-        return itinerary
+        current = activities[slot]
+        if current.get("title") in ("Lunch", "Dinner") or current.get("category") == "transportation":
+            raise ValueError("Only activity slots can be regenerated")
+        
+        used_titles = {
+            activity.get("title")
+            for entry in itinerary
+            for activity in entry.get("activities", [])
+        }
+        
+        start, end = spans[slot]
+        if start < 12 * 60:
+            time_of_day = "morning"
+        elif start < 19 * 60:
+            time_of_day = "afternoon"
+        else:
+            time_of_day = "evening"
+        
+        # Keep the slot's window, shrunk to end before the next activity and start after the previous one
+        others = [span for index, span in enumerate(spans) if index != slot]
+        lower = max((other_end for other_start, other_end in others if other_start < start), default=start)
+        upper = min((other_start for other_start, _ in others if other_start >= start), default=end)
+        new_start, new_end = max(start, lower), min(end, upper)
+        if new_end <= new_start:
+            # Neighbours already overlap this slot; keep its original window
+            new_start, new_end = start, end
+        
+        date = _entry_date(itinerary[day - 1])
+        settings = self._itinerary_settings(preferences)
+        activity = self._generate_activity(
+            destination_info, time_of_day, settings['preferred_categories'], used_titles,
+            near=_last_location(activities[:slot]),
+            weekday=date.weekday() if date is not None else None,
+            window=(_format_minutes(new_start), _format_minutes(new_end)),
+            places=self.get_place_index(destination_info.get("name", ""))
+        )
+        
+        return [{"op": "replace", "path": f"/{day - 1}/activities/{slot}", "value": activity}]
     
-    def _generate_activity(self, destination_info, time_of_day, preferred_categories):
+    def _day_activities(self, itinerary, day):
+        """Get a day's activities, validating the itinerary's shape and the day number."""
+        _validate_itinerary(itinerary)
+        if not 1 <= day <= len(itinerary):
+            raise ValueError(f"Itinerary has no day {day}")
+        return itinerary[day - 1].get("activities", [])
+    
+    def _generate_activity(self, destination_info, time_of_day, preferred_categories, exclude_titles=None,
+                           near=None, weekday=None, window=None, places=None):
         """
         Generate an activity for the itinerary.
         
@@ -227,12 +940,42 @@ class RecommendationEngine:
             destination_info: Destination information
             time_of_day: Time of day (morning, afternoon, evening)
             preferred_categories: List of preferred activity categories
+            exclude_titles: Titles that must not be picked again, if avoidable (optional)
+            near: (lat, lon) of the previous stop; the next one is picked close to it (optional)
+            weekday: Day of the week (0 = Monday); places closed during the slot are skipped (optional)
+            window: (start, end) times of the slot (default: random times for the time of day)
+            places: PlaceIndexes of the destination (optional; degraded answers pass none)
             
         Returns:
             Activity dictionary
         """
+        start_time, end_time = window or self._slot_times(time_of_day)
+        
+        # Only places open for the whole slot qualify
+        open_during_slot = None
+        if weekday is not None and places is not None:
+            start_minute, end_minute = _to_minutes(start_time), _to_minutes(end_time)
+            open_during_slot = lambda candidates: places.hours.open_mask(candidates, weekday, start_minute, end_minute)
+        
+        # Prefer places close to the previous stop so the day does not zigzag across town
+        if near is not None and places is not None:
+            place = self._nearby_place(places, near, preferred_categories, exclude_titles, open_during_slot)
+            if place is not None:
+                return self._place_activity(place, destination_info, start_time, end_time)
+        
         # Get popular activities from destination
         popular_activities = destination_info.get("popular_activities", [])
+        if exclude_titles:
+            popular_activities = [
+                activity for activity in popular_activities
+                if activity.get("name", "Explore the area") not in exclude_titles
+            ]
+        if weekday is not None:
+            start_minute, end_minute = _to_minutes(start_time), _to_minutes(end_time)
+            popular_activities = [
+                activity for activity in popular_activities
+                if is_open(activity.get("hours"), weekday, start_minute, end_minute)
+            ]
         
         # If we have popular activities, use them
         if popular_activities:
@@ -251,26 +994,7 @@ class RecommendationEngine:
             # Select a random activity
             activity = random.choice(filtered_activities)
             
-            # Set time based on time of day
-            if time_of_day == "morning":
-                start_time = f"{random.randint(8, 10)}:00"
-                end_time = f"{random.randint(11, 12)}:00"
-            elif time_of_day == "afternoon":
-                start_time = f"{random.randint(14, 16)}:00"
-                end_time = f"{random.randint(17, 18)}:00"
-            else:  # evening
-                start_time = f"{random.randint(20, 21)}:00"
-                end_time = f"{random.randint(22, 23)}:00"
-            
-            return {
-                "title": activity.get("name", "Explore the area"),
-                "description": f"Experience {activity.get('name', 'local attractions')} in {destination_info.get('name', '')}",
-                "location": destination_info.get("name", ""),
-                "category": activity.get("category", "sightseeing"),
-                "startTime": start_time,
-                "endTime": end_time,
-                "cost": self._generate_cost("mid-range")
-            }
+            return self._place_activity(activity, destination_info, start_time, end_time)
         
         # If no popular activities, generate generic ones
         categories = self.activity_categories
@@ -279,8 +1003,126 @@ class RecommendationEngine:
             if not categories:
                 categories = self.activity_categories
         
+        if exclude_titles:
+            unused = [
+                cat for cat in categories
+                if self._describe_generic_activity(cat, destination_info)[0] not in exclude_titles
+            ]
+            if unused:
+                categories = unused
+        
         category = random.choice(categories)
+        title, description = self._describe_generic_activity(category, destination_info)
+        
+        return {
+            "title": title,
+            "description": description,
+            "location": destination_info.get("name", ""),
+            "category": category,
+            "startTime": start_time,
+            "endTime": end_time,
+            "cost": self._generate_cost("mid-range")
+        }
+    
+    def _nearby_place(self, places, near, preferred_categories, exclude_titles=None, accept=None):
+        """
+        Pick one of the places closest to a point, preferring the user's categories.
+        
+        Args:
+            places: PlaceIndexes of the destination
+            near: (lat, lon) to search around
+            preferred_categories: List of preferred activity categories
+            exclude_titles: Place names that must not be picked (optional)
+            accept: Function mapping place indices to a boolean mask of pickable places (optional)
+            
+        Returns:
+            Place dict, or None if no other indexed place qualifies
+        """
+        index = places.spatial
+        matches = []
+        if preferred_categories:
+            matches = index.nearest(
+                *near, k=NEAREST_CHOICES, categories=preferred_categories, exclude=exclude_titles, accept=accept
+            )
+        if not matches:
+            matches = index.nearest(*near, k=NEAREST_CHOICES, exclude=exclude_titles, accept=accept)
+        
+        return random.choice(matches).place if matches else None
+    
+    def _place_activity(self, place, destination_info, start_time, end_time):
+        """
+        Build an itinerary entry for a popular activity or indexed place.
+        
+        Args:
+            place: Place dict with name, category and optionally lat/lon
+            destination_info: Destination information
+            start_time: Start time of the slot
+            end_time: End time of the slot
+            
+        Returns:
+            Activity dictionary
+        """
+        activity = {
+            "title": place.get("name", "Explore the area"),
+            "description": f"Experience {place.get('name', 'local attractions')} in {destination_info.get('name', '')}",
+            "location": destination_info.get("name", ""),
+            "category": place.get("category", "sightseeing"),
+            "startTime": start_time,
+            "endTime": end_time,
+            "cost": self._generate_cost("mid-range")
+        }
+        if place.get("lat") is not None and place.get("lon") is not None:
+            activity["lat"], activity["lon"] = place["lat"], place["lon"]
+        
+        return activity
+    
+    def _planned_activity(self, activity, destination_info, time_of_day, window=None):
+        """
+        Build an itinerary entry for an activity chosen by plan_within_budget.
+        
+        Args:
+            activity: Catalog activity, or None for a slot the budget leaves free
+            destination_info: Destination information
+            time_of_day: Time of day (morning, afternoon, evening)
+            window: (start, end) times of the slot (default: random times for the time of day)
+            
+        Returns:
+            Activity dictionary
+        """
+        start_time, end_time = window or self._slot_times(time_of_day)
+        
+        if activity is None:
+            return {
+                "title": "Free Time",
+                "description": f"Explore {destination_info.get('name', 'the area')} at your own pace",
+                "location": destination_info.get("name", ""),
+                "category": "relaxation",
+                "startTime": start_time,
+                "endTime": end_time,
+                "cost": 0
+            }
         
+        return {
+            "title": activity.get("name", "Explore the area"),
+            "description": activity.get("description", ""),
+            "location": destination_info.get("name", ""),
+            "category": activity.get("category", "sightseeing"),
+            "startTime": start_time,
+            "endTime": end_time,
+            "cost": activity.get("cost", 0)
+        }
+    
+    def _describe_generic_activity(self, category, destination_info):
+        """
+        Get the title and description of a generic activity.
+        
+        Args:
+            category: Activity category
+            destination_info: Destination information
+            
+        Returns:
+            Tuple of (title, description)
+        """
         # Generate activity based on category
         if category == "sightseeing":
             title = f"Explore {destination_info.get('name', 'the city')}"
@@ -307,6 +1149,18 @@ class RecommendationEngine:
             title = "Free Time"
             description = f"Spend some time exploring {destination_info.get('name', 'the area')} at your own pace"
         
+        return title, description
+    
+    def _slot_times(self, time_of_day):
+        """
+        Pick start and end times for an activity slot.
+        
+        Args:
+            time_of_day: Time of day (morning, afternoon, evening)
+            
+        Returns:
+            Tuple of (start time, end time)
+        """
         # Set time based on time of day
         if time_of_day == "morning":
             start_time = f"{random.randint(8, 10)}:00"
@@ -318,15 +1172,7 @@ class RecommendationEngine:
             start_time = f"{random.randint(20, 21)}:00"
             end_time = f"{random.randint(22, 23)}:00"
         
-        return {
-            "title": title,
-            "description": description,
-            "location": destination_info.get("name", ""),
-            "category": category,
-            "startTime": start_time,
-            "endTime": end_time,
-            "cost": self._generate_cost("mid-range")
-        }
+        return start_time, end_time
     
     def _generate_cost(self, budget_level):
         """
@@ -338,12 +1184,7 @@ class RecommendationEngine:
         Returns:
             Cost estimate
         """
-        if budget_level == "budget":
-            return random.randint(5, 25)
-        elif budget_level == "mid-range":
-            return random.randint(25, 75)
-        else:  # luxury
-            return random.randint(75, 200)
+        return random.randint(*COST_RANGES.get(budget_level, COST_RANGES["luxury"]))
     
     def _generate_transportation_cost(self, transportation_type):
         """
@@ -355,12 +1196,7 @@ class RecommendationEngine:
         Returns:
             Cost estimate
         """
-        if transportation_type == "public":
-            return random.randint(2, 10)
-        elif transportation_type == "rental":
-            return random.randint(20, 50)
-        else:  # tour or other
-            return random.randint(10, 30)
+        return random.randint(*TRANSPORTATION_COST_RANGES.get(transportation_type, TRANSPORTATION_COST_RANGES["tour"]))
     
     def get_status(self):
         """
@@ -373,5 +1209,8 @@ class RecommendationEngine:
             'initialized': self.initialized_date.isoformat(),
             'uptime_seconds': (datetime.now() - self.initialized_date).total_seconds(),
             'destinations_available': len(self.destinations),
+            'unknown_destinations_cached': len(self.unknown_destination_cache),
+            'itinerary_templates_cached': len(self.itinerary_templates),
+            'indexed_places': sum(len(index.spatial) for index in self.place_indexes.values()),
             'activity_categories': self.activity_categories
         }
\ No newline at end of file
@@ -0,0 +1,60 @@
+import logging
+import numpy as np
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(features):
+    """
+    Scale feature vectors to unit length so dot products are cosine similarities.
+
+    Args:
+        features: Array of shape (n, d)
+
+    Returns:
+        float32 array of shape (n, d); all-zero rows stay zero
+    """
+    features = np.asarray(features, dtype=np.float32)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    return features / np.maximum(norms, 1e-12)
+
+
+def mmr_rerank(relevance, features, k, diversity=0.3):
+    """
+    Select items by Maximal Marginal Relevance.
+
+    Each step picks the item maximizing
+    (1 - diversity) * relevance - diversity * (max similarity to the items picked so far).
+    The max-similarity vector is updated with one matrix-vector product per pick,
+    so a step costs O(N * d) instead of comparing against every picked item.
+
+    Args:
+        relevance: Array of item relevance scores
+        features: Unit-length item feature vectors of shape (n, d)
+        k: Number of items to select
+        diversity: Weight of the redundancy penalty between 0 (relevance only) and 1
+
+    Returns:
+        List of selected item indices in pick order
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    k = min(k, len(relevance))
+    if k <= 0:
+        return []
+
+    weighted = (1.0 - diversity) * relevance
+    max_similarity = np.zeros(len(relevance), dtype=np.float32)
+    available = np.ones(len(relevance), dtype=bool)
+    selected = []
+
+    for _ in range(k):
+        marginal = weighted - diversity * max_similarity
+        marginal[~available] = -np.inf
+        best = int(np.argmax(marginal))
+
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, features @ features[best], out=max_similarity)
+
+    return selected
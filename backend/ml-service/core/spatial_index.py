@@ -0,0 +1,220 @@
+import math
+from collections import namedtuple
+import logging
+import numpy as np
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+# Mean Earth radius and the length of one degree of latitude
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+# A place returned by a query with its distance from the query point
+PlaceMatch = namedtuple('PlaceMatch', ['place', 'distance_km'])
+
+
+class SpatialIndex:
+    """
+    Uniform grid over the places of one city for radius and nearest-neighbour queries.
+
+    Coordinates are projected onto a local equirectangular plane around the
+    city's centre, which is accurate to well under 1% at city scale. Places are
+    sorted by grid cell so each cell is a contiguous slice of the index arrays.
+    """
+
+    def __init__(self, places, cell_km=0.5):
+        """
+        Build the index.
+
+        Args:
+            places: Place dicts with 'lat' and 'lon' (and optionally 'name' and 'category');
+                places without coordinates are skipped
+            cell_km: Grid cell size in kilometres
+        """
+        self.places = [place for place in places if place.get('lat') is not None and place.get('lon') is not None]
+        self.cell_km = cell_km
+
+        lats = np.asarray([place['lat'] for place in self.places], dtype=np.float64)
+        lons = np.asarray([place['lon'] for place in self.places], dtype=np.float64)
+        self.origin = (float(lats.mean()), float(lons.mean())) if len(self.places) else (0.0, 0.0)
+        self.lon_scale = KM_PER_DEGREE * math.cos(math.radians(self.origin[0]))
+
+        self.x, self.y = self._project(lats, lons)
+
+        self.categories = sorted({place.get('category', '') for place in self.places})
+        category_codes = {category: code for code, category in enumerate(self.categories)}
+        self.category_codes = np.asarray(
+            [category_codes[place.get('category', '')] for place in self.places], dtype=np.int32
+        )
+
+        # Name -> place indices, so exclusions never scan the whole index
+        self.name_index = {}
+        for i, place in enumerate(self.places):
+            self.name_index.setdefault(place.get('name'), []).append(i)
+
+        # Places sorted by cell; cell -> (start, stop) slice of self.order
+        cell_x = np.floor(self.x / cell_km).astype(np.int64)
+        cell_y = np.floor(self.y / cell_km).astype(np.int64)
+        self.order = np.lexsort((cell_y, cell_x))
+        self.cells = {}
+        self.bounds = (0, -1, 0, -1)
+        if len(self.places):
+            sorted_x, sorted_y = cell_x[self.order], cell_y[self.order]
+            boundaries = np.flatnonzero((np.diff(sorted_x) != 0) | (np.diff(sorted_y) != 0)) + 1
+            starts = np.concatenate(([0], boundaries))
+            stops = np.concatenate((boundaries, [len(self.places)]))
+            for start, stop in zip(starts.tolist(), stops.tolist()):
+                self.cells[(int(sorted_x[start]), int(sorted_y[start]))] = (start, stop)
+            # Inclusive cell-coordinate bounding box of the occupied grid
+            self.bounds = (int(cell_x.min()), int(cell_x.max()), int(cell_y.min()), int(cell_y.max()))
+
+    def __len__(self):
+        return len(self.places)
+
+    def _project(self, lat, lon):
+        """Project coordinates to kilometres east and north of the index origin."""
+        return (lon - self.origin[1]) * self.lon_scale, (lat - self.origin[0]) * KM_PER_DEGREE
+
+    def _cells_in_box(self, x0, x1, y0, y1):
+        """Gather the place indices of occupied cells in an inclusive cell-coordinate box."""
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            # Box larger than the occupied grid: walk the occupied cells instead
+            slices = [
+                span for (cx, cy), span in self.cells.items()
+                if x0 <= cx <= x1 and y0 <= cy <= y1
+            ]
+        else:
+            slices = [
+                self.cells[(cx, cy)]
+                for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)
+                if (cx, cy) in self.cells
+            ]
+
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.order[start:stop] for start, stop in slices])
+
+    def _filter(self, candidates, categories, exclude, accept=None):
+        """Drop candidates outside the requested categories, with an excluded name or rejected by accept."""
+        if categories:
+            codes = [self.categories.index(c) for c in categories if c in self.categories]
+            candidates = candidates[np.isin(self.category_codes[candidates], codes)]
+        if exclude:
+            excluded = [i for name in exclude for i in self.name_index.get(name, ())]
+            if excluded:
+                candidates = candidates[~np.isin(candidates, excluded)]
+        if accept is not None and len(candidates):
+            candidates = candidates[accept(candidates)]
+        return candidates
+
+    def _matches(self, candidates, x, y, limit):
+        """Sort candidates by distance from the projected query point and keep the closest."""
+        distances = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+        if limit is not None and len(candidates) > limit:
+            nearest = np.argpartition(distances, limit - 1)[:limit]
+            candidates, distances = candidates[nearest], distances[nearest]
+
+        order = np.argsort(distances, kind='stable')
+        return [PlaceMatch(self.places[i], float(d)) for i, d in zip(candidates[order], distances[order])]
+
+    def within_radius(self, lat, lon, radius_km, limit=None, categories=None, exclude=None, accept=None):
+        """
+        Find places within a distance of a point, closest first.
+
+        Args:
+            lat: Query latitude
+            lon: Query longitude
+            radius_km: Search radius in kilometres
+            limit: Maximum number of places returned (optional)
+            categories: Only return places in these categories (optional)
+            exclude: Place names to skip (optional)
+            accept: Function mapping an array of place indices to a boolean keep-mask (optional)
+
+        Returns:
+            List of PlaceMatch
+        """
+        if not self.places:
+            return []
+
+        x, y = self._project(lat, lon)
+        candidates = self._cells_in_box(
+            math.floor((x - radius_km) / self.cell_km), math.floor((x + radius_km) / self.cell_km),
+            math.floor((y - radius_km) / self.cell_km), math.floor((y + radius_km) / self.cell_km)
+        )
+        candidates = self._filter(candidates, categories, exclude, accept)
+        candidates = candidates[np.hypot(self.x[candidates] - x, self.y[candidates] - y) <= radius_km]
+        return self._matches(candidates, x, y, limit)
+
+    def nearest(self, lat, lon, k=1, categories=None, exclude=None, max_km=None, accept=None):
+        """
+        Find the k places closest to a point.
+
+        Searches rings of cells outward from the query cell and stops once every
+        unsearched cell is farther away than the k-th match found so far.
+
+        Args:
+            lat: Query latitude
+            lon: Query longitude
+            k: Number of places to return
+            categories: Only return places in these categories (optional)
+            exclude: Place names to skip (optional)
+            max_km: Ignore places farther than this (optional)
+            accept: Function mapping an array of place indices to a boolean keep-mask (optional)
+
+        Returns:
+            List of up to k PlaceMatch, closest first
+        """
+        if not self.places or k <= 0:
+            return []
+
+        x, y = self._project(lat, lon)
+        cx, cy = math.floor(x / self.cell_km), math.floor(y / self.cell_km)
+        min_x, max_x, min_y, max_y = self.bounds
+        found = []
+
+        # Rings closer than the occupied grid are empty; start at the first one reaching it
+        ring = max(min_x - cx, cx - max_x, min_y - cy, cy - max_y, 0)
+        while True:
+            if ring == 0:
+                ring_candidates = self._cells_in_box(cx, cx, cy, cy)
+            else:
+                # The four edges of the square ring at Chebyshev distance `ring`
+                ring_candidates = np.concatenate([
+                    self._cells_in_box(cx - ring, cx + ring, cy - ring, cy - ring),
+                    self._cells_in_box(cx - ring, cx + ring, cy + ring, cy + ring),
+                    self._cells_in_box(cx - ring, cx - ring, cy - ring + 1, cy + ring - 1),
+                    self._cells_in_box(cx + ring, cx + ring, cy - ring + 1, cy + ring - 1)
+                ])
+            found.append(self._filter(ring_candidates, categories, exclude, accept))
+
+            # Every place outside the searched square is at least this far away
+            searched_km = ring * self.cell_km
+            candidates = np.concatenate(found)
+            if len(candidates) >= k:
+                distances = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+                if np.partition(distances, k - 1)[k - 1] <= searched_km:
+                    break
+            if max_km is not None and searched_km >= max_km:
+                break
+            if cx - ring <= min_x and cx + ring >= max_x and cy - ring <= min_y and cy + ring >= max_y:
+                # The searched square covers the whole grid
+                break
+            ring += 1
+
+        if max_km is not None:
+            candidates = candidates[np.hypot(self.x[candidates] - x, self.y[candidates] - y) <= max_km]
+        return self._matches(candidates, x, y, k)
+
+    def get_status(self):
+        """
+        Get status information about the index.
+
+        Returns:
+            Status information
+        """
+        return {
+            'places': len(self.places),
+            'cells': len(self.cells),
+            'cell_km': self.cell_km
+        }
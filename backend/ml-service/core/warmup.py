@@ -0,0 +1,130 @@
+import threading
+import time
+from datetime import datetime
+import logging
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Runs synthetic requests against each component and tracks service readiness."""
+
+    def __init__(self, retry_interval=30.0):
+        """
+        Initialize the warmup tracker.
+
+        Args:
+            retry_interval: Seconds between retries of failed steps (0 disables retries)
+        """
+        self.retry_interval = retry_interval
+        self.steps = []
+        self.results = {}
+        self.attempts = 0
+        self.started_at = None
+        self.finished_at = None
+        self.ready = False
+        self.skipped = False
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def add_step(self, name, fn):
+        """
+        Register a warmup step.
+
+        Args:
+            name: Component name reported in the status
+            fn: Zero-argument callable exercising the component
+        """
+        self.steps.append((name, fn))
+
+    def run(self):
+        """
+        Run every step that has not succeeded yet, in order, and mark the service ready once all have.
+
+        Returns:
+            True if the service is ready
+        """
+        if self.started_at is None:
+            self.started_at = datetime.now()
+        self.attempts += 1
+
+        for name, fn in self.steps:
+            if self.results.get(name, {}).get('status') == 'ok':
+                continue
+            start = time.perf_counter()
+            try:
+                fn()
+                self.results[name] = {
+                    'status': 'ok',
+                    'seconds': round(time.perf_counter() - start, 3)
+                }
+            except Exception as e:
+                self.results[name] = {
+                    'status': 'error',
+                    'seconds': round(time.perf_counter() - start, 3),
+                    'error': str(e)
+                }
+                logger.error(f"Warmup step {name} failed: {str(e)}")
+
+        self.finished_at = datetime.now()
+        self.ready = all(self.results[name]['status'] == 'ok' for name, _ in self.steps)
+
+        elapsed = (self.finished_at - self.started_at).total_seconds()
+        logger.info(f"Warmup attempt {self.attempts} finished after {elapsed:.2f}s, ready={self.ready}")
+
+        return self.ready
+
+    def start(self):
+        """
+        Run the warmup in a background thread so liveness checks answer immediately,
+        retrying failed steps every retry_interval seconds until all succeed.
+        """
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self.run():
+                if self.retry_interval <= 0 or self._stop_event.wait(self.retry_interval):
+                    return
+
+        self._thread = threading.Thread(target=run, name='warmup', daemon=True)
+        self._thread.start()
+
+    def skip(self):
+        """Mark the service ready without warming up, for processes started with warmup disabled."""
+        self.skipped = True
+        self.ready = True
+
+    def stop(self):
+        """Stop retrying failed steps."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get_status(self):
+        """
+        Get readiness information.
+
+        Returns:
+            Status information
+        """
+        if self.ready:
+            state = 'ready'
+        elif self.finished_at is not None:
+            state = 'failed'
+        elif self.started_at is not None:
+            state = 'warming_up'
+        else:
+            state = 'pending'
+
+        return {
+            'state': state,
+            'ready': self.ready,
+            'skipped': self.skipped,
+            'attempts': self.attempts,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'components': dict(self.results)
+        }
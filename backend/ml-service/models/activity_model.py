@@ -1,21 +1,86 @@
 # backend/ml-service/models/activity_model.py
 import json
-import random
+import os
+from collections import namedtuple
 from datetime import datetime
 import logging
+import numpy as np
+from core.reranking import mmr_rerank, normalize_rows
 
 # Initialize logging
 logger = logging.getLogger(__name__)
 
+# Flattened catalog for vectorized scoring: parallel arrays indexed by activity
+ActivityTable = namedtuple('ActivityTable', [
+    'activities', 'categories', 'category_codes', 'costs', 'durations', 'features'
+])
+
+# Preference weight of the top interest, its decay per rank and the weight of other categories
+INTEREST_WEIGHT = 1.0
+INTEREST_DECAY = 0.05
+OTHER_CATEGORY_WEIGHT = 0.25
+
+# Weight of scaled cost and duration next to the one-hot category in activity feature vectors
+COST_FEATURE_WEIGHT = 0.5
+DURATION_FEATURE_WEIGHT = 0.5
+
+# Random jitter added to relevance so repeated requests do not always return the same list
+RELEVANCE_JITTER = 0.1
+
+
+def build_activity_table(activities_by_category):
+    """
+    Flatten a catalog into parallel cost and category arrays.
+    
+    Args:
+        activities_by_category: Dictionary of activities by category
+        
+    Returns:
+        ActivityTable
+    """
+    categories = list(activities_by_category)
+    activities, codes = [], []
+    for code, category in enumerate(categories):
+        for activity in activities_by_category[category]:
+            activities.append({**activity, "category": category})
+            codes.append(code)
+    
+    category_codes = np.asarray(codes, dtype=np.int32)
+    costs = np.asarray([a.get('cost', 0) for a in activities], dtype=np.float64)
+    durations = np.asarray([a.get('duration', 0) for a in activities], dtype=np.float64)
+    
+    # Category one-hot plus scaled cost and duration; similar vectors mean redundant activities
+    features = np.zeros((len(activities), len(categories) + 2), dtype=np.float32)
+    features[np.arange(len(activities)), category_codes] = 1.0
+    if len(activities):
+        features[:, -2] = COST_FEATURE_WEIGHT * costs / max(costs.max(), 1.0)
+        features[:, -1] = DURATION_FEATURE_WEIGHT * durations / max(durations.max(), 1.0)
+    
+    return ActivityTable(
+        activities=activities,
+        categories=categories,
+        category_codes=category_codes,
+        costs=costs,
+        durations=durations,
+        features=normalize_rows(features)
+    )
+
 class ActivityModel:
     """Model for activity recommendations based on preferences."""
     
-    def __init__(self):
-        """Initialize activity model."""
+    def __init__(self, diversity=0.3):
+        """
+        Initialize activity model.
+        
+        Args:
+            diversity: MMR redundancy penalty weight used when ranking recommendations
+        """
         self.initialized_date = datetime.now()
+        self.diversity = diversity
         
         # Load activity data (would come from database in real system)
         self.activities = self._load_sample_activities()
+        self.activity_table = build_activity_table(self.activities)
         
         logger.info("Activity Model initialized")
     
@@ -72,10 +137,35 @@ class ActivityModel:
             ]
         }
     
+    def load_catalog(self, path):
+        """
+        Replace the activity data with a catalog written by the ingestion pipeline.
+        
+        Args:
+            path: Catalog directory containing activities.json
+            
+        Returns:
+            The new ActivityTable, now active; requests that already read the
+            previous table keep using it
+        """
+        with open(os.path.join(path, 'activities.json')) as f:
+            activities = json.load(f)
+        
+        # Readers only go through the table, so swapping it last publishes the whole catalog at once
+        table = build_activity_table(activities)
+        self.activities = activities
+        self.activity_table = table
+        
+        logger.info(f"Loaded activity catalog with {sum(len(a) for a in activities.values())} activities from {path}")
+        return table
+    
     def get_recommended_activities(self, preferences, limit=10):
         """
         Get activity recommendations based on preferences.
         
+        Candidates are ranked by Maximal Marginal Relevance, so the list balances
+        the user's interests against variety in category, cost and duration.
+        
         Args:
             preferences: User preferences dict
             limit: Maximum number of recommendations to return
@@ -83,22 +173,16 @@ class ActivityModel:
         Returns:
             List of recommended activities
         """
-        recommendations = []
+        table = self.activity_table
         
         # Check for interests in preferences
         interests = preferences.get('interests', [])
         budget_type = preferences.get('accommodationType', 'mid-range')
         
-        # If no interests specified, use all categories
-        if not interests:
-            interests = list(self.activities.keys())
-        
-        # Filter interests to those we have data for
-        valid_interests = [i for i in interests if i in self.activities]
-        
-        # If no valid interests, use all categories
+        # Filter interests to those we have data for; fall back to all categories
+        valid_interests = [i for i in interests if i in table.categories]
         if not valid_interests:
-            valid_interests = list(self.activities.keys())
+            valid_interests = table.categories
         
         # Set budget limit based on accommodation type
         if budget_type == 'budget':
@@ -108,31 +192,44 @@ class ActivityModel:
         else:  # luxury
             budget_limit = 200
         
-        # Generate recommendations
-        for interest in valid_interests:
-            activities = self.activities.get(interest, [])
-            # Filter by budget if needed
-            if budget_type != 'luxury':
-                activities = [a for a in activities if a.get('cost', 0) <= budget_limit]
-            
-            # Add random activities from this category
-            if activities:
-                # Determine how many to add from this category
-                num_to_add = min(2, len(activities), limit - len(recommendations))
-                
-                # Add random samples
-                category_recommendations = random.sample(activities, num_to_add)
-                for activity in category_recommendations:
-                    recommendations.append({
-                        **activity,
-                        "category": interest
-                    })
+        interest_codes = [table.categories.index(interest) for interest in valid_interests]
+        mask = np.isin(table.category_codes, interest_codes)
+        # Filter by budget if needed
+        if budget_type != 'luxury':
+            mask &= table.costs <= budget_limit
+        
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+        
+        relevance = self.score_activities({'interests': valid_interests}, table)[candidates]
+        relevance = relevance + RELEVANCE_JITTER * np.random.random_sample(len(candidates))
+        
+        selected = mmr_rerank(relevance, table.features[candidates], limit, self.diversity)
+        return [dict(table.activities[candidates[i]]) for i in selected]
+    
+    def score_activities(self, preferences, table=None):
+        """
+        Score every catalog activity against a user's interests.
+        
+        Args:
+            preferences: User preferences dict
+            table: ActivityTable to score (default: the current catalog)
             
-            # Check if we've reached the limit
-            if len(recommendations) >= limit:
-                break
+        Returns:
+            Array of scores aligned with the table's activities
+        """
+        table = table or self.activity_table
+        
+        # Earlier interests weigh more; categories outside the interests keep a small weight
+        weights = np.full(len(table.categories), OTHER_CATEGORY_WEIGHT)
+        code_by_category = {category: code for code, category in enumerate(table.categories)}
+        for rank, interest in enumerate(preferences.get('interests', [])):
+            code = code_by_category.get(interest)
+            if code is not None:
+                weights[code] = max(weights[code], INTEREST_WEIGHT - INTEREST_DECAY * rank)
         
-        return recommendations
+        return weights[table.category_codes]
     
     def get_status(self):
         """
@@ -0,0 +1,385 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import logging
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+# Default implicit-feedback weight per event type
+EVENT_WEIGHTS = {
+    'view': 1.0,
+    'click': 2.0,
+    'save': 4.0,
+    'add_to_itinerary': 6.0,
+    'book': 8.0
+}
+
+
+class _IdMapper:
+    """Incrementally maps external IDs to contiguous integer indices."""
+
+    def __init__(self, ids=None):
+        self.ids = list(ids or [])
+        self.index = {value: i for i, value in enumerate(self.ids)}
+
+    def encode(self, values):
+        """
+        Map a column of IDs to indices, assigning new indices to unseen IDs.
+
+        Args:
+            values: pandas Series of IDs
+
+        Returns:
+            int32 numpy array of indices
+        """
+        codes = values.map(self.index)
+        missing = codes.isna()
+        if missing.any():
+            for value in pd.unique(values[missing]):
+                self.index[value] = len(self.ids)
+                self.ids.append(value)
+            codes = values.map(self.index)
+        return codes.to_numpy(dtype=np.int32)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def read_interactions(path, chunksize=1_000_000, event_weights=None):
+    """
+    Stream an interaction log into a sparse user x activity matrix.
+
+    The log is a CSV or JSONL file with userId and activityId columns and
+    either a numeric weight column or an event column mapped via event_weights.
+    Repeated interactions are summed.
+
+    Args:
+        path: Path to the log (.csv, .jsonl or .json)
+        chunksize: Rows read per chunk
+        event_weights: Mapping of event type to weight (default: EVENT_WEIGHTS)
+
+    Returns:
+        Tuple of (CSR interaction matrix, user IDs, activity IDs)
+    """
+    event_weights = event_weights or EVENT_WEIGHTS
+    users, items = _IdMapper(), _IdMapper()
+    rows, cols, values = [], [], []
+
+    if path.endswith('.csv'):
+        reader = pd.read_csv(path, chunksize=chunksize, dtype={'userId': str, 'activityId': str})
+    else:
+        reader = pd.read_json(path, lines=True, chunksize=chunksize, dtype={'userId': str, 'activityId': str})
+
+    total = 0
+    for chunk in reader:
+        chunk = chunk.dropna(subset=['userId', 'activityId'])
+        if 'weight' in chunk:
+            weights = pd.to_numeric(chunk['weight'], errors='coerce').fillna(1.0)
+        elif 'event' in chunk:
+            weights = chunk['event'].map(event_weights).fillna(1.0)
+        else:
+            weights = pd.Series(1.0, index=chunk.index)
+
+        rows.append(users.encode(chunk['userId'].astype(str)))
+        cols.append(items.encode(chunk['activityId'].astype(str)))
+        values.append(weights.to_numpy(dtype=np.float32))
+
+        total += len(chunk)
+        logger.info(f"Read {total} interactions ({len(users)} users, {len(items)} activities)")
+
+    if not rows:
+        return sp.csr_matrix((0, 0), dtype=np.float32), [], []
+
+    matrix = sp.coo_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(users), len(items))
+    ).tocsr()
+    matrix.sum_duplicates()
+
+    return matrix, users.ids, items.ids
+
+
+def _chunk_bounds(indptr, max_nnz):
+    """
+    Split rows into contiguous chunks holding at most max_nnz entries each.
+
+    Args:
+        indptr: CSR row pointer array
+        max_nnz: Entry budget per chunk (a single heavier row gets its own chunk)
+
+    Returns:
+        List of (start_row, stop_row) tuples
+    """
+    n_rows = len(indptr) - 1
+    bounds = []
+    start = 0
+    while start < n_rows:
+        stop = int(np.searchsorted(indptr, indptr[start] + max_nnz, side='right')) - 1
+        stop = min(max(stop, start + 1), n_rows)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def _solve_chunk(confidence, fixed, gram, start, stop, out, max_nnz):
+    """
+    Solve the implicit ALS normal equations for a chunk of rows.
+
+    For row u: (YtY + Yu^T (Cu - I) Yu + reg I) x_u = Yu^T Cu p_u, computed
+    for the whole chunk with batched outer products and one batched solve.
+
+    Args:
+        confidence: CSR matrix of alpha-scaled interaction strengths (Cu - I)
+        fixed: Factor matrix held fixed in this half-step
+        gram: YtY + reg I
+        start: First row of the chunk
+        stop: Row after the last row of the chunk
+        out: Factor matrix receiving the solved rows
+        max_nnz: Entry budget used to choose the batched path
+    """
+    indptr = confidence.indptr
+    lo, hi = indptr[start], indptr[stop]
+    items = confidence.indices[lo:hi]
+    weights = confidence.data[lo:hi]
+    factors = fixed[items]
+
+    if stop - start == 1 and hi - lo > max_nnz:
+        # A single heavy row: use a plain weighted Gram product
+        A = gram + factors.T @ (weights[:, None] * factors)
+        b = ((1.0 + weights)[:, None] * factors).sum(axis=0)
+        out[start] = np.linalg.solve(A, b)
+        return
+
+    n_rows, n_factors = stop - start, fixed.shape[1]
+    A = np.broadcast_to(gram, (n_rows, n_factors, n_factors)).copy()
+    b = np.zeros((n_rows, n_factors), dtype=fixed.dtype)
+
+    counts = np.diff(indptr[start:stop + 1])
+    nonempty = np.flatnonzero(counts)
+    if len(nonempty):
+        offsets = (indptr[start:stop] - lo)[nonempty]
+        outer = np.einsum('n,ni,nj->nij', weights, factors, factors)
+        A[nonempty] += np.add.reduceat(outer, offsets, axis=0)
+        b[nonempty] = np.add.reduceat((1.0 + weights)[:, None] * factors, offsets, axis=0)
+
+    out[start:stop] = np.linalg.solve(A, b[:, :, None])[:, :, 0]
+
+
+class ImplicitALSModel:
+    """Implicit-feedback matrix factorization trained with alternating least squares."""
+
+    def __init__(self, factors=32, regularization=0.05, alpha=20.0, iterations=10, seed=42):
+        """
+        Initialize the model.
+
+        Args:
+            factors: Number of latent factors
+            regularization: L2 regularization strength
+            alpha: Confidence scaling applied to interaction strengths
+            iterations: Number of ALS sweeps
+            seed: Random seed for factor initialization
+        """
+        self.factors = factors
+        self.regularization = regularization
+        self.alpha = alpha
+        self.iterations = iterations
+        self.seed = seed
+
+        self.user_factors = None
+        self.item_factors = None
+        self.user_ids = []
+        self.item_ids = []
+        self.user_index = {}
+        self.interactions = None
+        self.trained_at = None
+
+    def fit(self, interactions, user_ids, item_ids, workers=None, max_chunk_nnz=10000):
+        """
+        Train user and activity factors.
+
+        Args:
+            interactions: CSR user x activity matrix of interaction strengths
+            user_ids: External user ID for each row
+            item_ids: External activity ID for each column
+            workers: Threads used to solve chunks in parallel (default: CPU count)
+            max_chunk_nnz: Interactions per batched chunk; bounds temporary memory
+
+        Returns:
+            The trained model
+        """
+        interactions = sp.csr_matrix(interactions, dtype=np.float32)
+        confidence = interactions * np.float32(self.alpha)
+        confidence_t = confidence.T.tocsr()
+        n_users, n_items = interactions.shape
+
+        rng = np.random.default_rng(self.seed)
+        user_factors = (rng.standard_normal((n_users, self.factors)) * 0.01).astype(np.float32)
+        item_factors = (rng.standard_normal((n_items, self.factors)) * 0.01).astype(np.float32)
+        identity = np.eye(self.factors, dtype=np.float32) * self.regularization
+
+        user_chunks = _chunk_bounds(confidence.indptr, max_chunk_nnz)
+        item_chunks = _chunk_bounds(confidence_t.indptr, max_chunk_nnz)
+
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            for iteration in range(self.iterations):
+                start = time.perf_counter()
+                for matrix, fixed, out, chunks in (
+                    (confidence, item_factors, user_factors, user_chunks),
+                    (confidence_t, user_factors, item_factors, item_chunks)
+                ):
+                    gram = fixed.T @ fixed + identity
+                    list(pool.map(
+                        lambda bounds: _solve_chunk(matrix, fixed, gram, bounds[0], bounds[1], out, max_chunk_nnz),
+                        chunks
+                    ))
+                logger.info(f"ALS iteration {iteration + 1}/{self.iterations} took {time.perf_counter() - start:.2f}s")
+
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.user_ids = list(user_ids)
+        self.item_ids = list(item_ids)
+        self.user_index = {uid: i for i, uid in enumerate(self.user_ids)}
+        self.interactions = interactions
+        self.trained_at = datetime.now()
+
+        return self
+
+    def recommend(self, user_id, limit=10, exclude_seen=True):
+        """
+        Get the top activities for a user.
+
+        Args:
+            user_id: External user ID
+            limit: Maximum number of activities to return
+            exclude_seen: Skip activities the user already interacted with
+
+        Returns:
+            List of (activity ID, score) tuples, or None if the user is unknown
+        """
+        results = self.recommend_batch([user_id], limit, exclude_seen)
+        return results[0]
+
+    def recommend_batch(self, user_ids, limit=10, exclude_seen=True):
+        """
+        Get the top activities for several users with one matrix product.
+
+        Args:
+            user_ids: External user IDs
+            limit: Maximum number of activities per user
+            exclude_seen: Skip activities each user already interacted with
+
+        Returns:
+            List with, per user, a list of (activity ID, score) tuples or None if unknown
+        """
+        if self.item_factors is None:
+            return [None] * len(user_ids)
+
+        rows = [self.user_index.get(uid) for uid in user_ids]
+        known = [i for i, row in enumerate(rows) if row is not None]
+        results = [None] * len(user_ids)
+        if not known:
+            return results
+
+        known_rows = np.array([rows[i] for i in known])
+        scores = np.asarray(self.user_factors[known_rows] @ self.item_factors.T)
+
+        if exclude_seen and self.interactions is not None:
+            seen = self.interactions[known_rows]
+            scores[seen.nonzero()] = -np.inf
+
+        limit = min(limit, scores.shape[1])
+        if limit <= 0:
+            return [[] if row is not None else None for row in rows]
+
+        top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        for position, i in enumerate(known):
+            results[i] = [
+                (self.item_ids[item], float(score))
+                for item, score in zip(top[position], top_scores[position])
+                if np.isfinite(score)
+            ]
+
+        return results
+
+    def save(self, path):
+        """
+        Persist factors, ID mappings and seen interactions to a directory.
+
+        Args:
+            path: Output directory
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'user_factors.npy'), self.user_factors)
+        np.save(os.path.join(path, 'item_factors.npy'), self.item_factors)
+        sp.save_npz(os.path.join(path, 'interactions.npz'), self.interactions)
+
+        with open(os.path.join(path, 'cf_model.json'), 'w') as f:
+            json.dump({
+                'factors': self.factors,
+                'regularization': self.regularization,
+                'alpha': self.alpha,
+                'iterations': self.iterations,
+                'trained_at': self.trained_at.isoformat() if self.trained_at else None,
+                'user_ids': self.user_ids,
+                'item_ids': self.item_ids
+            }, f)
+
+        logger.info(f"Saved CF model with {len(self.user_ids)} users and {len(self.item_ids)} activities to {path}")
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Load a model saved with save().
+
+        Args:
+            path: Model directory
+            mmap_mode: numpy memory-map mode for the factor arrays (e.g. 'r')
+
+        Returns:
+            ImplicitALSModel instance
+        """
+        with open(os.path.join(path, 'cf_model.json')) as f:
+            metadata = json.load(f)
+
+        model = cls(
+            factors=metadata['factors'],
+            regularization=metadata['regularization'],
+            alpha=metadata['alpha'],
+            iterations=metadata['iterations']
+        )
+        model.user_factors = np.load(os.path.join(path, 'user_factors.npy'), mmap_mode=mmap_mode)
+        model.item_factors = np.load(os.path.join(path, 'item_factors.npy'), mmap_mode=mmap_mode)
+        model.interactions = sp.load_npz(os.path.join(path, 'interactions.npz')).tocsr()
+        model.user_ids = metadata['user_ids']
+        model.item_ids = metadata['item_ids']
+        model.user_index = {uid: i for i, uid in enumerate(model.user_ids)}
+        if metadata.get('trained_at'):
+            model.trained_at = datetime.fromisoformat(metadata['trained_at'])
+
+        return model
+
+    def get_status(self):
+        """
+        Get status information about the CF model.
+
+        Returns:
+            Status information
+        """
+        return {
+            'trained': self.item_factors is not None,
+            'trained_at': self.trained_at.isoformat() if self.trained_at else None,
+            'users': len(self.user_ids),
+            'activities': len(self.item_ids),
+            'factors': self.factors
+        }
@@ -0,0 +1,265 @@
+import json
+import os
+import re
+import zlib
+from datetime import datetime
+import logging
+import numpy as np
+import scipy.sparse as sp
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+# Letters only, so the same features work across languages
+TOKEN_PATTERN = re.compile(r'[^\W\d_]+')
+
+
+class HashedIntentClassifier:
+    """Multinomial naive Bayes intent classifier over hashed word and bigram features."""
+
+    def __init__(self, n_features=1 << 16, ngram_range=2, alpha=0.1):
+        """
+        Initialize the classifier.
+
+        Args:
+            n_features: Number of hash buckets (a power of two)
+            ngram_range: Longest word n-gram used as a feature
+            alpha: Additive smoothing of the feature counts
+        """
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.alpha = alpha
+        self.labels = []
+        self.feature_log_probs = None  # (n_features, n_labels)
+        self.class_log_prior = None
+        self.seen_features = None  # 1.0 for buckets that occurred in training
+        self.trained_at = None
+
+    def _feature_ids(self, words):
+        """
+        Hash word n-grams to feature buckets.
+
+        crc32 is used instead of hash() so buckets are stable across processes.
+
+        Args:
+            words: Lowercase word tokens
+
+        Returns:
+            List of bucket indices (with repeats)
+        """
+        grams = list(words)
+        for n in range(2, self.ngram_range + 1):
+            grams.extend(' '.join(words[i:i + n]) for i in range(len(words) - n + 1))
+
+        mask = self.n_features - 1
+        return [zlib.crc32(gram.encode('utf-8')) & mask for gram in grams]
+
+    def featurize(self, texts):
+        """
+        Build the sparse feature-count matrix of a batch of texts.
+
+        Args:
+            texts: List of texts
+
+        Returns:
+            CSR matrix of shape (len(texts), n_features)
+        """
+        return self.featurize_tokens([TOKEN_PATTERN.findall(text.lower()) for text in texts])
+
+    def featurize_tokens(self, token_lists):
+        """
+        Build the sparse feature-count matrix of already tokenized texts.
+
+        Args:
+            token_lists: List of lowercase token lists
+
+        Returns:
+            CSR matrix of shape (len(token_lists), n_features)
+        """
+        indptr = [0]
+        indices = []
+        for words in token_lists:
+            indices.extend(self._feature_ids(words))
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.float32)
+        matrix = sp.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(token_lists), self.n_features)
+        )
+        # Repeated buckets within a text become counts
+        matrix.sum_duplicates()
+        return matrix
+
+    def fit(self, texts, labels):
+        """
+        Train the classifier.
+
+        Args:
+            texts: List of training texts
+            labels: Intent label per text
+
+        Returns:
+            self
+        """
+        self.labels = sorted(set(labels))
+        label_index = {label: i for i, label in enumerate(self.labels)}
+
+        features = self.featurize(texts)
+        targets = sp.csr_matrix(
+            (np.ones(len(labels), dtype=np.float32),
+             (np.arange(len(labels)), [label_index[label] for label in labels])),
+            shape=(len(labels), len(self.labels))
+        )
+
+        # Per-label feature counts in one sparse product
+        counts = np.asarray((features.T @ targets).todense(), dtype=np.float64)
+        smoothed = counts + self.alpha
+        # C order: the sparse product reads whole rows of the weight matrix
+        self.feature_log_probs = np.ascontiguousarray(
+            np.log(smoothed / smoothed.sum(axis=0, keepdims=True)), dtype=np.float32
+        )
+
+        label_counts = np.asarray(targets.sum(axis=0), dtype=np.float64).ravel()
+        self.class_log_prior = np.log(label_counts / label_counts.sum()).astype(np.float32)
+        self.seen_features = (counts.sum(axis=1) > 0).astype(np.float32)
+        self.trained_at = datetime.now()
+
+        logger.info(f"Trained intent classifier on {len(texts)} texts and {len(self.labels)} intents")
+        return self
+
+    def predict_proba(self, texts):
+        """
+        Get intent probabilities for a batch of texts.
+
+        Args:
+            texts: List of texts
+
+        Returns:
+            Tuple of (probabilities of shape (len(texts), n_labels), bool array of texts with known features)
+        """
+        return self._predict(self.featurize(texts))
+
+    def _predict(self, features):
+        """Score a feature matrix; returns probabilities and which rows had known features."""
+        scores = np.asarray(features @ self.feature_log_probs) + self.class_log_prior
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        known = np.asarray(features @ self.seen_features).ravel() > 0
+        return probabilities, known
+
+    def classify(self, texts, top=3):
+        """
+        Classify a batch of texts in the format of NLPProcessor.extract_intent.
+
+        Args:
+            texts: List of texts
+            top: Number of intents listed per text
+
+        Returns:
+            List of dictionaries with the primary intent, confidence and top intents
+        """
+        return self.classify_tokens([TOKEN_PATTERN.findall(text.lower()) for text in texts], top)
+
+    def classify_tokens(self, token_lists, top=3):
+        """
+        Classify already tokenized texts.
+
+        Args:
+            token_lists: List of lowercase token lists
+            top: Number of intents listed per text
+
+        Returns:
+            List of dictionaries with the primary intent, confidence and top intents
+        """
+        if not token_lists:
+            return []
+
+        probabilities, known = self._predict(self.featurize_tokens(token_lists))
+        ranked = np.argsort(-probabilities, axis=1)[:, :top]
+
+        results = []
+        for row, order in enumerate(ranked):
+            if not known[row]:
+                results.append({'primary': 'unknown', 'confidence': 0.0, 'all_intents': {}})
+                continue
+
+            all_intents = {self.labels[i]: round(float(probabilities[row, i]), 4) for i in order}
+            results.append({
+                'primary': self.labels[order[0]],
+                'confidence': round(float(probabilities[row, order[0]]), 4),
+                'all_intents': all_intents
+            })
+
+        return results
+
+    def save(self, path):
+        """
+        Persist weights and labels to a directory.
+
+        Args:
+            path: Output directory
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'feature_log_probs.npy'), self.feature_log_probs)
+        np.save(os.path.join(path, 'class_log_prior.npy'), self.class_log_prior)
+        np.save(os.path.join(path, 'seen_features.npy'), self.seen_features)
+
+        with open(os.path.join(path, 'intent_model.json'), 'w') as f:
+            json.dump({
+                'n_features': self.n_features,
+                'ngram_range': self.ngram_range,
+                'alpha': self.alpha,
+                'labels': self.labels,
+                'trained_at': self.trained_at.isoformat() if self.trained_at else None
+            }, f)
+
+        logger.info(f"Saved intent classifier with {len(self.labels)} intents to {path}")
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Load a classifier saved with save().
+
+        Args:
+            path: Model directory
+            mmap_mode: numpy memory-map mode for the weight matrix (e.g. 'r')
+
+        Returns:
+            HashedIntentClassifier instance
+        """
+        with open(os.path.join(path, 'intent_model.json')) as f:
+            metadata = json.load(f)
+
+        model = cls(
+            n_features=metadata['n_features'],
+            ngram_range=metadata['ngram_range'],
+            alpha=metadata['alpha']
+        )
+        model.labels = metadata['labels']
+        model.feature_log_probs = np.load(os.path.join(path, 'feature_log_probs.npy'), mmap_mode=mmap_mode)
+        model.class_log_prior = np.load(os.path.join(path, 'class_log_prior.npy'))
+        model.seen_features = np.load(os.path.join(path, 'seen_features.npy'))
+        if metadata.get('trained_at'):
+            model.trained_at = datetime.fromisoformat(metadata['trained_at'])
+
+        return model
+
+    def get_status(self):
+        """
+        Get status information about the intent classifier.
+
+        Returns:
+            Status information
+        """
+        return {
+            'trained': self.feature_log_probs is not None,
+            'trained_at': self.trained_at.isoformat() if self.trained_at else None,
+            'intents': self.labels,
+            'n_features': self.n_features
+        }
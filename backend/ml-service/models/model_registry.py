@@ -0,0 +1,253 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+import logging
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+# Pointer file naming the active version of an artifact
+CURRENT_FILE = 'CURRENT'
+
+# A loaded artifact version; requests hold on to it until they finish
+LoadedModel = namedtuple('LoadedModel', ['name', 'version', 'model', 'path', 'loaded_at', 'load_seconds'])
+
+
+def new_version_name():
+    """
+    Build a sortable version name for a new artifact.
+
+    Returns:
+        Version name based on the current UTC time
+    """
+    return datetime.utcnow().strftime('%Y%m%d%H%M%S')
+
+
+def publish_version(artifact_dir, version):
+    """
+    Atomically point an artifact at a version.
+
+    Args:
+        artifact_dir: Directory holding the artifact's version directories
+        version: Version directory name to activate
+    """
+    tmp_path = os.path.join(artifact_dir, f".{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(artifact_dir, CURRENT_FILE))
+
+
+class ModelRegistry:
+    """Loads versioned model artifacts from disk and hot-swaps them without downtime."""
+
+    def __init__(self, base_path):
+        """
+        Initialize the registry.
+
+        Args:
+            base_path: Root directory with one subdirectory per artifact
+        """
+        self.base_path = base_path
+        self.loaders = {}
+        self.models = {}
+        self.errors = {}
+        # Versions that failed to load, not retried until requested explicitly
+        self.failed_versions = {}
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def register(self, name, loader):
+        """
+        Register an artifact and load its active version if one exists.
+
+        Args:
+            name: Artifact name (subdirectory of base_path)
+            loader: Callable taking a version directory and returning a new model
+                object; it must not modify objects that requests may be using
+        """
+        self.loaders[name] = loader
+        self.reload(name)
+
+    def get(self, name):
+        """
+        Get the active version of an artifact.
+
+        Callers should keep the returned object for the duration of a request,
+        so a concurrent swap does not change the model mid-request.
+
+        Args:
+            name: Artifact name
+
+        Returns:
+            LoadedModel, or None if no version is loaded
+        """
+        return self.models.get(name)
+
+    def get_model(self, name):
+        """
+        Get the active model object of an artifact.
+
+        Args:
+            name: Artifact name
+
+        Returns:
+            Model object, or None if no version is loaded
+        """
+        loaded = self.models.get(name)
+        return loaded.model if loaded is not None else None
+
+    def available_versions(self, name):
+        """
+        List version directories of an artifact.
+
+        Args:
+            name: Artifact name
+
+        Returns:
+            Sorted list of version names
+        """
+        artifact_dir = os.path.join(self.base_path, name)
+        if not os.path.isdir(artifact_dir):
+            return []
+
+        return sorted(
+            entry for entry in os.listdir(artifact_dir)
+            if not entry.startswith('.') and os.path.isdir(os.path.join(artifact_dir, entry))
+        )
+
+    def active_version(self, name):
+        """
+        Resolve the version an artifact should be serving.
+
+        Args:
+            name: Artifact name
+
+        Only published versions are served: a version directory without a
+        CURRENT pointer may be unpublished or still being written.
+
+        Returns:
+            Version named in CURRENT, else None
+        """
+        current_path = os.path.join(self.base_path, name, CURRENT_FILE)
+        try:
+            with open(current_path) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def reload(self, name=None, version=None):
+        """
+        Load a version and swap it in if it differs from the active one.
+
+        Loading happens outside the swap lock; requests keep using the old
+        version until the new one is fully loaded. On failure the old version
+        stays active and the failed version is only retried when requested
+        explicitly.
+
+        Args:
+            name: Artifact name (default: all registered artifacts)
+            version: Version to activate (default: the published version)
+
+        Returns:
+            Dictionary mapping artifact names to their active version
+        """
+        names = [name] if name else list(self.loaders)
+
+        with self._reload_lock:
+            for artifact in names:
+                target = version or self.active_version(artifact)
+                current = self.models.get(artifact)
+                if target is None or (current is not None and current.version == target):
+                    continue
+                if version is None and target in self.failed_versions.get(artifact, ()):
+                    continue
+
+                path = os.path.join(self.base_path, artifact, target)
+                start = time.perf_counter()
+                try:
+                    model = self.loaders[artifact](path)
+                except Exception as e:
+                    self.errors[artifact] = f"{target}: {str(e)}"
+                    self.failed_versions.setdefault(artifact, set()).add(target)
+                    logger.error(f"Error loading {artifact} version {target}: {str(e)}")
+                    continue
+
+                loaded = LoadedModel(artifact, target, model, path, datetime.now(), time.perf_counter() - start)
+                with self._lock:
+                    self.models[artifact] = loaded
+                self.errors.pop(artifact, None)
+                self.failed_versions.get(artifact, set()).discard(target)
+
+                logger.info(f"Activated {artifact} version {target} in {loaded.load_seconds:.2f}s")
+
+        return {artifact: loaded.version for artifact, loaded in self.models.items()}
+
+    def activate(self, name, version):
+        """
+        Publish a version for every worker and activate it in this one.
+
+        Args:
+            name: Artifact name
+            version: Version directory name
+
+        Returns:
+            Dictionary mapping artifact names to their active version
+        """
+        if version not in self.available_versions(name):
+            raise ValueError(f"Unknown version {version} for model artifact {name}")
+
+        # Other workers follow the pointer on their next reload check
+        publish_version(os.path.join(self.base_path, name), version)
+
+        return self.reload(name, version)
+
+    def start_watching(self, interval=10.0):
+        """
+        Poll for newly published versions in a background thread.
+
+        Args:
+            interval: Seconds between checks
+        """
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    logger.error(f"Error checking for model updates: {str(e)}")
+
+        self._thread = threading.Thread(target=run, name='model-registry-watch', daemon=True)
+        self._thread.start()
+
+    def stop_watching(self):
+        """Stop polling for new versions."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get_status(self):
+        """
+        Get status information about loaded artifacts.
+
+        Returns:
+            Status information per registered artifact
+        """
+        status = {}
+        for name in self.loaders:
+            loaded = self.models.get(name)
+            status[name] = {
+                'active_version': loaded.version if loaded else None,
+                'loaded_at': loaded.loaded_at.isoformat() if loaded else None,
+                'load_seconds': round(loaded.load_seconds, 3) if loaded else None,
+                'available_versions': self.available_versions(name),
+                'failed_versions': sorted(self.failed_versions.get(name, ())),
+                'last_error': self.errors.get(name)
+            }
+        return status
@@ -0,0 +1,280 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+import logging
+import numpy as np
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+# Embeddings shared with each pool worker through its initializer
+_worker_matrix = None
+
+
+def _init_worker(matrix):
+    """Store the embedding matrix in a pool worker."""
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def _tile_similarities(block, tile, similarity):
+    """
+    Compute similarities between two sets of rows with one matrix product.
+
+    For 'cosine' the rows are normalized. The *_bits measures are computed
+    from binary rows: the product counts shared features, and the row sums
+    give the union and the differing features, matching the popcounts of
+    the packed signatures.
+
+    Args:
+        block: Rows of shape (b, d)
+        tile: Rows of shape (t, d)
+        similarity: One of 'cosine', 'jaccard_bits' or 'hamming_bits'
+
+    Returns:
+        float32 array of shape (b, t)
+    """
+    shared = block @ tile.T
+    if similarity == 'cosine':
+        return shared
+
+    block_bits = block.sum(axis=1)[:, np.newaxis]
+    tile_bits = tile.sum(axis=1)[np.newaxis, :]
+    if similarity == 'jaccard_bits':
+        union = block_bits + tile_bits - shared
+        return np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+    return 1.0 - (block_bits + tile_bits - 2.0 * shared) / block.shape[1]
+
+
+def _top_k_block(start, stop, k, matrix=None, tile_size=8192, similarity='cosine'):
+    """
+    Compute top-k neighbours for a block of rows.
+
+    Similarities are computed against tile_size rows at a time and merged into
+    a running top-k, so memory stays at block x (tile_size + k) scores
+    however many users there are.
+
+    Args:
+        start: First row of the block
+        stop: Row after the last row of the block
+        k: Number of neighbours per row
+        matrix: Normalized (cosine) or binary (*_bits) embedding matrix (defaults to the worker's copy)
+        tile_size: Rows compared against per matrix product
+        similarity: Similarity measure, one of 'cosine', 'jaccard_bits' or 'hamming_bits'
+
+    Returns:
+        Tuple of (start, int32 array of shape (stop - start, k))
+    """
+    if matrix is None:
+        matrix = _worker_matrix
+
+    n_users = matrix.shape[0]
+    neighbours = np.full((stop - start, k), -1, dtype=np.int32)
+    available = min(k, n_users - 1)
+    if available <= 0:
+        return start, neighbours
+
+    block = matrix[start:stop]
+    block_rows = np.arange(stop - start)
+    best_scores = np.zeros((stop - start, 0), dtype=np.float32)
+    best_rows = np.zeros((stop - start, 0), dtype=np.int64)
+
+    for tile_start in range(0, n_users, tile_size):
+        tile_stop = min(tile_start + tile_size, n_users)
+
+        # One matrix product gives the similarities of the block against the tile
+        similarities = _tile_similarities(block, matrix[tile_start:tile_stop], similarity)
+        own = block_rows + start - tile_start
+        inside = (own >= 0) & (own < tile_stop - tile_start)
+        similarities[block_rows[inside], own[inside]] = -np.inf
+
+        # Merge the tile into the running top-k
+        scores = np.concatenate([best_scores, similarities], axis=1)
+        rows = np.concatenate(
+            [best_rows, np.broadcast_to(np.arange(tile_start, tile_stop), similarities.shape)], axis=1
+        )
+        keep = min(available, scores.shape[1])
+        top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_rows = np.take_along_axis(rows, top, axis=1)
+
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    neighbours[:, :available] = np.take_along_axis(best_rows, order, axis=1)
+
+    return start, neighbours
+
+
+def build_neighbour_lists(matrix, k=20, block_size=2048, workers=None, tile_size=8192, similarity='cosine'):
+    """
+    Compute top-k neighbours for every row of an embedding matrix.
+
+    Rows are processed in blocks, each compared against the matrix a tile at a
+    time, so peak memory is block_size x tile_size similarities per worker;
+    large matrices are spread across a process pool.
+
+    Args:
+        matrix: Embedding matrix of shape (n_users, n_features)
+        k: Number of neighbours per user
+        block_size: Rows per block
+        workers: Number of worker processes (default: CPU count)
+        tile_size: Rows compared against per matrix product
+        similarity: One of 'cosine', 'jaccard_bits' or 'hamming_bits'; the *_bits
+            measures expect binary rows
+
+    Returns:
+        int32 array of shape (n_users, k) with row indices, padded with -1
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    n_users = matrix.shape[0]
+
+    if similarity == 'cosine':
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        prepared = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    else:
+        prepared = matrix
+
+    neighbours = np.full((n_users, k), -1, dtype=np.int32)
+    blocks = [(start, min(start + block_size, n_users)) for start in range(0, n_users, block_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or len(blocks) <= 1:
+        for start, stop in blocks:
+            _, block = _top_k_block(start, stop, k, prepared, tile_size, similarity)
+            neighbours[start:stop] = block
+        return neighbours
+
+    # Spawned workers avoid forking a process that is running other threads
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(workers, len(blocks)), mp_context=context,
+                             initializer=_init_worker, initargs=(prepared,)) as pool:
+        futures = [
+            pool.submit(_top_k_block, start, stop, k, None, tile_size, similarity) for start, stop in blocks
+        ]
+        for future in futures:
+            start, block = future.result()
+            neighbours[start:start + block.shape[0]] = block
+
+    return neighbours
+
+
+class NeighbourIndex:
+    """Precomputed similar-user lists for a PreferenceModel, refreshed in the background."""
+
+    def __init__(self, preference_model, k=20, block_size=2048, workers=None):
+        """
+        Initialize the neighbour index.
+
+        Args:
+            preference_model: PreferenceModel whose embeddings are indexed
+            k: Number of neighbours stored per user
+            block_size: Rows per similarity block
+            workers: Number of worker processes used for builds
+        """
+        self.preference_model = preference_model
+        self.k = k
+        self.block_size = block_size
+        self.workers = workers
+
+        # Snapshot from the last build: (row -> user ID, user ID -> row, neighbour rows)
+        self.snapshot = ([], {}, np.zeros((0, k), dtype=np.int32))
+        self.built_at = None
+        self.build_seconds = None
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._build_lock = threading.Lock()
+
+    def lookup(self, user_id, limit=5):
+        """
+        Read a user's precomputed neighbours.
+
+        Args:
+            user_id: User ID
+            limit: Maximum number of similar users to return
+
+        Returns:
+            List of similar user IDs, or None if the user is not in the index
+        """
+        # Read the snapshot once so a concurrent rebuild cannot mix versions
+        user_ids, user_rows, neighbours = self.snapshot
+
+        row = user_rows.get(user_id)
+        if row is None or limit > self.k:
+            return None
+
+        return [user_ids[i] for i in neighbours[row, :limit] if i >= 0]
+
+    def rebuild(self):
+        """
+        Rebuild neighbour lists from the current preference embeddings.
+
+        Returns:
+            Number of users indexed
+        """
+        with self._build_lock:
+            start = time.perf_counter()
+            generation, user_ids, matrix = self.preference_model.snapshot_embeddings()
+
+            # Lists are ranked by the measure the model ranks its own fallbacks with
+            neighbours = build_neighbour_lists(
+                matrix, self.k, self.block_size, self.workers, similarity=self.preference_model.similarity
+            )
+
+            # Publish the new snapshot with a single reference swap, then stop
+            # treating the users it covers as changed
+            self.snapshot = (user_ids, {uid: i for i, uid in enumerate(user_ids)}, neighbours)
+            self.preference_model.neighbours_published(generation)
+            self.built_at = datetime.now()
+            self.build_seconds = time.perf_counter() - start
+
+            logger.info(f"Neighbour index built for {len(user_ids)} users in {self.build_seconds:.2f}s")
+            return len(user_ids)
+
+    def start(self, interval):
+        """
+        Start periodic background rebuilds.
+
+        Args:
+            interval: Seconds between rebuilds
+        """
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.rebuild()
+                except Exception as e:
+                    logger.error(f"Error rebuilding neighbour index: {str(e)}")
+
+        self._thread = threading.Thread(target=run, name='neighbour-index', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop background rebuilds."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get_status(self):
+        """
+        Get status information about the neighbour index.
+
+        Returns:
+            Status information
+        """
+        user_ids, _, neighbours = self.snapshot
+
+        return {
+            'users_indexed': len(user_ids),
+            'neighbours_per_user': self.k,
+            'similarity': self.preference_model.similarity,
+            'built_at': self.built_at.isoformat() if self.built_at else None,
+            'build_seconds': self.build_seconds,
+            'memory_bytes': int(neighbours.nbytes),
+            'background_refresh': self._thread is not None
+        }
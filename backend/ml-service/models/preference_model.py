@@ -1,19 +1,52 @@
 import json
+import os
 import random
 from datetime import datetime
 import logging
+import threading
+from collections import OrderedDict
 import numpy as np
+from core.bit_signatures import pack_signatures, jaccard_similarities, hamming_similarities
 
 # Initialize logging
 logger = logging.getLogger(__name__)
 
+# Ways of combining group members' preferences into one profile
+GROUP_STRATEGIES = ('average', 'least_misery', 'approval')
+
+# Most interests kept in an aggregated group profile
+MAX_GROUP_INTERESTS = 5
+
+# Similarity measures for similar-user search; the *_bits ones scan packed uint64 signatures
+SIMILARITY_MEASURES = ('cosine', 'jaccard_bits', 'hamming_bits')
+
+def _check_similarity(similarity):
+    """Raise ValueError for an unknown similarity measure."""
+    if similarity not in SIMILARITY_MEASURES:
+        raise ValueError(f"Unknown similarity: {similarity}. Expected one of {', '.join(SIMILARITY_MEASURES)}")
+
 class PreferenceModel:
     """Model for handling user preferences and generating embeddings."""
     
-    def __init__(self):
-        """Initialize preference model."""
+    def __init__(self, store=None, write_queue=None, similar_cache_size=10000, similarity='cosine'):
+        """
+        Initialize preference model.
+        
+        Args:
+            store: PreferenceStore used to persist preferences (optional)
+            write_queue: WriteBehindQueue batching writes to the store (optional)
+            similar_cache_size: Maximum number of cached similar-user lists
+            similarity: Default similarity measure, one of SIMILARITY_MEASURES
+            
+        Raises:
+            ValueError: If the similarity measure is unknown
+        """
+        _check_similarity(similarity)
+        self.similarity = similarity
         self.initialized_date = datetime.now()
         self.preferences_db = {}  # In-memory store for user preferences
+        self.store = store
+        self.write_queue = write_queue
         
         # Categories for preferences embedding
         self.interest_categories = [
@@ -29,6 +62,48 @@ class PreferenceModel:
         # Transportation preferences for embedding
         self.transportation_preferences = ['public', 'rental', 'walking', 'tour']
         
+        # Pace preferences, stored per user alongside the embedding
+        self.pace_preferences = ['relaxed', 'moderate', 'intense']
+        self.pace_index = {name: i for i, name in enumerate(self.pace_preferences)}
+        
+        # Feature name -> embedding column, for O(1) lookups
+        self.embedding_size = (len(self.interest_categories) + 
+                               len(self.accommodation_types) + 
+                               len(self.transportation_preferences))
+        self.interest_index = {name: i for i, name in enumerate(self.interest_categories)}
+        self.accommodation_index = {
+            name: len(self.interest_categories) + i
+            for i, name in enumerate(self.accommodation_types)
+        }
+        self.transportation_index = {
+            name: len(self.interest_categories) + len(self.accommodation_types) + i
+            for i, name in enumerate(self.transportation_preferences)
+        }
+        
+        # Stored embeddings: one row per user, with squared norms kept alongside
+        self.user_index = {}
+        self.user_ids = []
+        self.embedding_matrix = np.zeros((64, self.embedding_size), dtype=np.float32)
+        self.embedding_sq_norms = np.zeros(64, dtype=np.float32)
+        self.pace_codes = np.full(64, self.pace_index['moderate'], dtype=np.uint8)
+        
+        # The binary features of each row packed into one word for the *_bits measures. The float
+        # rows are kept as well: patches, group profiles, decoding and neighbour builds read them
+        self.signatures = np.zeros(64, dtype=np.uint64)
+        
+        # Bounded LRU of similar-user lists: user_id -> (limit, similar user IDs, lowest cached similarity);
+        # every write scans all entries, so the bound also caps the cost of a write
+        self.similar_cache_size = similar_cache_size
+        self.similar_users_cache = OrderedDict()
+        
+        # Optional precomputed neighbour lists, and users changed since they were built:
+        # user_id -> change generation, cleared once a build that saw the change is published
+        self.neighbour_index = None
+        self.changed_users = {}
+        self.change_generation = 0
+        
+        self._lock = threading.RLock()
+        
         logger.info("Preference Model initialized")
     
     def update_preferences(self, user_id, preferences):
@@ -42,22 +117,406 @@ class PreferenceModel:
         Returns:
             Updated preferences
         """
-        # Store preferences
+        with self._lock:
+            self._index_preferences(user_id, preferences)
+        
+        # Outside the lock: a full write queue must not stall readers
+        self._persist(user_id, preferences)
+        
+        return preferences
+    
+    def _index_preferences(self, user_id, preferences):
+        """
+        Store preferences in memory and refresh the user's embedding row.
+        
+        Args:
+            user_id: User ID
+            preferences: User preferences dict
+        """
+        self.preferences_db[user_id] = preferences
+        
+        row = self._ensure_row(user_id)
+        self.embedding_matrix[row] = self.generate_embeddings(preferences)
+        self.embedding_sq_norms[row] = float(self.embedding_matrix[row] @ self.embedding_matrix[row])
+        self.pace_codes[row] = self.pace_index.get(preferences.get('pacePreference'), self.pace_index['moderate'])
+        self.signatures[row] = pack_signatures(self.embedding_matrix[row:row + 1])[0]
+        
+        self._mark_changed(user_id)
+        self._invalidate_similar_users(user_id)
+    
+    def _mark_changed(self, *user_ids):
+        """Record that users' embeddings changed since the neighbour lists were built; the caller holds the lock."""
+        self.change_generation += 1
+        self.changed_users.update(dict.fromkeys(user_ids, self.change_generation))
+    
+    def _persist(self, user_id, preferences):
+        """
+        Write a user's preferences to the persistent store, if one is configured.
+        
+        With a write queue the write is only buffered; the in-memory copy in
+        preferences_db serves reads until the queue flushes it.
+        
+        Args:
+            user_id: User ID
+            preferences: User preferences dict
+        """
+        if self.write_queue is not None:
+            self.write_queue.enqueue(user_id, preferences)
+        elif self.store is not None:
+            self.store.put_many({user_id: preferences})
+    
+    def patch_preferences(self, user_id, add_interests=None, remove_interests=None,
+                          accommodation_type=None, transportation_preference=None):
+        """
+        Apply a partial update to a user's preferences.
+        
+        Only the affected embedding entries are changed, and the stored norm is
+        adjusted by the same delta instead of being recomputed.
+        
+        Args:
+            user_id: User ID
+            add_interests: Interests to add (optional)
+            remove_interests: Interests to remove (optional)
+            accommodation_type: New accommodation type (optional)
+            transportation_preference: New transportation preference (optional)
+            
+        Returns:
+            Updated preferences
+            
+        Raises:
+            ValueError: If interests are not lists of strings or tiers are not strings
+        """
+        for interests in (add_interests, remove_interests):
+            if interests is not None and not (
+                    isinstance(interests, list) and all(isinstance(interest, str) for interest in interests)):
+                raise ValueError('Interests must be a list of strings')
+        for tier in (accommodation_type, transportation_preference):
+            if tier is not None and not isinstance(tier, str):
+                raise ValueError('Accommodation type and transportation preference must be strings')
+        
+        # Read through the store before locking; its round-trip must not hold up other users
+        self.get_user_preferences(user_id)
+        
+        with self._lock:
+            # Merge into what is in memory now, so a concurrent patch of the same user is kept
+            current = self._indexed_preferences(user_id)
+            if current is None:
+                preferences = {
+                    'interests': list(add_interests or []),
+                    'accommodationType': accommodation_type or 'mid-range',
+                    'transportationPreference': transportation_preference or 'public'
+                }
+                self._index_preferences(user_id, preferences)
+            else:
+                preferences = self._apply_patch(
+                    user_id, current, add_interests, remove_interests,
+                    accommodation_type, transportation_preference
+                )
+            
+            # Queued under the lock, so concurrent patches reach the store in the order they merged
+            if self.write_queue is not None:
+                self._persist(user_id, preferences)
+        
+        # A direct store write is a round-trip and must not hold the lock
+        if self.write_queue is None:
+            self._persist(user_id, preferences)
+        
+        return preferences
+    
+    def _apply_patch(self, user_id, current, add_interests, remove_interests,
+                     accommodation_type, transportation_preference):
+        """
+        Apply a partial update to an indexed user's row; the caller holds the lock.
+        
+        Args:
+            user_id: User ID
+            current: Current preferences dict
+            add_interests: Interests to add
+            remove_interests: Interests to remove
+            accommodation_type: New accommodation type
+            transportation_preference: New transportation preference
+            
+        Returns:
+            Updated preferences
+        """
+        preferences = dict(current)
+        interests = list(preferences.get('interests', []))
+        row = self.user_index[user_id]
+        changes = {}
+        
+        for interest in remove_interests or []:
+            if interest in interests:
+                interests.remove(interest)
+                if interest in self.interest_index:
+                    changes[self.interest_index[interest]] = 0.0
+        
+        for interest in add_interests or []:
+            if interest not in interests:
+                interests.append(interest)
+                if interest in self.interest_index:
+                    changes[self.interest_index[interest]] = 1.0
+        
+        preferences['interests'] = interests
+        
+        if accommodation_type is not None:
+            previous = preferences.get('accommodationType', 'mid-range')
+            if previous in self.accommodation_index:
+                changes[self.accommodation_index[previous]] = 0.0
+            if accommodation_type in self.accommodation_index:
+                changes[self.accommodation_index[accommodation_type]] = 1.0
+            preferences['accommodationType'] = accommodation_type
+        
+        if transportation_preference is not None:
+            previous = preferences.get('transportationPreference', 'public')
+            if previous in self.transportation_index:
+                changes[self.transportation_index[previous]] = 0.0
+            if transportation_preference in self.transportation_index:
+                changes[self.transportation_index[transportation_preference]] = 1.0
+            preferences['transportationPreference'] = transportation_preference
+        
         self.preferences_db[user_id] = preferences
         
+        # Apply the delta to the stored row and its squared norm
+        changed = False
+        for column, value in changes.items():
+            old_value = self.embedding_matrix[row, column]
+            if old_value != value:
+                self.embedding_matrix[row, column] = value
+                self.embedding_sq_norms[row] += value * value - old_value * old_value
+                changed = True
+        
+        if changed:
+            self.signatures[row] = pack_signatures(self.embedding_matrix[row:row + 1])[0]
+            self._mark_changed(user_id)
+            self._invalidate_similar_users(user_id)
+    
         return preferences
     
+    def _ensure_row(self, user_id):
+        """
+        Get the embedding row for a user, allocating one if needed.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Row index in the embedding matrix
+        """
+        row = self.user_index.get(user_id)
+        if row is not None:
+            return row
+        
+        row = len(self.user_ids)
+        if row >= self.embedding_matrix.shape[0]:
+            # Grow capacity geometrically so appends stay amortized O(1)
+            capacity = self.embedding_matrix.shape[0] * 2
+            matrix = np.zeros((capacity, self.embedding_size), dtype=np.float32)
+            matrix[:row] = self.embedding_matrix[:row]
+            sq_norms = np.zeros(capacity, dtype=np.float32)
+            sq_norms[:row] = self.embedding_sq_norms[:row]
+            pace_codes = np.full(capacity, self.pace_index['moderate'], dtype=np.uint8)
+            pace_codes[:row] = self.pace_codes[:row]
+            signatures = np.zeros(capacity, dtype=np.uint64)
+            signatures[:row] = self.signatures[:row]
+            self.embedding_matrix, self.embedding_sq_norms, self.pace_codes = matrix, sq_norms, pace_codes
+            self.signatures = signatures
+        
+        self.user_index[user_id] = row
+        self.user_ids.append(user_id)
+        
+        return row
+    
+    def _invalidate_similar_users(self, user_id):
+        """
+        Drop cached similar-user lists that a change to user_id may affect.
+        
+        An entry is affected if it contains the user, or if the user's new
+        embedding is now at least as similar as the entry's weakest match
+        (any user qualifies for a list shorter than its limit).
+        
+        Args:
+            user_id: User whose embedding changed
+        """
+        self.similar_users_cache.pop(user_id, None)
+        if not self.similar_users_cache:
+            return
+        
+        owners = [uid for uid in self.similar_users_cache if uid in self.user_index]
+        rows = np.fromiter((self.user_index[uid] for uid in owners), dtype=np.int64, count=len(owners))
+        similarities = self._similarities(self.embedding_matrix[self.user_index[user_id]], self.similarity, rows)
+        
+        for owner, similarity in zip(owners, similarities):
+            _, similar_ids, threshold = self.similar_users_cache[owner]
+            if user_id in similar_ids or similarity >= threshold:
+                del self.similar_users_cache[owner]
+    
+    def _similarities(self, embedding, similarity, rows=None):
+        """
+        Compute a similarity measure between an embedding and stored rows.
+        
+        Args:
+            embedding: Embedding vector
+            similarity: One of SIMILARITY_MEASURES
+            rows: Row indices to compare against (default: all users)
+            
+        Returns:
+            Array of similarities
+        """
+        if similarity == 'cosine':
+            return self._cosine_similarities(embedding, rows)
+        
+        signature = pack_signatures(np.asarray(embedding)[np.newaxis, :])[0]
+        signatures = self.signatures[:len(self.user_ids)] if rows is None else self.signatures[rows]
+        if similarity == 'jaccard_bits':
+            return jaccard_similarities(signature, signatures)
+        return hamming_similarities(signature, signatures, self.embedding_size)
+    
+    def _cosine_similarities(self, embedding, rows=None):
+        """
+        Compute cosine similarity between an embedding and stored rows.
+        
+        Args:
+            embedding: Embedding vector
+            rows: Row indices to compare against (default: all users)
+            
+        Returns:
+            Array of similarities (0 where either vector is all zeros)
+        """
+        if rows is None:
+            matrix = self.embedding_matrix[:len(self.user_ids)]
+            sq_norms = self.embedding_sq_norms[:len(self.user_ids)]
+        else:
+            matrix = self.embedding_matrix[rows]
+            sq_norms = self.embedding_sq_norms[rows]
+        
+        norms = np.sqrt(np.maximum(sq_norms, 0.0)) * np.linalg.norm(embedding)
+        dots = matrix @ embedding
+        
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+    
     def get_user_preferences(self, user_id):
         """
         Get a user's stored preferences.
         
+        Users loaded from a bulk snapshot have no stored dict; their
+        preferences are decoded from the embedding row. Users not in memory
+        are read through the persistent store and indexed.
+        
         Args:
             user_id: User ID
             
         Returns:
             User preferences or None if not found
         """
-        return self.preferences_db.get(user_id)
+        preferences = self._indexed_preferences(user_id)
+        if preferences is not None:
+            return preferences
+        
+        if self.store is not None:
+            preferences = self.store.get(user_id)
+            if preferences is not None:
+                with self._lock:
+                    # An update that raced the store read is newer than what was read
+                    current = self._indexed_preferences(user_id)
+                    if current is not None:
+                        return current
+                    self._index_preferences(user_id, preferences)
+                return preferences
+        
+        return None
+    
+    def _indexed_preferences(self, user_id):
+        """
+        Get a user's preferences from memory only, without reading the store.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            User preferences or None if the user is not indexed
+        """
+        preferences = self.preferences_db.get(user_id)
+        if preferences is not None:
+            return preferences
+        
+        row = self.user_index.get(user_id)
+        if row is not None:
+            return self._decode_row(row)
+        
+        return None
+    
+    def _decode_row(self, row):
+        """
+        Rebuild a preferences dict from a stored embedding row.
+        
+        Args:
+            row: Row index in the embedding matrix
+            
+        Returns:
+            Preferences dict
+        """
+        embedding = self.embedding_matrix[row]
+        n_interests = len(self.interest_categories)
+        n_accommodation = len(self.accommodation_types)
+        
+        accommodation = np.flatnonzero(embedding[n_interests:n_interests + n_accommodation])
+        transportation = np.flatnonzero(embedding[n_interests + n_accommodation:])
+        
+        return {
+            'interests': [self.interest_categories[i] for i in np.flatnonzero(embedding[:n_interests])],
+            'accommodationType': self.accommodation_types[accommodation[0]] if len(accommodation) else 'mid-range',
+            'transportationPreference': self.transportation_preferences[transportation[0]] if len(transportation) else 'public',
+            'pacePreference': self.pace_preferences[self.pace_codes[row]]
+        }
+    
+    def load_snapshot(self, path):
+        """
+        Replace stored embeddings with a bulk snapshot written by the ingestion pipeline.
+        
+        Preferences updated through the API are re-applied on top, since they
+        are newer than the export the snapshot was built from. Stored
+        preferences are live state rather than a read-only model, so the
+        snapshot is applied in place under the model lock.
+        
+        Args:
+            path: Snapshot directory with user_ids.npy, embeddings.npy and pace.npy
+            
+        Returns:
+            Number of users in the snapshot
+        """
+        user_ids = np.char.decode(np.load(os.path.join(path, 'user_ids.npy')), 'utf-8').tolist()
+        embeddings = np.load(os.path.join(path, 'embeddings.npy'), mmap_mode='r')
+        pace_codes = np.load(os.path.join(path, 'pace.npy'), mmap_mode='r')
+        
+        if embeddings.shape != (len(user_ids), self.embedding_size):
+            raise ValueError(f"Snapshot embeddings have shape {embeddings.shape}, expected ({len(user_ids)}, {self.embedding_size})")
+        
+        # Build the new arrays outside the lock, with headroom for new users
+        count = len(user_ids)
+        capacity = max(64, int(count * 1.25))
+        matrix = np.zeros((capacity, self.embedding_size), dtype=np.float32)
+        matrix[:count] = embeddings
+        sq_norms = np.zeros(capacity, dtype=np.float32)
+        sq_norms[:count] = np.einsum('ij,ij->i', matrix[:count], matrix[:count])
+        codes = np.full(capacity, self.pace_index['moderate'], dtype=np.uint8)
+        codes[:count] = pace_codes
+        signatures = np.zeros(capacity, dtype=np.uint64)
+        signatures[:count] = pack_signatures(matrix[:count])
+        user_index = {uid: i for i, uid in enumerate(user_ids)}
+        
+        with self._lock:
+            self.embedding_matrix, self.embedding_sq_norms, self.pace_codes = matrix, sq_norms, codes
+            self.signatures = signatures
+            self.user_ids, self.user_index = user_ids, user_index
+            self.similar_users_cache.clear()
+            # Neighbour lists built before the load describe the old embeddings
+            self._mark_changed(*user_ids)
+            
+            for user_id, preferences in list(self.preferences_db.items()):
+                self._index_preferences(user_id, preferences)
+        
+        logger.info(f"Loaded preference snapshot with {count} users from {path}")
+        return count
     
     def generate_embeddings(self, preferences):
         """
@@ -73,34 +532,27 @@ class PreferenceModel:
         # In a real system, this would use proper embeddings from a model
         
         # Initialize embedding vector
-        embedding = np.zeros(len(self.interest_categories) + 
-                             len(self.accommodation_types) + 
-                             len(self.transportation_preferences))
+        embedding = np.zeros(self.embedding_size, dtype=np.float32)
         
         # Set values for interests
         interests = preferences.get('interests', [])
         for interest in interests:
-            if interest in self.interest_categories:
-                idx = self.interest_categories.index(interest)
-                embedding[idx] = 1.0
+            if interest in self.interest_index:
+                embedding[self.interest_index[interest]] = 1.0
         
         # Set value for accommodation type
         accommodation = preferences.get('accommodationType', 'mid-range')
-        if accommodation in self.accommodation_types:
-            idx = len(self.interest_categories) + self.accommodation_types.index(accommodation)
-            embedding[idx] = 1.0
+        if accommodation in self.accommodation_index:
+            embedding[self.accommodation_index[accommodation]] = 1.0
         
         # Set value for transportation preference
         transportation = preferences.get('transportationPreference', 'public')
-        if transportation in self.transportation_preferences:
-            idx = (len(self.interest_categories) + 
-                  len(self.accommodation_types) + 
-                  self.transportation_preferences.index(transportation))
-            embedding[idx] = 1.0
+        if transportation in self.transportation_index:
+            embedding[self.transportation_index[transportation]] = 1.0
         
         return embedding.tolist()
     
-    def find_similar_users(self, user_id, embedding, limit=5):
+    def find_similar_users(self, user_id, embedding, limit=5, similarity=None):
         """
         Find users with similar preferences.
         
@@ -108,28 +560,232 @@ class PreferenceModel:
             user_id: User ID to exclude
             embedding: Embedding vector to compare
             limit: Maximum number of similar users to return
+            similarity: One of SIMILARITY_MEASURES; 'jaccard_bits' and 'hamming_bits'
+                compare packed binary signatures with popcounts (default: the model's measure)
+            
+        Returns:
+            List of similar user IDs
+            
+        Raises:
+            ValueError: If the similarity measure is unknown
+        """
+        similarity = similarity or self.similarity
+        _check_similarity(similarity)
+        
+        with self._lock:
+            return self._rank_similar_users(user_id, np.asarray(embedding, dtype=float), limit, similarity)[0]
+    
+    def get_similar_users(self, user_id, limit=5):
+        """
+        Find users similar to a stored user by the model's similarity measure, using the similar-user cache.
+        
+        Args:
+            user_id: User ID with stored preferences
+            limit: Maximum number of similar users to return
             
         Returns:
             List of similar user IDs
         """
-        # Convert embedding to numpy array
-        embedding = np.array(embedding)
-        
-        # Calculate similarity scores with all users
-        similarities = []
-        for uid, prefs in self.preferences_db.items():
-            if uid != user_id:
-                other_embedding = np.array(self.generate_embeddings(prefs))
-                # Cosine similarity (simplified)
-                similarity = np.dot(embedding, other_embedding) / (
-                    np.linalg.norm(embedding) * np.linalg.norm(other_embedding)
-                )
-                similarities.append((uid, similarity))
+        # Precomputed neighbours are valid for users unchanged since the last build
+        if self.neighbour_index is not None and user_id not in self.changed_users:
+            similar_ids = self.neighbour_index.lookup(user_id, limit)
+            if similar_ids is not None:
+                return similar_ids
+        
+        with self._lock:
+            cached = self.similar_users_cache.get(user_id)
+            if cached is not None and cached[0] == limit:
+                self.similar_users_cache.move_to_end(user_id)
+                return list(cached[1])
+            
+            row = self.user_index.get(user_id)
+            if row is None:
+                return []
+            
+            similar_ids, threshold = self._rank_similar_users(user_id, self.embedding_matrix[row], limit, self.similarity)
+            if len(similar_ids) < limit:
+                # Not enough users yet: any new one belongs in the list
+                threshold = -np.inf
+            self.similar_users_cache[user_id] = (limit, tuple(similar_ids), threshold)
+            self.similar_users_cache.move_to_end(user_id)
+            if len(self.similar_users_cache) > self.similar_cache_size:
+                self.similar_users_cache.popitem(last=False)
+            
+            return similar_ids
+    
+    def snapshot_embeddings(self):
+        """
+        Copy the stored embeddings for an offline neighbour build.
+        
+        Users stay in changed_users until neighbours_published is called
+        with the returned generation, so they are not served stale neighbours
+        while the build runs or after it fails.
+        
+        Returns:
+            Tuple of (change generation, list of user IDs by row, embedding matrix copy)
+        """
+        with self._lock:
+            count = len(self.user_ids)
+            return self.change_generation, list(self.user_ids), self.embedding_matrix[:count].copy()
+    
+    def neighbours_published(self, generation):
+        """
+        Forget changes covered by a published neighbour build.
         
-        # Sort by similarity and return top matches
-        similar_users = sorted(similarities, key=lambda x: x[1], reverse=True)[:limit]
+        Args:
+            generation: Change generation returned by the snapshot_embeddings call the build used
+        """
+        with self._lock:
+            self.changed_users = {
+                user_id: changed for user_id, changed in self.changed_users.items() if changed > generation
+            }
+    
+    def _rank_similar_users(self, user_id, embedding, limit, similarity):
+        """
+        Rank stored users by similarity to an embedding.
         
-        return [uid for uid, _ in similar_users]
+        Args:
+            user_id: User ID to exclude
+            embedding: Embedding vector to compare
+            limit: Maximum number of similar users to return
+            similarity: One of SIMILARITY_MEASURES
+            
+        Returns:
+            Tuple of (similar user IDs, lowest similarity among them)
+        """
+        similarities = self._similarities(embedding, similarity)
+        
+        # Exclude the user themselves
+        own_row = self.user_index.get(user_id)
+        if own_row is not None:
+            similarities[own_row] = -np.inf
+        
+        candidates = len(self.user_ids) - (own_row is not None)
+        limit = min(limit, candidates)
+        if limit <= 0:
+            return [], -np.inf
+        
+        # Partial selection of the top matches, then sort just those
+        top = np.argpartition(-similarities, limit - 1)[:limit]
+        top = top[np.argsort(-similarities[top], kind='stable')]
+        
+        return [self.user_ids[i] for i in top], float(similarities[top[-1]])
+    
+    def get_embeddings(self, user_ids):
+        """
+        Get the embedding rows of several users in one batch.
+        
+        Users not in memory are read through the persistent store with a single get_many.
+        
+        Args:
+            user_ids: List of user IDs
+            
+        Returns:
+            Tuple of (IDs of users with preferences, embedding matrix, pace codes),
+            rows aligned with the returned IDs
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        
+        missing = [user_id for user_id in user_ids if user_id not in self.user_index]
+        if missing and self.store is not None:
+            loaded = self.store.get_many(missing)
+            if loaded:
+                with self._lock:
+                    for user_id, preferences in loaded.items():
+                        if user_id not in self.user_index:
+                            self._index_preferences(user_id, preferences)
+        
+        with self._lock:
+            found = [user_id for user_id in user_ids if user_id in self.user_index]
+            rows = np.fromiter((self.user_index[user_id] for user_id in found), dtype=np.int64, count=len(found))
+            return found, self.embedding_matrix[rows], self.pace_codes[rows]
+    
+    def aggregate_group_preferences(self, user_ids, strategy='average', approval_threshold=0.5):
+        """
+        Combine several users' preferences into one group profile.
+        
+        Strategies:
+            average: members' interest vectors are normalized to equal weight and
+                averaged; accommodation and pace take the rounded mean level
+            least_misery: interests are ranked by the least interested member, so
+                only shared interests remain (the average is used if none is shared);
+                accommodation and pace take the lowest level
+            approval: interests approved by at least approval_threshold of the
+                members, ranked by votes; accommodation and pace take the most voted level
+        
+        Args:
+            user_ids: List of member user IDs
+            strategy: One of GROUP_STRATEGIES
+            approval_threshold: Share of members that must approve an interest (approval only)
+            
+        Returns:
+            Dictionary with the group preferences, per-interest scores and the
+            members with and without stored preferences
+            
+        Raises:
+            ValueError: If the strategy is unknown
+        """
+        if strategy not in GROUP_STRATEGIES:
+            raise ValueError(f"Unknown group strategy: {strategy}. Expected one of {', '.join(GROUP_STRATEGIES)}")
+        
+        members, embeddings, pace_codes = self.get_embeddings(user_ids)
+        found = set(members)
+        missing = [user_id for user_id in dict.fromkeys(user_ids) if user_id not in found]
+        if not members:
+            return {'preferences': {}, 'interestScores': {}, 'members': [], 'missing': missing}
+        
+        n_interests = len(self.interest_categories)
+        n_accommodation = len(self.accommodation_types)
+        interests = embeddings[:, :n_interests]
+        accommodation = embeddings[:, n_interests:n_interests + n_accommodation]
+        transportation = embeddings[:, n_interests + n_accommodation:]
+        
+        # Accommodation as an ordinal level (budget < mid-range < luxury); mid-range when unset
+        accommodation_levels = np.where(
+            accommodation.any(axis=1), accommodation.argmax(axis=1), self.accommodation_types.index('mid-range')
+        )
+        
+        # Each member's interests sum to one, so broad profiles do not outvote narrow ones
+        counts = interests.sum(axis=1, keepdims=True)
+        normalized = np.divide(interests, counts, out=np.zeros_like(interests), where=counts > 0)
+        average = normalized.mean(axis=0)
+        
+        if strategy == 'average':
+            scores = average
+            accommodation_level = int(np.rint(accommodation_levels.mean()))
+            pace_code = int(np.rint(pace_codes.mean()))
+        elif strategy == 'least_misery':
+            scores = normalized.min(axis=0)
+            if not scores.any():
+                # No interest is shared by everyone; fall back to the group average
+                scores = average
+            accommodation_level = int(accommodation_levels.min())
+            pace_code = int(pace_codes.min())
+        else:  # approval
+            votes = interests.mean(axis=0)
+            scores = np.where(votes >= approval_threshold, votes, 0.0)
+            accommodation_level = int(np.bincount(accommodation_levels, minlength=n_accommodation).argmax())
+            pace_code = int(np.bincount(pace_codes, minlength=len(self.pace_preferences)).argmax())
+        
+        ranked = [i for i in np.argsort(-scores, kind='stable')[:MAX_GROUP_INTERESTS] if scores[i] > 0]
+        transportation_votes = transportation.sum(axis=0)
+        
+        preferences = {
+            'interests': [self.interest_categories[i] for i in ranked],
+            'accommodationType': self.accommodation_types[accommodation_level],
+            'transportationPreference': (
+                self.transportation_preferences[int(transportation_votes.argmax())]
+                if transportation_votes.any() else 'public'
+            ),
+            'pacePreference': self.pace_preferences[pace_code]
+        }
+        
+        return {
+            'preferences': preferences,
+            'interestScores': {self.interest_categories[i]: round(float(scores[i]), 4) for i in ranked},
+            'members': members,
+            'missing': missing
+        }
     
     def get_status(self):
         """
@@ -142,5 +798,11 @@ class PreferenceModel:
             'initialized': self.initialized_date.isoformat(),
             'uptime_seconds': (datetime.now() - self.initialized_date).total_seconds(),
             'users_with_preferences': len(self.preferences_db),
+            'cached_similar_user_lists': len(self.similar_users_cache),
+            'users_changed_since_index_build': len(self.changed_users),
+            'similarity': self.similarity,
+            'signature_bytes': int(self.signatures[:len(self.user_ids)].nbytes),
+            'store': self.store.get_status() if self.store is not None else None,
+            'write_queue': self.write_queue.get_status() if self.write_queue is not None else None,
             'interest_categories': self.interest_categories
         }
\ No newline at end of file
@@ -0,0 +1,442 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+import logging
+
+# pymongo is only needed for the MongoDB backend
+try:
+    from pymongo import MongoClient, UpdateOne
+except ImportError:
+    MongoClient = None
+    UpdateOne = None
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+# Preference fields persisted and read back (projection for reads)
+PREFERENCE_FIELDS = [
+    'interests', 'accommodationType', 'transportationPreference',
+    'pacePreference', 'foodPreferences', 'accessibility'
+]
+
+
+class PreferenceStore:
+    """Interface for persistent preference storage."""
+
+    def get(self, user_id):
+        """
+        Get one user's preferences.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Preferences dict or None if not found
+        """
+        return self.get_many([user_id]).get(user_id)
+
+    def get_many(self, user_ids):
+        """
+        Get several users' preferences in one round-trip.
+
+        Args:
+            user_ids: List of user IDs
+
+        Returns:
+            Dictionary mapping found user IDs to preferences
+        """
+        raise NotImplementedError
+
+    def put_many(self, preferences_by_user):
+        """
+        Upsert several users' preferences in one batch.
+
+        Args:
+            preferences_by_user: Dictionary mapping user IDs to preferences
+        """
+        raise NotImplementedError
+
+    def count(self):
+        """Get the number of stored users."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the store."""
+
+    def get_status(self):
+        """
+        Get status information about the store.
+
+        Returns:
+            Status information
+        """
+        return {'backend': type(self).__name__}
+
+
+def _project(preferences):
+    """Keep only persisted preference fields."""
+    return {field: preferences[field] for field in PREFERENCE_FIELDS if field in preferences}
+
+
+class InMemoryPreferenceStore(PreferenceStore):
+    """Dictionary-backed store for tests and offline development."""
+
+    def __init__(self):
+        """Initialize the in-memory store."""
+        self.documents = {}
+        self.write_batches = 0
+        self._lock = threading.Lock()
+
+    def get_many(self, user_ids):
+        with self._lock:
+            return {
+                user_id: copy.deepcopy(self.documents[user_id])
+                for user_id in user_ids if user_id in self.documents
+            }
+
+    def put_many(self, preferences_by_user):
+        with self._lock:
+            for user_id, preferences in preferences_by_user.items():
+                self.documents[user_id] = copy.deepcopy(_project(preferences))
+            self.write_batches += 1
+
+    def count(self):
+        return len(self.documents)
+
+    def get_status(self):
+        return {
+            'backend': 'memory',
+            'documents': len(self.documents),
+            'write_batches': self.write_batches
+        }
+
+
+class MongoPreferenceStore(PreferenceStore):
+    """MongoDB-backed store using a pooled client, batched upserts and projected reads."""
+
+    def __init__(self, uri, collection='ml_preferences', max_pool_size=50, client=None):
+        """
+        Initialize the MongoDB store.
+
+        Args:
+            uri: MongoDB connection URI including the database name
+            collection: Collection holding one document per user
+            max_pool_size: Maximum pooled connections per worker
+            client: Pre-built client (e.g. mongomock.MongoClient) instead of connecting to uri
+        """
+        if MongoClient is None:
+            raise ImportError("pymongo is required for the MongoDB preference store")
+        if client is None:
+            client = MongoClient(uri, maxPoolSize=max_pool_size, retryWrites=True)
+
+        self.client = client
+        database = client.get_default_database('itinera')
+        self.collection = database[collection]
+        self.collection.create_index('userId', unique=True)
+        self.projection = {'_id': 0, 'userId': 1, **{field: 1 for field in PREFERENCE_FIELDS}}
+
+    def get_many(self, user_ids):
+        if not user_ids:
+            return {}
+
+        documents = self.collection.find({'userId': {'$in': list(user_ids)}}, self.projection)
+        return {document.pop('userId'): document for document in documents}
+
+    def put_many(self, preferences_by_user):
+        if not preferences_by_user:
+            return
+
+        operations = [
+            UpdateOne({'userId': user_id}, {'$set': _project(preferences)}, upsert=True)
+            for user_id, preferences in preferences_by_user.items()
+        ]
+        self.collection.bulk_write(operations, ordered=False)
+
+    def count(self):
+        return self.collection.estimated_document_count()
+
+    def close(self):
+        self.client.close()
+
+    def get_status(self):
+        return {
+            'backend': 'mongo',
+            'collection': self.collection.name
+        }
+
+
+class _Missing:
+    """Cache entry for a user known to be absent, so repeated misses skip the database until it expires."""
+
+    __slots__ = ('expires_at',)
+
+    def __init__(self, expires_at):
+        self.expires_at = expires_at
+
+
+class CachedPreferenceStore(PreferenceStore):
+    """Read-through LRU cache in front of another store; writes go through to it."""
+
+    def __init__(self, backend, max_size=100000, negative_ttl=30.0):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Underlying PreferenceStore
+            max_size: Maximum number of cached users (including known misses)
+            negative_ttl: Seconds a miss is cached; users saved through another worker appear after it
+        """
+        self.backend = backend
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _remember(self, user_id, value):
+        """Insert a cache entry, evicting the least recently used ones."""
+        self.cache[user_id] = value
+        self.cache.move_to_end(user_id)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    def get_many(self, user_ids):
+        found, missing = {}, []
+        now = time.monotonic()
+
+        with self._lock:
+            for user_id in user_ids:
+                value = self.cache.get(user_id)
+                if value is None or isinstance(value, _Missing) and value.expires_at <= now:
+                    missing.append(user_id)
+                    continue
+                self.cache.move_to_end(user_id)
+                self.hits += 1
+                if not isinstance(value, _Missing):
+                    found[user_id] = value
+            self.misses += len(missing)
+
+        if missing:
+            loaded = self.backend.get_many(missing)
+            miss = _Missing(time.monotonic() + self.negative_ttl)
+            with self._lock:
+                for user_id in missing:
+                    self._remember(user_id, loaded.get(user_id, miss))
+            found.update(loaded)
+
+        return found
+
+    def put_many(self, preferences_by_user):
+        self.backend.put_many(preferences_by_user)
+        with self._lock:
+            for user_id, preferences in preferences_by_user.items():
+                self._remember(user_id, _project(preferences))
+
+    def count(self):
+        return self.backend.count()
+
+    def close(self):
+        self.backend.close()
+
+    def get_status(self):
+        total = self.hits + self.misses
+        return {
+            **self.backend.get_status(),
+            'cache_size': len(self.cache),
+            'cache_hit_rate': round(self.hits / total, 4) if total else None
+        }
+
+
+def create_preference_store(config):
+    """
+    Build the preference store selected in the configuration.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        PreferenceStore, or None if persistence is disabled
+    """
+    backend = config.PREFERENCE_STORE
+    if backend == 'mongo':
+        store = MongoPreferenceStore(
+            config.MONGO_URI,
+            collection=config.MONGO_PREFERENCES_COLLECTION,
+            max_pool_size=config.MONGO_MAX_POOL_SIZE
+        )
+    elif backend == 'memory':
+        store = InMemoryPreferenceStore()
+    else:
+        return None
+
+    return CachedPreferenceStore(
+        store, max_size=config.PREFERENCE_CACHE_SIZE, negative_ttl=config.PREFERENCE_NEGATIVE_TTL
+    )
+
+
+class WriteBehindQueue:
+    """Buffers preference writes and flushes them to a store in batches from a background thread."""
+
+    def __init__(self, store, max_batch=500, flush_interval=1.0, max_pending=10000, enqueue_timeout=5.0):
+        """
+        Initialize the queue and start its flush thread.
+
+        Args:
+            store: PreferenceStore receiving the batched writes
+            max_batch: Flush as soon as this many users are pending, and at most this many per write
+            flush_interval: Maximum seconds a write waits before being flushed
+            max_pending: Pending users above which enqueue blocks (backpressure)
+            enqueue_timeout: Seconds enqueue may block before raising
+        """
+        self.store = store
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+
+        # user_id -> latest preferences; repeated updates to a user coalesce into one write
+        self.pending = OrderedDict()
+        self.flushed_writes = 0
+        self.coalesced_writes = 0
+        self.failed_flushes = 0
+        self._in_flight = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._thread = threading.Thread(target=self._run, name='preference-write-behind', daemon=True)
+        self._thread.start()
+
+    def enqueue(self, user_id, preferences):
+        """
+        Queue a write, replacing any pending write for the same user.
+
+        Args:
+            user_id: User ID
+            preferences: User preferences dict
+
+        Raises:
+            TimeoutError: If the queue stays full for longer than enqueue_timeout
+        """
+        if self._closed:
+            # The flush thread is gone; write straight through
+            self.store.put_many({user_id: preferences})
+            return
+
+        with self._condition:
+            if user_id in self.pending:
+                self.pending[user_id] = preferences
+                self.coalesced_writes += 1
+                return
+
+            if not self._condition.wait_for(lambda: len(self.pending) < self.max_pending or self._closed,
+                                            timeout=self.enqueue_timeout):
+                raise TimeoutError("Preference write queue is full")
+
+            self.pending[user_id] = preferences
+            if len(self.pending) >= self.max_batch:
+                self._condition.notify_all()
+
+    def _take_batch(self):
+        """Remove up to max_batch pending writes, oldest first."""
+        batch = {}
+        while self.pending and len(batch) < self.max_batch:
+            user_id, preferences = self.pending.popitem(last=False)
+            batch[user_id] = preferences
+        self._in_flight += 1
+        return batch
+
+    def _write(self, batch):
+        """
+        Write a batch to the store, re-queuing it on failure.
+
+        Args:
+            batch: Dictionary mapping user IDs to preferences
+
+        Returns:
+            True if the write succeeded
+        """
+        try:
+            self.store.put_many(batch)
+            succeeded = True
+        except Exception as e:
+            succeeded = False
+            logger.error(f"Error flushing {len(batch)} preference writes: {str(e)}")
+
+        with self._condition:
+            self._in_flight -= 1
+            if succeeded:
+                self.flushed_writes += len(batch)
+            else:
+                self.failed_flushes += 1
+                # Re-queue unless a newer write for the same user arrived meanwhile
+                for user_id, preferences in batch.items():
+                    self.pending.setdefault(user_id, preferences)
+            self._condition.notify_all()
+
+        return succeeded
+
+    def _run(self):
+        """Flush loop: write a batch when it is full or the flush interval elapses."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: len(self.pending) >= self.max_batch or self._closed,
+                    timeout=self.flush_interval
+                )
+                if not self.pending:
+                    if self._closed:
+                        return
+                    continue
+                batch = self._take_batch()
+
+            if not self._write(batch):
+                # Back off before retrying a failing store; close() bounds the wait on shutdown
+                time.sleep(self.flush_interval)
+
+    def flush(self, timeout=None):
+        """
+        Block until every write queued so far has been attempted.
+
+        Args:
+            timeout: Maximum seconds to wait (default: no limit)
+
+        Returns:
+            True if the queue drained
+        """
+        with self._condition:
+            self._condition.notify_all()
+            return self._condition.wait_for(
+                lambda: not self.pending and self._in_flight == 0, timeout=timeout
+            )
+
+    def close(self, timeout=30.0):
+        """
+        Drain pending writes and stop the flush thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the drain
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+        if self.pending:
+            logger.error(f"{len(self.pending)} preference writes were not flushed before shutdown")
+
+    def get_status(self):
+        """
+        Get status information about the write queue.
+
+        Returns:
+            Status information
+        """
+        with self._condition:
+            return {
+                'pending': len(self.pending),
+                'flushed_writes': self.flushed_writes,
+                'coalesced_writes': self.coalesced_writes,
+                'failed_flushes': self.failed_flushes
+            }
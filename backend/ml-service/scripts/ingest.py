@@ -0,0 +1,66 @@
+"""
+Bulk-load preference and activity exports into versioned model artifacts.
+
+Usage (from the ml-service directory):
+    python -m scripts.ingest --preferences preferences.jsonl --activities activities.csv
+
+Preference exports can come straight from mongoexport of the Node API's
+Preference collection. Running services pick up published versions through
+the model registry.
+"""
+import argparse
+import os
+import logging
+from config import get_config
+from models.preference_model import PreferenceModel
+from models.model_registry import new_version_name, publish_version
+from utils.ingestion import ingest_preferences, ingest_activities
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Bulk-load preference and activity exports.')
+    parser.add_argument('--preferences', help='Preference export (.jsonl or .csv)')
+    parser.add_argument('--activities', help='Activity export (.jsonl or .csv)')
+    parser.add_argument('--model-path', default=get_config().MODEL_PATH, help='Root directory for model artifacts')
+    parser.add_argument('--version', default=None, help='Version name (default: current UTC timestamp)')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='Rows read per chunk')
+    parser.add_argument('--no-publish', action='store_true', help='Save the versions without activating them')
+
+    args = parser.parse_args()
+    if not args.preferences and not args.activities:
+        parser.error('at least one of --preferences or --activities is required')
+
+    return args
+
+
+def main():
+    """Ingest the given exports and publish the resulting artifacts."""
+    logging.basicConfig(level=get_config().LOG_LEVEL, format='%(asctime)s %(levelname)s %(message)s')
+    args = parse_args()
+    version = args.version or new_version_name()
+
+    jobs = []
+    if args.preferences:
+        jobs.append(('preferences', lambda output: ingest_preferences(
+            args.preferences, output, PreferenceModel(), args.chunksize
+        )))
+    if args.activities:
+        jobs.append(('activities', lambda output: ingest_activities(
+            args.activities, output, args.chunksize
+        )))
+
+    for artifact, ingest in jobs:
+        artifact_dir = os.path.join(args.model_path, artifact)
+        ingest(os.path.join(artifact_dir, version))
+
+        if not args.no_publish:
+            publish_version(artifact_dir, version)
+            logger.info(f"Published {artifact} version {version}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Train the collaborative-filtering activity model from an interaction log.
+
+Usage (from the ml-service directory):
+    python -m scripts.train_cf --log data/interactions.jsonl
+"""
+import argparse
+import os
+import time
+import logging
+from config import get_config
+from models.cf_model import ImplicitALSModel, read_interactions
+from models.model_registry import new_version_name, publish_version
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description='Train the implicit ALS activity model.')
+    parser.add_argument('--log', required=True, help='Interaction log (.csv or .jsonl) with userId, activityId and weight or event')
+    parser.add_argument('--output', default=os.path.join(config.MODEL_PATH, 'cf'), help='Artifact directory holding model versions')
+    parser.add_argument('--version', default=None, help='Version name (default: current UTC timestamp)')
+    parser.add_argument('--no-publish', action='store_true', help='Save the version without activating it')
+    parser.add_argument('--factors', type=int, default=32, help='Number of latent factors')
+    parser.add_argument('--iterations', type=int, default=10, help='Number of ALS sweeps')
+    parser.add_argument('--regularization', type=float, default=0.05, help='L2 regularization strength')
+    parser.add_argument('--alpha', type=float, default=20.0, help='Confidence scaling for interactions')
+    parser.add_argument('--workers', type=int, default=None, help='Solver threads (default: CPU count)')
+    parser.add_argument('--chunksize', type=int, default=1_000_000, help='Log rows read per chunk')
+    parser.add_argument('--max-chunk-nnz', type=int, default=10000, help='Interactions per batched solve')
+
+    return parser.parse_args()
+
+
+def main():
+    """Read the interaction log, train the model and save it."""
+    logging.basicConfig(level=get_config().LOG_LEVEL, format='%(asctime)s %(levelname)s %(message)s')
+    args = parse_args()
+
+    start = time.perf_counter()
+    interactions, user_ids, item_ids = read_interactions(args.log, chunksize=args.chunksize)
+    logger.info(f"Loaded {interactions.nnz} interactions in {time.perf_counter() - start:.1f}s")
+
+    model = ImplicitALSModel(
+        factors=args.factors,
+        regularization=args.regularization,
+        alpha=args.alpha,
+        iterations=args.iterations
+    )
+    model.fit(interactions, user_ids, item_ids, workers=args.workers, max_chunk_nnz=args.max_chunk_nnz)
+
+    version = args.version or new_version_name()
+    model.save(os.path.join(args.output, version))
+
+    # Running services pick up the published version on their next reload check
+    if not args.no_publish:
+        publish_version(args.output, version)
+        logger.info(f"Published version {version}")
+
+    logger.info(f"Training finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Train the intent classifier from labelled examples.
+
+Usage (from the ml-service directory):
+    python -m scripts.train_intent --data data/intents.csv
+    python -m scripts.train_intent --from-keywords
+"""
+import argparse
+import os
+import time
+import logging
+from config import get_config
+from core.language import available_languages, load_language_resources
+from models.intent_classifier import HashedIntentClassifier
+from models.model_registry import new_version_name, publish_version
+from utils.ingestion import read_chunks
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    config = get_config()
+
+    parser = argparse.ArgumentParser(description='Train the hashed-feature intent classifier.')
+    parser.add_argument('--data', default=None, help='Labelled examples (.csv or .jsonl) with text and intent columns')
+    parser.add_argument('--from-keywords', action='store_true', help='Add one example per intent keyword of every bundled language')
+    parser.add_argument('--output', default=os.path.join(config.MODEL_PATH, 'intent'), help='Artifact directory holding model versions')
+    parser.add_argument('--version', default=None, help='Version name (default: current UTC timestamp)')
+    parser.add_argument('--no-publish', action='store_true', help='Save the version without activating it')
+    parser.add_argument('--features', type=int, default=1 << 16, help='Number of hash buckets (power of two)')
+    parser.add_argument('--ngrams', type=int, default=2, help='Longest word n-gram used as a feature')
+    parser.add_argument('--alpha', type=float, default=0.1, help='Additive smoothing')
+
+    args = parser.parse_args()
+    if not args.data and not args.from_keywords:
+        parser.error('one of --data or --from-keywords is required')
+    return args
+
+
+def keyword_examples():
+    """
+    Build one training example per intent keyword of every bundled language.
+
+    Returns:
+        Tuple of (texts, labels)
+    """
+    texts, labels = [], []
+    for code in available_languages():
+        for intent, keywords in load_language_resources(code).intents.items():
+            texts.extend(keywords)
+            labels.extend([intent] * len(keywords))
+    return texts, labels
+
+
+def read_examples(path):
+    """
+    Read labelled examples, skipping rows without text or intent.
+
+    Args:
+        path: CSV or JSONL file with text and intent columns
+
+    Returns:
+        Tuple of (texts, labels)
+    """
+    texts, labels = [], []
+    for chunk in read_chunks(path):
+        chunk = chunk[['text', 'intent']].dropna().astype(str)
+        chunk = chunk[(chunk['text'].str.strip() != '') & (chunk['intent'].str.strip() != '')]
+        texts.extend(chunk['text'].tolist())
+        labels.extend(chunk['intent'].str.strip().tolist())
+    return texts, labels
+
+
+def main():
+    """Collect examples, train the classifier and save it."""
+    logging.basicConfig(level=get_config().LOG_LEVEL, format='%(asctime)s %(levelname)s %(message)s')
+    args = parse_args()
+
+    start = time.perf_counter()
+    texts, labels = [], []
+    if args.data:
+        texts, labels = read_examples(args.data)
+    if args.from_keywords:
+        seed_texts, seed_labels = keyword_examples()
+        texts.extend(seed_texts)
+        labels.extend(seed_labels)
+    logger.info(f"Loaded {len(texts)} examples in {time.perf_counter() - start:.1f}s")
+
+    model = HashedIntentClassifier(n_features=args.features, ngram_range=args.ngrams, alpha=args.alpha)
+    model.fit(texts, labels)
+
+    version = args.version or new_version_name()
+    model.save(os.path.join(args.output, version))
+
+    # Running services pick up the published version on their next reload check
+    if not args.no_publish:
+        publish_version(args.output, version)
+        logger.info(f"Published version {version}")
+
+    logger.info(f"Training finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
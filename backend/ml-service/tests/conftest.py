@@ -0,0 +1,21 @@
+import os
+import tempfile
+
+import pytest
+
+# Keep background threads and worker processes out of the tests; set before the api modules are imported
+os.environ.setdefault('JOB_WORKERS', '0')
+os.environ.setdefault('WARMUP_ON_START', 'false')
+os.environ.setdefault('NEIGHBOUR_REFRESH_SECONDS', '0')
+os.environ.setdefault('MODEL_RELOAD_INTERVAL', '0')
+os.environ.setdefault('MODEL_PATH', tempfile.mkdtemp(prefix='ml-service-models-'))
+
+
+@pytest.fixture
+def client():
+    from flask import Flask
+    from api import api_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(api_bp, url_prefix='/api/v1')
+    return app.test_client()
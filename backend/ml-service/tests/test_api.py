@@ -0,0 +1,168 @@
+import pytest
+
+from api import routes
+from utils.single_flight import SingleFlightTimeout
+
+
+@pytest.mark.parametrize('changes', [
+    {'addInterests': 'food'},
+    {'removeInterests': [1]},
+    {'accommodationType': {'tier': 'luxury'}},
+])
+def test_patch_preferences_rejects_malformed_fields(client, changes):
+    response = client.patch('/api/v1/preferences', json={'userId': 'api-user', **changes})
+
+    assert response.status_code == 400
+
+
+def test_recommendation_stuck_behind_identical_request_is_unavailable(client, monkeypatch):
+    def wait_too_long(**kwargs):
+        raise SingleFlightTimeout('Timed out waiting for in-flight request')
+
+    monkeypatch.setattr(routes, 'get_recommendation', wait_too_long)
+    response = client.post('/api/v1/recommendations', json={
+        'userId': 'u1', 'destination': 'Paris', 'startDate': '2026-05-01', 'endDate': '2026-05-03'
+    })
+
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'error'
+
+
+def test_admin_endpoints_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(routes.config, 'ADMIN_TOKEN', None)
+
+    assert client.get('/api/v1/admin/profiles').status_code == 403
+    assert client.post('/api/v1/admin/models/reload', headers={'X-Admin-Token': ''}).status_code == 403
+
+
+def test_admin_endpoints_require_configured_token(client, monkeypatch):
+    monkeypatch.setattr(routes.config, 'ADMIN_TOKEN', 'secret')
+
+    assert client.get('/api/v1/admin/profiles', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    assert client.get('/api/v1/admin/profiles', headers={'X-Admin-Token': 'secret'}).status_code == 200
+
+
+def test_profile_header_ignored_without_admin_token(client, monkeypatch):
+    monkeypatch.setattr(routes.config, 'ADMIN_TOKEN', None)
+    with client.application.test_request_context(headers={routes.config.PROFILE_HEADER: 'cprofile'}):
+        assert routes._requested_profile_mode() is None
+
+
+def test_group_recommendation_aggregates_member_preferences(client):
+    for user_id, interests in (('group-a', ['food']), ('group-b', ['culture'])):
+        client.post('/api/v1/preferences', json={'userId': user_id, 'preferences': {'interests': interests}})
+
+    response = client.post('/api/v1/recommendations/group', json={
+        'userIds': ['group-a', 'group-b', 'group-missing'], 'destination': 'Paris',
+        'startDate': '2026-05-01', 'endDate': '2026-05-02'
+    })
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert len(data['itinerary']) == 2
+    assert data['group']['missing'] == ['group-missing']
+    assert sorted(data['group']['preferences']['interests']) == ['culture', 'food']
+
+
+def test_group_recommendation_rejects_oversized_group(client, monkeypatch):
+    monkeypatch.setattr(routes.config, 'GROUP_MAX_MEMBERS', 2)
+    response = client.post('/api/v1/recommendations/group', json={
+        'userIds': ['a', 'b', 'c'], 'destination': 'Paris', 'startDate': '2026-05-01', 'endDate': '2026-05-02'
+    })
+
+    assert response.status_code == 400
+
+
+def test_destination_revalidates_with_etag(client):
+    response = client.get('/api/v1/destinations/paris')
+    etag = response.headers['ETag']
+
+    assert response.status_code == 200
+    assert response.get_json()['data']['name'] == 'Paris'
+    assert client.get('/api/v1/destinations/Paris', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/v1/destinations/london', headers={'If-None-Match': etag}).status_code == 200
+
+
+def _itinerary():
+    return [{'day': 1, 'date': '2026-05-04', 'activities': [
+        {'title': 'Louvre', 'startTime': '9:00', 'endTime': '11:30', 'category': 'culture'},
+        {'title': 'Lunch', 'startTime': '12:30', 'endTime': '14:00', 'category': 'food'},
+        {'title': 'Seine Cruise', 'startTime': '15:00', 'endTime': '17:00', 'category': 'sightseeing'},
+    ]}]
+
+
+def _regenerate(client, itinerary, day=1, slot=0):
+    return client.post('/api/v1/recommendations/regenerate', json={
+        'userId': 'u1', 'destination': 'Paris', 'itinerary': itinerary, 'day': day, 'slot': slot
+    })
+
+
+def test_regenerate_slot(client):
+    response = _regenerate(client, _itinerary())
+
+    assert response.status_code == 200
+    assert response.get_json()['data']['patch'][0]['path'] == '/0/activities/0'
+
+
+@pytest.mark.parametrize('break_itinerary', [
+    lambda itinerary: itinerary[0]['activities'][0].pop('startTime'),
+    lambda itinerary: itinerary[0]['activities'][2].update(startTime='3pm'),
+    lambda itinerary: itinerary[0]['activities'][0].update(endTime=None),
+    lambda itinerary: itinerary[0].update(activities='Louvre'),
+    lambda itinerary: itinerary[0].update(date=20260504),
+    lambda itinerary: itinerary.append('day two'),
+    lambda itinerary: itinerary[0]['activities'].append(['not', 'an', 'activity']),
+])
+def test_regenerate_rejects_malformed_itinerary(client, break_itinerary):
+    itinerary = _itinerary()
+    break_itinerary(itinerary)
+
+    assert _regenerate(client, itinerary).status_code == 400
+
+
+@pytest.mark.parametrize('day, slot', [(True, 0), (1, False), (1.0, 0)])
+def test_regenerate_rejects_non_integer_positions(client, day, slot):
+    assert _regenerate(client, _itinerary(), day, slot).status_code == 400
+
+
+@pytest.mark.parametrize('end_date', ['2031-05-01', '2026-04-30'])
+def test_recommendation_rejects_out_of_range_trip_length(client, end_date):
+    response = client.post('/api/v1/recommendations', json={
+        'userId': 'u1', 'destination': 'Paris', 'startDate': '2026-05-01', 'endDate': end_date,
+        'budget': {'total': 10 ** 6}
+    })
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('payload', [{'userId': 'u1'}, {'userId': 'u1', 'text': ['Paris']}, {'userId': 'u1', 'text': 3}])
+def test_plan_from_text_rejects_missing_or_non_string_text(client, payload):
+    response = client.post('/api/v1/plan-from-text', json=payload)
+
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+@pytest.mark.parametrize('query', [
+    'radius=inf', 'radius=nan', 'radius=-1', 'lat=nan', 'lat=91', 'limit=0'
+])
+def test_nearby_rejects_invalid_parameters(client, query):
+    params = dict(item.split('=') for item in f'destination=Paris&lat=48.86&lon=2.34&{query}'.split('&'))
+
+    assert client.get('/api/v1/activities/nearby', query_string=params).status_code == 400
+
+
+def test_nearby_within_radius(client):
+    response = client.get('/api/v1/activities/nearby', query_string={
+        'destination': 'Paris', 'lat': 48.86, 'lon': 2.34, 'radius': 50
+    })
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('limit', [None, 'ten', 0, 2.5, True])
+def test_activity_recommendations_reject_invalid_limit(client, limit):
+    response = client.post('/api/v1/activities/recommendations', json={'userId': 'u1', 'limit': limit})
+
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from core.bit_signatures import hamming_similarities, jaccard_similarities, pack_signatures, popcount
+
+
+def test_signature_similarities_match_dense_computation():
+    rng = np.random.default_rng(5)
+    matrix = (rng.random((200, 40)) < 0.3).astype(np.uint8)
+    signatures = pack_signatures(matrix)
+
+    assert popcount(signatures).tolist() == matrix.sum(axis=1).tolist()
+
+    intersection = (matrix & matrix[0]).sum(axis=1)
+    union = (matrix | matrix[0]).sum(axis=1)
+    expected = np.divide(intersection, union, out=np.zeros(len(matrix)), where=union > 0)
+    np.testing.assert_allclose(jaccard_similarities(signatures[0], signatures), expected, rtol=1e-6)
+
+    expected = 1.0 - (matrix != matrix[0]).sum(axis=1) / 40
+    np.testing.assert_allclose(hamming_similarities(signatures[0], signatures, 40), expected, rtol=1e-6)
+
+
+def test_highest_bit_and_empty_signatures():
+    matrix = np.zeros((2, 64), dtype=np.uint8)
+    matrix[0, 63] = 1
+
+    signatures = pack_signatures(matrix)
+    assert signatures[0] == np.uint64(1) << np.uint64(63)
+    assert jaccard_similarities(signatures[1], signatures[1:]).tolist() == [0.0]
+
+
+def test_too_many_features_rejected():
+    with pytest.raises(ValueError):
+        pack_signatures(np.zeros((1, 65)))
@@ -0,0 +1,41 @@
+import numpy as np
+
+from core.budget_optimizer import optimize_trip, select_within_budget
+
+
+def test_selection_respects_budget_and_count():
+    costs = np.array([40.0, 30.0, 30.0, 10.0])
+    scores = np.array([5.0, 3.5, 3.5, 1.0])
+
+    selected, score = select_within_budget(costs, scores, max_items=2, budget=60)
+
+    assert sorted(selected) == [1, 2]
+    assert score == 7.0
+
+
+def test_item_limit_beyond_candidates_is_clamped():
+    selected, score = select_within_budget([10.0, 20.0], [1.0, 2.0], max_items=10 ** 6, budget=100)
+
+    assert sorted(selected) == [0, 1]
+    assert score == 3.0
+
+
+def test_trip_plan_fits_daily_budgets():
+    rng = np.random.default_rng(5)
+    costs = rng.integers(0, 60, 40).astype(float)
+    scores = rng.random(40)
+
+    plan = optimize_trip(costs, scores, days=3, slots_per_day=2, total_budget=150, daily_budget=60)
+
+    assert all(len(day) <= 2 and costs[day].sum() <= 60 for day in plan['days'])
+    assert sum(costs[day].sum() for day in plan['days']) <= 150
+
+
+def test_items_only_placed_on_allowed_days():
+    costs = np.array([10.0, 10.0, 10.0])
+    scores = np.array([3.0, 2.0, 1.0])
+    allowed = np.array([[False, False], [False, True], [True, True]])
+
+    plan = optimize_trip(costs, scores, days=2, slots_per_day=1, total_budget=100, allowed=allowed)
+
+    assert plan['days'] == [[2], [1]]
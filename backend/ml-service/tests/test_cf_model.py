@@ -0,0 +1,48 @@
+import numpy as np
+import scipy.sparse as sp
+
+from models.cf_model import ImplicitALSModel, read_interactions
+
+
+def _two_groups():
+    """Users 0-3 like activities a-c and users 4-7 like d-f, except u0 never tried a and u4 never tried d."""
+    rows, cols = [], []
+    for user in range(8):
+        group = range(0, 3) if user < 4 else range(3, 6)
+        for item in group:
+            if not (user in (0, 4) and item % 3 == 0):
+                rows.append(user)
+                cols.append(item)
+    matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(8, 6))
+    return matrix, [f'u{i}' for i in range(8)], list('abcdef')
+
+
+def test_read_interactions_sums_weighted_events(tmp_path):
+    path = tmp_path / 'events.csv'
+    path.write_text('userId,activityId,event\nu1,a,view\nu1,a,save\nu2,b,unknown\n,c,view\n')
+
+    matrix, users, items = read_interactions(str(path))
+
+    assert (users, items) == (['u1', 'u2'], ['a', 'b'])
+    assert matrix.toarray().tolist() == [[5.0, 0.0], [0.0, 1.0]]
+
+
+def test_recommends_the_missing_activity_of_the_users_group():
+    matrix, users, items = _two_groups()
+    model = ImplicitALSModel(factors=2, iterations=10).fit(matrix, users, items, workers=1)
+
+    assert model.recommend('u0', limit=1)[0][0] == 'a'
+    assert model.recommend('u4', limit=1)[0][0] == 'd'
+    assert {item for item, _ in model.recommend('u0', limit=10)} == {'a', 'd', 'e', 'f'}
+    assert model.recommend_batch(['u1', 'missing'], limit=0) == [[], None]
+
+
+def test_chunking_and_save_do_not_change_the_factors(tmp_path):
+    matrix, users, items = _two_groups()
+    whole = ImplicitALSModel(factors=4, iterations=3).fit(matrix, users, items, workers=1)
+    chunked = ImplicitALSModel(factors=4, iterations=3).fit(matrix, users, items, workers=2, max_chunk_nnz=3)
+    np.testing.assert_allclose(chunked.user_factors, whole.user_factors, rtol=1e-3, atol=1e-4)
+
+    whole.save(str(tmp_path))
+    loaded = ImplicitALSModel.load(str(tmp_path))
+    assert loaded.recommend_batch(users, limit=3) == whole.recommend_batch(users, limit=3)
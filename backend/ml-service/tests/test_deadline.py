@@ -0,0 +1,33 @@
+import math
+
+import pytest
+
+from utils.deadline import Deadline
+
+
+@pytest.mark.parametrize('value', ['0', '-5', 'abc', 'nan', 'inf'])
+def test_header_must_be_positive_finite_number(value):
+    with pytest.raises(ValueError):
+        Deadline.from_header(value)
+
+
+def test_header_absent_uses_default():
+    assert Deadline.from_header(None).remaining_ms() == math.inf
+    assert Deadline.from_header(None, default_ms=500).budget_ms == 500
+    assert Deadline.from_header('250.5').budget_ms == 250.5
+
+
+def test_child_shares_expiry_but_not_timings():
+    deadline = Deadline(1000, reserve_ms=2000)
+    child = deadline.child()
+    with child.stage('itinerary'):
+        pass
+    child.degrade('itinerary')
+    child.degrade('itinerary')
+
+    assert child.expires_at == deadline.expires_at
+    assert deadline.nearly_spent() and not deadline.expired()
+    assert deadline.report()['degraded'] is False
+    report = child.report()
+    assert report['degradedStages'] == ['itinerary']
+    assert set(report['timings']) == {'itinerary', 'total'}
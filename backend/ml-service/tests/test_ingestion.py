@@ -0,0 +1,36 @@
+import pandas as pd
+
+from models.preference_model import PreferenceModel
+from utils.ingestion import PreferenceIngestor, normalize_activity_chunk
+
+
+def test_later_row_without_tiers_or_pace_resets_them_to_defaults():
+    model = PreferenceModel()
+    ingestor = PreferenceIngestor(model, initial_capacity=1)
+    ingestor.add_chunk(pd.DataFrame([
+        {'userId': 'u1', 'interests': 'food', 'accommodationType': 'luxury', 'pacePreference': 'intense'}
+    ]))
+    accepted, rejected = ingestor.add_chunk(pd.DataFrame([
+        {'userId': 'u1', 'interests': '["art"]'}, {'userId': 'u2', 'interests': ''}, {'userId': ''}
+    ]))
+
+    assert (accepted, rejected) == (2, 1)
+    assert ingestor.user_ids == ['u1', 'u2']
+    row = ingestor.embeddings[0]
+    assert row[model.interest_index['art']] == 1 and row[model.interest_index['food']] == 0
+    assert row[len(model.interest_categories) + model.accommodation_types.index('mid-range')] == 1
+    assert row.sum() == 3
+    assert ingestor.pace[0] == model.pace_index['moderate']
+
+
+def test_activity_chunk_rejects_unnamed_rows_and_clips_numbers():
+    chunk = pd.DataFrame([
+        {'name': ' Louvre ', 'category': 'Culture', 'duration': '3', 'cost': '-5'},
+        {'name': '', 'category': 'food'}
+    ])
+    normalized, rejected = normalize_activity_chunk(chunk)
+
+    assert rejected == 1
+    assert normalized.to_dict(orient='records') == [
+        {'name': 'Louvre', 'description': '', 'category': 'culture', 'duration': 3.0, 'cost': 0.0}
+    ]
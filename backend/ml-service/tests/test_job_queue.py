@@ -0,0 +1,58 @@
+import json
+import os
+import time
+
+import pytest
+
+from utils.job_queue import JobQueue
+
+
+def _echo(params, context):
+    context.progress(1, 1)
+    return params
+
+
+def _crash(params, context):
+    os._exit(1)
+
+
+def _wait_for(queue, job_id, statuses, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} still {queue.get(job_id)['status']}")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(
+        str(tmp_path / 'jobs.db'), {'echo': _echo, 'crash': _crash},
+        workers=1, reserved_workers=0, max_attempts=2, poll_interval=0.05
+    )
+    queue.start()
+    yield queue
+    queue.close()
+
+
+def test_job_runs_and_returns_result(queue):
+    job = queue.submit('echo', {'value': 1})
+    job = _wait_for(queue, job['id'], ('succeeded',))
+    assert json.loads(job['result'].data) == {'value': 1}
+
+
+def test_crashed_worker_does_not_wedge_queue(queue):
+    crashed = queue.submit('crash', {})
+    following = queue.submit('echo', {'value': 2})
+
+    crashed = _wait_for(queue, crashed['id'], ('failed',))
+    assert crashed['attempts'] == 2
+    assert crashed['error'] == 'Worker process exited'
+    _wait_for(queue, following['id'], ('succeeded',))
+
+
+def test_unknown_job_type_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit('missing', {})
@@ -0,0 +1,64 @@
+import json
+import os
+
+from models.activity_model import ActivityModel
+from models.model_registry import ModelRegistry, publish_version
+
+CATALOG = {'food': [{'name': 'Market Tour', 'description': 'Taste local food', 'duration': 2, 'cost': 20}]}
+
+
+def _write_version(base_path, artifact, version, catalog=CATALOG):
+    path = os.path.join(base_path, artifact, version)
+    os.makedirs(path)
+    with open(os.path.join(path, 'activities.json'), 'w') as f:
+        json.dump(catalog, f)
+    return path
+
+
+def test_unpublished_versions_are_not_loaded(tmp_path):
+    _write_version(tmp_path, 'activities', '20260101000000')
+    registry = ModelRegistry(str(tmp_path))
+    registry.register('activities', ActivityModel().load_catalog)
+
+    assert registry.get('activities') is None
+
+    publish_version(str(tmp_path / 'activities'), '20260101000000')
+    registry.reload()
+    assert registry.get('activities').version == '20260101000000'
+
+
+def test_failed_version_is_not_retried_on_poll(tmp_path):
+    os.makedirs(tmp_path / 'activities' / 'broken')
+    publish_version(str(tmp_path / 'activities'), 'broken')
+    attempts = []
+
+    def loader(path):
+        attempts.append(path)
+        raise ValueError('corrupt')
+
+    registry = ModelRegistry(str(tmp_path))
+    registry.register('activities', loader)
+    registry.reload()
+    registry.reload()
+    assert len(attempts) == 1
+    assert registry.get_status()['activities']['failed_versions'] == ['broken']
+
+    registry.reload('activities', 'broken')
+    assert len(attempts) == 2
+
+
+def test_reload_leaves_the_previous_version_untouched(tmp_path):
+    model = ActivityModel()
+    registry = ModelRegistry(str(tmp_path))
+    registry.register('activities', model.load_catalog)
+    _write_version(tmp_path, 'activities', 'v1')
+    registry.reload('activities', 'v1')
+    in_flight = registry.get_model('activities')
+
+    catalog = {'art': [{'name': 'Gallery', 'description': 'Modern art', 'duration': 1, 'cost': 10}]}
+    _write_version(tmp_path, 'activities', 'v2', catalog)
+    registry.reload('activities', 'v2')
+
+    assert registry.get_model('activities') is model.activity_table
+    assert registry.get_model('activities') is not in_flight
+    assert in_flight.categories == ['food']
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from models import neighbour_index
+from models.neighbour_index import NeighbourIndex, build_neighbour_lists
+from models.preference_model import PreferenceModel
+
+
+def _brute_force(matrix, k):
+    normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    similarities = normalized @ normalized.T
+    np.fill_diagonal(similarities, -np.inf)
+    return np.sort(similarities, axis=1)[:, ::-1][:, :k]
+
+
+@pytest.mark.parametrize('tile_size', [1, 7, 8192])
+def test_tiled_neighbours_match_brute_force(tile_size):
+    matrix = np.random.default_rng(3).random((50, 6)).astype(np.float32)
+    neighbours = build_neighbour_lists(matrix, k=5, block_size=16, workers=1, tile_size=tile_size)
+
+    normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    scores = np.take_along_axis(normalized @ normalized.T, neighbours.astype(np.int64), axis=1)
+    assert np.allclose(scores, _brute_force(matrix, 5), atol=1e-5)
+    assert not (neighbours == np.arange(50)[:, np.newaxis]).any()
+
+
+@pytest.mark.parametrize('similarity', ['jaccard_bits', 'hamming_bits'])
+def test_bit_neighbours_match_signature_ranking(similarity):
+    model = PreferenceModel(similarity=similarity)
+    rng = np.random.default_rng(5)
+    for i in range(30):
+        interests = [c for c in model.interest_categories if rng.random() < 0.3]
+        model.update_preferences(f'u{i}', {'interests': interests})
+    _, user_ids, matrix = model.snapshot_embeddings()
+
+    neighbours = build_neighbour_lists(matrix, k=5, block_size=8, workers=1, tile_size=7, similarity=similarity)
+
+    for row, user_id in enumerate(user_ids):
+        scores = model._similarities(matrix[row], similarity)
+        scores[row] = -np.inf
+        assert np.allclose(scores[neighbours[row]], np.sort(scores)[::-1][:5], atol=1e-5)
+
+
+def test_neighbours_padded_for_few_users():
+    neighbours = build_neighbour_lists(np.eye(3, dtype=np.float32), k=5, workers=1, tile_size=2)
+
+    assert (neighbours[:, 2:] == -1).all()
+    assert sorted(neighbours[0, :2]) == [1, 2]
+
+
+@pytest.fixture
+def model():
+    model = PreferenceModel()
+    model.update_preferences('a', {'interests': ['food']})
+    model.update_preferences('b', {'interests': ['food']})
+    model.neighbour_index = NeighbourIndex(model, k=5, workers=1)
+    return model
+
+
+def test_changed_users_cleared_only_after_publish(model, monkeypatch):
+    def failing_build(*args, **kwargs):
+        raise RuntimeError('build failed')
+
+    monkeypatch.setattr(neighbour_index, 'build_neighbour_lists', failing_build)
+    with pytest.raises(RuntimeError):
+        model.neighbour_index.rebuild()
+    assert set(model.changed_users) == {'a', 'b'}
+
+    monkeypatch.undo()
+    model.neighbour_index.rebuild()
+    assert not model.changed_users
+    assert model.get_similar_users('a') == ['b']
+
+
+def test_change_during_build_stays_marked(model, monkeypatch):
+    build = neighbour_index.build_neighbour_lists
+
+    def build_with_concurrent_write(*args, **kwargs):
+        model.update_preferences('a', {'interests': ['art']})
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(neighbour_index, 'build_neighbour_lists', build_with_concurrent_write)
+    model.neighbour_index.rebuild()
+
+    assert set(model.changed_users) == {'a'}
+
+
+def test_loaded_snapshot_users_are_marked_changed(model, tmp_path):
+    model.neighbour_index.rebuild()
+    embeddings = np.zeros((2, model.embedding_size), dtype=np.float32)
+    embeddings[:, 0] = 1.0
+    np.save(tmp_path / 'user_ids.npy', np.char.encode(np.array(['c', 'd']), 'utf-8'))
+    np.save(tmp_path / 'embeddings.npy', embeddings)
+    np.save(tmp_path / 'pace.npy', np.ones(2, dtype=np.uint8))
+
+    model.load_snapshot(str(tmp_path))
+
+    assert {'c', 'd'} <= set(model.changed_users)
+
+
+def test_index_ranks_by_the_model_similarity():
+    model = PreferenceModel(similarity='hamming_bits')
+    model.update_preferences('a', {'interests': ['food', 'art', 'culture']})
+    model.update_preferences('b', {'interests': ['food', 'art', 'culture', 'music', 'nature', 'history']})
+    model.update_preferences('c', {'interests': ['food']})
+    model.neighbour_index = NeighbourIndex(model, k=5, workers=1)
+
+    model.neighbour_index.rebuild()
+
+    assert model.neighbour_index.lookup('a') == ['c', 'b']
@@ -0,0 +1,71 @@
+import pytest
+
+from core.language import LanguageDetector, LanguageResourceCache
+from models.intent_classifier import HashedIntentClassifier
+
+TRAINING = [
+    ('book a hotel room for two nights', 'accommodation'),
+    ('find a cheap hotel near the station', 'accommodation'),
+    ('where can we stay downtown', 'accommodation'),
+    ('best restaurants for dinner tonight', 'food'),
+    ('where to eat local food', 'food'),
+    ('recommend a restaurant with seafood', 'food'),
+    ('how do i get from the airport', 'transportation'),
+    ('train tickets to the city centre', 'transportation'),
+    ('rent a car for the weekend', 'transportation')
+]
+
+
+@pytest.mark.parametrize('text, language', [
+    ('I want to visit museums and eat good food in Paris next week', 'en'),
+    ('Quiero visitar museos y comer bien en Madrid', 'es'),
+    ('Je veux visiter des musées et bien manger à Lyon', 'fr'),
+    ('Ich möchte Museen besuchen und gut essen in Berlin', 'de')
+])
+def test_language_detection(text, language):
+    assert LanguageDetector().detect(text)[0] == language
+
+
+def test_language_detection_falls_back_on_empty_text():
+    assert LanguageDetector().detect('  ', default='es') == ('es', 0.0)
+
+
+def test_language_resources_are_cached_with_lru_eviction():
+    cache = LanguageResourceCache(max_languages=2)
+    english = cache.get('en')
+    cache.get('fr')
+    assert cache.get('en') is english
+    cache.get('de')
+
+    assert set(cache.cache) == {'en', 'de'}
+    assert (cache.loads, cache.evictions) == (3, 1)
+    with pytest.raises(ValueError):
+        cache.get('xx')
+
+
+@pytest.fixture
+def classifier():
+    texts, labels = zip(*TRAINING)
+    return HashedIntentClassifier(n_features=1 << 12).fit(list(texts), list(labels))
+
+
+def test_intent_classifier_predicts_and_flags_unknown_text(classifier):
+    results = classifier.classify(['any good seafood restaurant', 'cheap hotel for tonight', 'zzz qqq'], top=2)
+
+    assert [result['primary'] for result in results] == ['food', 'accommodation', 'unknown']
+    assert len(results[0]['all_intents']) == 2
+    assert results[2] == {'primary': 'unknown', 'confidence': 0.0, 'all_intents': {}}
+    assert classifier.classify([]) == []
+
+
+def test_intent_classifier_round_trips(classifier, tmp_path):
+    classifier.save(str(tmp_path))
+    loaded = HashedIntentClassifier.load(str(tmp_path), mmap_mode='r')
+    texts = ['train from the airport', 'dinner near the hotel']
+
+    assert loaded.classify(texts) == classifier.classify(texts)
+
+
+def test_intent_classifier_needs_power_of_two_buckets():
+    with pytest.raises(ValueError):
+        HashedIntentClassifier(n_features=1000)
@@ -0,0 +1,46 @@
+import random
+
+import numpy as np
+
+from core.opening_hours import WEEKDAYS, OpeningHoursIndex, is_open
+
+
+def _random_hours(rng):
+    hours = {}
+    for weekday in rng.sample(WEEKDAYS, rng.randint(0, 7)):
+        periods = []
+        for _ in range(rng.randint(1, 2)):
+            opens, closes = rng.randrange(0, 24 * 60, 30), rng.randrange(0, 24 * 60, 30)
+            periods.append([f"{opens // 60}:{opens % 60:02d}", f"{closes // 60}:{closes % 60:02d}"])
+        hours[weekday] = periods
+    return hours
+
+
+def test_sunday_period_past_midnight_covers_monday():
+    hours = {'sun': [['20:00', '04:00']], 'mon': [['01:00', '02:00']]}
+    index = OpeningHoursIndex([{'hours': hours}])
+
+    assert is_open(hours, 0, 180, 210)
+    assert index.open_mask([0], 0, 180, 210).tolist() == [True]
+    assert not index.open_mask([0], 0, 230, 250)[0]
+
+
+def test_places_without_hours_are_always_open():
+    index = OpeningHoursIndex([{'hours': None}, {'hours': {'mon': [['09:00', '10:00']]}}])
+
+    assert index.open_mask([0, 1], 2, 600, 660).tolist() == [True, False]
+
+
+def test_open_mask_matches_is_open():
+    rng = random.Random(7)
+    places = [{'hours': _random_hours(rng)} for _ in range(200)]
+    index = OpeningHoursIndex(places)
+    candidates = np.arange(len(places))
+
+    for _ in range(300):
+        weekday = rng.randrange(7)
+        start = rng.randrange(0, 24 * 60 - 30, 15)
+        end = min(24 * 60, start + rng.randrange(15, 240, 15))
+
+        expected = [is_open(place['hours'], weekday, start, end) for place in places]
+        assert index.open_mask(candidates, weekday, start, end).tolist() == expected
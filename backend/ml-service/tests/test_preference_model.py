@@ -0,0 +1,68 @@
+import pytest
+
+from models.preference_model import PreferenceModel
+
+
+@pytest.fixture
+def model():
+    return PreferenceModel()
+
+
+def test_patch_adds_and_removes_interests(model):
+    model.update_preferences('a', {'interests': ['food', 'culture']})
+    preferences = model.patch_preferences('a', add_interests=['art'], remove_interests=['food'])
+
+    assert preferences['interests'] == ['culture', 'art']
+    assert model.get_user_preferences('a')['interests'] == ['culture', 'art']
+
+
+@pytest.mark.parametrize('changes', [
+    {'add_interests': 'food'},
+    {'remove_interests': ['food', 3]},
+    {'accommodation_type': ['luxury']},
+    {'transportation_preference': 1},
+])
+def test_patch_rejects_malformed_fields(model, changes):
+    model.update_preferences('a', {'interests': ['food', 'culture']})
+
+    with pytest.raises(ValueError):
+        model.patch_preferences('a', **changes)
+    assert model.get_user_preferences('a')['interests'] == ['food', 'culture']
+
+
+def test_short_similar_user_list_sees_new_users(model):
+    model.update_preferences('a', {'interests': ['food', 'culture']})
+    model.update_preferences('b', {'interests': ['food', 'culture']})
+    assert model.get_similar_users('a') == ['b']
+
+    model.update_preferences('c', {'interests': ['nightlife'], 'accommodationType': 'luxury'})
+
+    assert model.get_similar_users('a') == ['b', 'c']
+
+
+def test_similar_user_cache_is_bounded():
+    model = PreferenceModel(similar_cache_size=2)
+    for user_id in 'abcd':
+        model.update_preferences(user_id, {'interests': ['food']})
+    for user_id in 'abcd':
+        model.get_similar_users(user_id)
+
+    assert list(model.similar_users_cache) == ['c', 'd']
+
+
+@pytest.mark.parametrize('similarity, expected', [
+    ('cosine', ['b', 'c']),
+    ('hamming_bits', ['c', 'b']),
+])
+def test_similar_users_use_the_configured_similarity(similarity, expected):
+    model = PreferenceModel(similarity=similarity)
+    model.update_preferences('a', {'interests': ['food', 'art', 'culture']})
+    model.update_preferences('b', {'interests': ['food', 'art', 'culture', 'music', 'nature', 'history']})
+    model.update_preferences('c', {'interests': ['food']})
+
+    assert model.get_similar_users('a') == expected
+
+
+def test_unknown_similarity_rejected():
+    with pytest.raises(ValueError):
+        PreferenceModel(similarity='euclidean')
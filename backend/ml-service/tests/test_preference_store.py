@@ -0,0 +1,109 @@
+import threading
+
+from models.preference_model import PreferenceModel
+from models.preference_store import CachedPreferenceStore, InMemoryPreferenceStore, WriteBehindQueue
+
+
+def test_cached_miss_expires():
+    backend = InMemoryPreferenceStore()
+    store = CachedPreferenceStore(backend, negative_ttl=0)
+    assert store.get('u1') is None
+
+    # Saved by another worker, bypassing this worker's cache
+    backend.put_many({'u1': {'interests': ['food']}})
+
+    assert store.get('u1') == {'interests': ['food']}
+
+
+def test_cached_miss_is_reused_within_ttl():
+    backend = InMemoryPreferenceStore()
+    store = CachedPreferenceStore(backend, negative_ttl=60)
+    assert store.get('u1') is None
+
+    backend.put_many({'u1': {'interests': ['food']}})
+
+    assert store.get('u1') is None
+
+
+def test_store_read_does_not_overwrite_concurrent_update():
+    backend = InMemoryPreferenceStore()
+    backend.put_many({'u1': {'interests': ['food']}})
+    model = PreferenceModel(store=backend)
+
+    class RacingStore(InMemoryPreferenceStore):
+        def get(self, user_id):
+            preferences = backend.get(user_id)
+            model.update_preferences(user_id, {'interests': ['art']})
+            return preferences
+
+    model.store = RacingStore()
+
+    assert model.get_user_preferences('u1')['interests'] == ['art']
+    assert model.preferences_db['u1']['interests'] == ['art']
+
+
+def test_patch_reads_the_store_without_holding_the_model_lock():
+    backend = InMemoryPreferenceStore()
+    backend.put_many({'u1': {'interests': ['food'], 'accommodationType': 'luxury'}})
+    model = PreferenceModel(store=backend)
+    lock_free = []
+
+    def take_lock():
+        acquired = model._lock.acquire(timeout=1)
+        if acquired:
+            model._lock.release()
+        lock_free.append(acquired)
+
+    class ObservedStore(InMemoryPreferenceStore):
+        def get(self, user_id):
+            # Another thread must be able to take the lock while the store is read
+            other = threading.Thread(target=take_lock)
+            other.start()
+            other.join()
+            return backend.get(user_id)
+
+    model.store = ObservedStore()
+    preferences = model.patch_preferences('u1', add_interests=['art'])
+
+    assert lock_free == [True]
+    assert preferences == {'interests': ['food', 'art'], 'accommodationType': 'luxury'}
+
+
+class _FlakyStore(InMemoryPreferenceStore):
+    """Store whose first write fails and which records every batch."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def put_many(self, preferences_by_user):
+        self.batches.append(dict(preferences_by_user))
+        if len(self.batches) == 1:
+            raise ConnectionError('store unavailable')
+        super().put_many(preferences_by_user)
+
+
+def test_write_behind_coalesces_and_retries_failed_batches():
+    store = _FlakyStore()
+    queue = WriteBehindQueue(store, max_batch=100, flush_interval=0.05)
+    queue.enqueue('u1', {'interests': ['food']})
+    queue.enqueue('u1', {'interests': ['art']})
+    queue.enqueue('u2', {'interests': []})
+
+    assert queue.flush(timeout=5)
+    queue.close()
+
+    assert store.batches[0] == {'u1': {'interests': ['art']}, 'u2': {'interests': []}}
+    assert store.get('u1') == {'interests': ['art']}
+    status = queue.get_status()
+    assert (status['coalesced_writes'], status['failed_flushes'], status['flushed_writes']) == (1, 1, 2)
+
+
+def test_write_behind_writes_through_after_close():
+    store = InMemoryPreferenceStore()
+    queue = WriteBehindQueue(store, flush_interval=0.05)
+    queue.close()
+
+    queue.enqueue('u1', {'interests': ['food']})
+
+    assert store.get('u1') == {'interests': ['food']}
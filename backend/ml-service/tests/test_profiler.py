@@ -0,0 +1,36 @@
+import time
+
+from utils.profiler import RequestProfiler
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profiles_are_recorded_newest_first_in_a_bounded_buffer():
+    profiler = RequestProfiler(buffer_size=2, interval=0.001)
+    for name in ('a', 'b', 'c'):
+        with profiler.profile(name, mode='cprofile'):
+            _busy(0.01)
+
+    assert [profile['name'] for profile in profiler.get_profiles()] == ['c', 'b']
+    assert profiler.get_profiles(name='b', limit=5)[0]['mode'] == 'cprofile'
+
+
+def test_sampled_stacks_collapse_for_flamegraphs():
+    profiler = RequestProfiler(interval=0.001)
+    with profiler.profile('busy'):
+        _busy(0.1)
+
+    lines = profiler.get_collapsed(name='busy').splitlines()
+    assert lines and any('_busy' in line for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+
+def test_mode_selection():
+    assert RequestProfiler().select_mode() is None
+    assert RequestProfiler(sample_rate=1.0, default_mode='cprofile').select_mode() == 'cprofile'
+    assert RequestProfiler().select_mode('CPROFILE') == 'cprofile'
+    assert RequestProfiler().select_mode('bogus') == 'sample'
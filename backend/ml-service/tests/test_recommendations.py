@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+
+from api import controllers
+from core.opening_hours import is_open
+from core.recommendation_engine import RecommendationEngine, _to_minutes
+from models.activity_model import build_activity_table
+from utils.deadline import Deadline
+
+
+@pytest.fixture
+def leader_result(monkeypatch):
+    """Make every request a follower of an in-flight request that answered degraded."""
+    result = {'degraded': True, 'degradedStages': ['itinerary'], 'itinerary': []}
+    monkeypatch.setattr(controllers.recommendation_flight, 'do', lambda key, fn, timeout=None: result)
+    return result
+
+
+def test_follower_does_not_inherit_degraded_answer(leader_result):
+    result = controllers.get_recommendation('u1', 'Paris', '2026-05-01', '2026-05-03')
+
+    assert result is not leader_result
+    assert result['degraded'] is False
+    assert len(result['itinerary']) == 3
+
+
+def test_follower_with_spent_budget_degrades_on_its_own(leader_result):
+    deadline = Deadline(0.001)
+    result = controllers.get_recommendation('u1', 'Paris', '2026-05-01', '2026-05-03', deadline=deadline)
+
+    assert result is not leader_result
+    assert result['degraded'] is True
+
+
+def test_itinerary_template_is_per_settings_and_reopened_on_new_weekday():
+    engine = RecommendationEngine()
+    info = engine.get_destination_info('New York')
+    preferences = {'interests': ['culture'], 'pacePreference': 'relaxed', 'transportationPreference': 'walking'}
+    museum = 'Visit the Metropolitan Museum of Art'
+
+    itinerary = engine.generate_itinerary('u1', 'New York', 1, preferences, destination_info=info)
+    itinerary[0]['activities'] = []
+    (template,) = engine.itinerary_templates.values()
+    assert template[0]['activities'], 'the stored template must not share the returned itinerary'
+
+    template[0]['activities'] = [
+        {'title': museum, 'category': 'culture', 'startTime': '10:00', 'endTime': '12:00', 'cost': 20}
+    ]
+
+    assert engine.itinerary_template(info, 1, {'interests': ['nature']}) is None
+
+    # Wednesday: the museum is closed, so its slot gets an open activity
+    (wednesday,) = engine.itinerary_template(info, 1, preferences, datetime(2026, 5, 6))
+    assert wednesday['date'] == '2026-05-06'
+    assert wednesday['activities'][0]['title'] != museum
+    assert (wednesday['activities'][0]['startTime'], wednesday['activities'][0]['endTime']) == ('10:00', '12:00')
+
+    (thursday,) = engine.itinerary_template(info, 1, preferences, datetime(2026, 5, 7))
+    assert thursday['activities'][0]['title'] == museum
+    assert template[0]['activities'][0]['title'] == museum
+
+
+def test_budget_plan_only_schedules_open_activities():
+    engine = RecommendationEngine()
+    info = engine.get_destination_info('New York')
+    preferences = {'interests': ['culture'], 'pacePreference': 'intense', 'transportationPreference': 'walking'}
+    weekdays = {'mon': [['08:00', '12:00']], 'tue': [['08:00', '23:00']]}
+    table = build_activity_table({'culture': [
+        {'name': 'Mornings Only', 'cost': 10, 'hours': {'mon': [['08:00', '12:00']]}},
+        {'name': 'Closed Monday', 'cost': 10, 'hours': {'tue': [['08:00', '23:00']]}},
+        {'name': 'Weekdays', 'cost': 10, 'hours': weekdays},
+    ]})
+
+    # Monday and Tuesday, with a budget for every activity
+    plan = engine.plan_within_budget(2, preferences, table, [3.0, 2.0, 1.0], 1000, start_date=datetime(2026, 5, 4))
+    monday, tuesday = engine.generate_itinerary(
+        'u1', 'New York', 2, preferences, destination_info=info, budget_plan=plan, start_date=datetime(2026, 5, 4)
+    )
+
+    hours = {activity['name']: activity['hours'] for activity in table.activities}
+    for weekday, day in enumerate((monday, tuesday)):
+        for activity in day['activities']:
+            if activity['title'] in hours:
+                start, end = _to_minutes(activity['startTime']), _to_minutes(activity['endTime'])
+                assert is_open(hours[activity['title']], weekday, start, end)
+    assert 'Closed Monday' not in [activity['title'] for activity in monday['activities']]
+    assert plan['totalCost'] == sum(activity['cost'] for day in (monday, tuesday) for activity in day['activities'])
@@ -0,0 +1,37 @@
+import numpy as np
+
+from core.reranking import mmr_rerank, normalize_rows
+
+
+def _naive_mmr(relevance, features, k, diversity):
+    selected = []
+    while len(selected) < min(k, len(relevance)):
+        best, best_score = None, -np.inf
+        for i in range(len(relevance)):
+            if i in selected:
+                continue
+            redundancy = max((float(features[i] @ features[j]) for j in selected), default=0.0)
+            score = (1.0 - diversity) * relevance[i] - diversity * redundancy
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+    return selected
+
+
+def test_mmr_matches_naive_selection():
+    rng = np.random.default_rng(11)
+    relevance = rng.random(60).astype(np.float32)
+    features = normalize_rows(rng.random((60, 8)))
+
+    for diversity in (0.0, 0.3, 0.9):
+        assert mmr_rerank(relevance, features, 10, diversity) == _naive_mmr(relevance, features, 10, diversity)
+
+
+def test_duplicates_are_pushed_down_and_k_is_bounded():
+    features = normalize_rows([[1, 0], [1, 0], [0, 1]])
+
+    assert mmr_rerank([1.0, 0.9, 0.5], features, 2, diversity=0.5) == [0, 2]
+    assert mmr_rerank([1.0, 0.9, 0.5], features, 2, diversity=0.0) == [0, 1]
+    assert mmr_rerank([1.0], features[:1], 5) == [0]
+    assert mmr_rerank([], np.zeros((0, 2)), 3) == []
+    assert normalize_rows([[0, 0]]).tolist() == [[0.0, 0.0]]
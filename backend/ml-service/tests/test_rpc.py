@@ -0,0 +1,93 @@
+import http.client
+import io
+
+import pytest
+
+from api import routes
+from utils.rpc_client import RPCClient, RPCError
+from utils.serialization import decode_frames, encode_frame, get_frame_codec
+
+
+class _FakeConnection:
+    """HTTPConnection stand-in failing on send or on the response as scripted."""
+
+    instances = []
+
+    def __init__(self, netloc, timeout=None):
+        self.requests = 0
+        _FakeConnection.instances.append(self)
+
+    def request(self, method, path, body=None, headers=None):
+        self.requests += 1
+        if self.fail_on == 'send':
+            raise BrokenPipeError()
+
+    def getresponse(self):
+        raise http.client.RemoteDisconnected('Remote end closed connection without response')
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    _FakeConnection.instances = []
+    monkeypatch.setattr(http.client, 'HTTPConnection', _FakeConnection)
+    return _FakeConnection
+
+
+def test_request_lost_while_sending_is_retried(connections, monkeypatch):
+    monkeypatch.setattr(connections, 'fail_on', 'send', raising=False)
+
+    with pytest.raises(BrokenPipeError):
+        RPCClient('http://localhost:5000/api/v1').call('preferences', userId='u1')
+    assert [connection.requests for connection in connections.instances] == [1, 1]
+
+
+def test_sent_request_is_not_resent(connections, monkeypatch):
+    monkeypatch.setattr(connections, 'fail_on', 'response', raising=False)
+
+    with pytest.raises(http.client.RemoteDisconnected):
+        RPCClient('http://localhost:5000/api/v1').call('preferences', userId='u1')
+    assert [connection.requests for connection in connections.instances] == [1]
+
+
+def test_rpc_batch_over_test_client(client):
+    rpc = RPCClient(test_client=client, content_type='application/x-frames+json')
+    rpc.add('preferences_patch', userId='rpc-user', addInterests=['food'])
+    rpc.add('preferences_patch', userId='rpc-user', addInterests='food')
+
+    stored, rejected = rpc.send(raise_errors=False)
+
+    assert stored['processedPreferences']['interests'] == ['food']
+    assert isinstance(rejected, RPCError)
+
+
+def test_msgpack_frames_round_trip_through_rpc(client):
+    msgpack = pytest.importorskip('msgpack')
+    codec = get_frame_codec('application/x-frames+msgpack')
+    body = encode_frame(codec, {
+        'id': 7, 'op': 'preferences_patch', 'params': {'userId': 'msgpack-user', 'addInterests': ['art']}
+    })
+
+    response = client.post('/api/v1/rpc', data=body, content_type=codec.content_type)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-frames+msgpack'
+    payload = response.data[4:]
+    assert msgpack.unpackb(payload, raw=False)['id'] == 7
+    [result] = decode_frames(response.data, codec)
+    assert result['data']['processedPreferences']['interests'] == ['art']
+
+
+def test_chunked_body_over_limit_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(routes.config, 'RPC_MAX_BYTES', 64)
+    codec = get_frame_codec('application/x-frames+json')
+    body = b''.join(encode_frame(codec, {'id': i, 'op': 'analyze', 'params': {'text': 'x' * 20}}) for i in range(5))
+
+    response = client.post(
+        '/api/v1/rpc', input_stream=io.BytesIO(body), content_type=codec.content_type,
+        environ_base={'wsgi.input_terminated': True}
+    )
+
+    assert response.status_code == 413
@@ -0,0 +1,41 @@
+import json
+from datetime import date
+
+import pytest
+
+from utils.serialization import (
+    JSONFrameCodec, RawJSON, decode_frames, encode_frame, get_frame_codec, get_serializer, json_response
+)
+
+
+def test_raw_fragments_are_spliced_into_responses():
+    fragment = RawJSON.from_obj({'name': 'Paris', 'activities': [1, 2]})
+    response = json_response({'status': 'success', 'data': fragment, 'date': date(2026, 5, 1)}, status=201)
+
+    assert response.status_code == 201
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data()) == {
+        'status': 'success', 'data': {'name': 'Paris', 'activities': [1, 2]}, 'date': '2026-05-01'
+    }
+    assert json.loads(get_serializer().dumps([fragment])) == [{'name': 'Paris', 'activities': [1, 2]}]
+
+
+@pytest.mark.parametrize('codec', [get_frame_codec(), JSONFrameCodec()])
+def test_frames_round_trip(codec):
+    calls = [{'id': 1, 'op': 'analyze', 'params': {'text': 'héllo'}}, {'id': 2}]
+    body = b''.join(encode_frame(codec, call) for call in calls)
+
+    assert decode_frames(body, codec) == calls
+    assert decode_frames(b'', codec) == []
+
+
+def test_bad_frame_bodies_rejected():
+    codec = JSONFrameCodec()
+    frame = encode_frame(codec, {'id': 1})
+
+    for body in (frame[:2], frame[:-1], frame + frame[:4], encode_frame(codec, {}).replace(b'{}', b'{]')):
+        with pytest.raises(ValueError):
+            decode_frames(body, codec)
+    with pytest.raises(ValueError):
+        decode_frames(frame * 3, codec, max_frames=2)
+    assert get_frame_codec('text/plain') is None
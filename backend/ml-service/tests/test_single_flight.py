@@ -0,0 +1,67 @@
+import os
+import threading
+
+import pytest
+
+from utils.single_flight import SingleFlight, SingleFlightTimeout, canonical_key
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight(timeout=5)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'value': 1}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+    follower.start()
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert calls == [1]
+    assert results == [{'value': 1}, {'value': 1}]
+
+
+def test_follower_times_out_with_its_own_timeout():
+    flight = SingleFlight(timeout=5)
+    started, release = threading.Event(), threading.Event()
+    leader = threading.Thread(target=lambda: flight.do('key', lambda: started.set() or release.wait(5)))
+    leader.start()
+    started.wait(5)
+
+    with pytest.raises(SingleFlightTimeout):
+        flight.do('key', lambda: None, timeout=0.01)
+    release.set()
+    leader.join()
+
+
+def test_cross_worker_files_are_cleaned_up(tmp_path):
+    flight = SingleFlight(timeout=5, lock_dir=str(tmp_path), result_ttl=0)
+    key = canonical_key('recommendation', 'u1')
+
+    assert flight.do(key, lambda: {'value': 1}) == {'value': 1}
+    assert os.listdir(tmp_path) == [f"{key}.json"]
+
+    flight.do(canonical_key('recommendation', 'u2'), lambda: {'value': 2})
+    assert f"{key}.json" not in os.listdir(tmp_path)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.lock')]
+
+
+def test_cross_worker_lock_wait_uses_call_timeout(tmp_path):
+    import fcntl
+
+    flight = SingleFlight(timeout=30, lock_dir=str(tmp_path))
+    key = canonical_key('recommendation', 'u1')
+    with open(tmp_path / f"{key}.lock", 'a') as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        with pytest.raises(SingleFlightTimeout):
+            flight.do(key, lambda: None, timeout=0.05)
@@ -0,0 +1,47 @@
+import math
+import random
+
+from core.spatial_index import SpatialIndex
+
+
+def _brute_force(index, lat, lon):
+    """Distances to every place on the index's own projection, closest first."""
+    x, y = index._project(lat, lon)
+    return sorted((math.hypot(px - x, py - y), place['name']) for place, px, py in zip(index.places, index.x, index.y))
+
+
+def test_nearest_and_within_radius_match_brute_force():
+    rng = random.Random(3)
+    places = [
+        {'name': f'p{i}', 'lat': 48.85 + rng.uniform(-0.05, 0.05), 'lon': 2.35 + rng.uniform(-0.08, 0.08),
+         'category': rng.choice(['food', 'culture'])}
+        for i in range(300)
+    ]
+    index = SpatialIndex(places, cell_km=0.5)
+
+    for _ in range(50):
+        lat, lon = 48.85 + rng.uniform(-0.1, 0.1), 2.35 + rng.uniform(-0.15, 0.15)
+        expected = _brute_force(index, lat, lon)
+
+        nearest = index.nearest(lat, lon, k=5)
+        assert [match.place['name'] for match in nearest] == [name for _, name in expected[:5]]
+
+        radius = rng.uniform(0.2, 3.0)
+        within = index.within_radius(lat, lon, radius)
+        assert [match.place['name'] for match in within] == [name for d, name in expected if d <= radius]
+
+
+def test_filters_and_places_without_coordinates():
+    places = [
+        {'name': 'a', 'lat': 0.0, 'lon': 0.0, 'category': 'food'},
+        {'name': 'b', 'lat': 0.001, 'lon': 0.0, 'category': 'culture'},
+        {'name': 'c', 'lat': 0.002, 'lon': 0.0, 'category': 'food'},
+        {'name': 'd', 'lat': None, 'lon': 0.0, 'category': 'food'}
+    ]
+    index = SpatialIndex(places)
+
+    assert len(index) == 3
+    assert [m.place['name'] for m in index.nearest(0.0, 0.0, k=3, categories=['food'], exclude={'a'})] == ['c']
+    assert index.nearest(0.0, 0.0, k=1, max_km=0.05) == [index.nearest(0.0, 0.0)[0]]
+    assert index.nearest(5.0, 5.0, k=1, max_km=1.0) == []
+    assert SpatialIndex([]).within_radius(0.0, 0.0, 10.0) == []
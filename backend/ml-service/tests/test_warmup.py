@@ -0,0 +1,72 @@
+from core.warmup import Warmup
+
+
+def _flaky(failures):
+    calls = []
+
+    def step():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise RuntimeError('not yet')
+
+    return step, calls
+
+
+def test_failed_steps_are_retried_alone():
+    warmup = Warmup(retry_interval=0)
+    flaky, flaky_calls = _flaky(1)
+    steady, steady_calls = _flaky(0)
+    warmup.add_step('flaky', flaky)
+    warmup.add_step('steady', steady)
+
+    assert warmup.run() is False
+    assert warmup.get_status()['state'] == 'failed'
+    assert warmup.run() is True
+    assert (len(flaky_calls), len(steady_calls)) == (2, 1)
+    assert warmup.get_status()['attempts'] == 2
+
+
+def test_background_warmup_retries_until_ready():
+    warmup = Warmup(retry_interval=0.01)
+    flaky, _ = _flaky(3)
+    warmup.add_step('flaky', flaky)
+
+    warmup.start()
+    warmup._thread.join(5)
+
+    assert warmup.ready
+    assert warmup.get_status()['state'] == 'ready'
+
+
+def test_skipped_warmup_is_ready():
+    warmup = Warmup()
+    warmup.add_step('never', lambda: 1 / 0)
+    warmup.skip()
+
+    assert warmup.get_status()['ready'] is True
+
+
+def test_ready_without_warmup_on_start(client):
+    assert client.get('/api/v1/health/ready').status_code == 200
+
+
+def test_standalone_app_ready_without_warmup_on_start():
+    from app import app, warmup
+    from config import get_config
+
+    assert warmup.retry_interval == get_config().WARMUP_RETRY_SECONDS
+    assert app.test_client().get('/health/ready').status_code == 200
+
+
+def test_recommendation_warmup_covers_every_destination(monkeypatch):
+    from api import controllers
+
+    engine = controllers.recommendation_engine
+    warmed = []
+    monkeypatch.setattr(engine, 'generate_itinerary', lambda user_id, destination, *args, **kwargs: warmed.append(destination))
+
+    controllers._warm_recommendation_engine()
+    assert warmed == list(engine.destinations)
+
+    monkeypatch.setattr(engine, 'destinations', {})
+    controllers._warm_recommendation_engine()
@@ -0,0 +1,125 @@
+import math
+import time
+from contextlib import contextmanager
+import logging
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+class Deadline:
+    """
+    Time budget of one request, shared by the stages that serve it.
+
+    Stages time themselves with stage() and ask nearly_spent() before doing
+    optional or expensive work; when they fall back to a cheaper answer they
+    record it with degrade(), and report() summarizes both for the response.
+    """
+
+    def __init__(self, budget_ms=None, reserve_ms=0.0):
+        """
+        Start the clock.
+
+        Args:
+            budget_ms: Milliseconds the request may take (None for no limit)
+            reserve_ms: Remaining milliseconds below which the budget counts as nearly spent
+        """
+        self.budget_ms = budget_ms
+        self.reserve_ms = reserve_ms
+        self.started_at = time.perf_counter()
+        self.expires_at = self.started_at + budget_ms / 1000.0 if budget_ms is not None else None
+        self.timings = {}
+        self.degraded_stages = []
+
+    @classmethod
+    def from_header(cls, value, default_ms=None, reserve_ms=0.0):
+        """
+        Build a deadline from a request header holding a budget in milliseconds.
+
+        Args:
+            value: Header value, or None if the header is absent
+            default_ms: Budget used when the header is absent (None for no limit)
+            reserve_ms: Remaining milliseconds below which the budget counts as nearly spent
+
+        Returns:
+            Deadline
+
+        Raises:
+            ValueError: If the header is not a positive number
+        """
+        if value is None:
+            return cls(default_ms, reserve_ms)
+        try:
+            budget_ms = float(value)
+        except ValueError:
+            budget_ms = math.nan
+        if not budget_ms > 0 or math.isinf(budget_ms):
+            raise ValueError('Deadline must be a positive number of milliseconds')
+        return cls(budget_ms, reserve_ms)
+
+    def child(self):
+        """
+        Create a deadline expiring at the same time with its own timings, e.g. for one call of a batch.
+
+        Returns:
+            Deadline
+        """
+        child = Deadline(self.budget_ms, self.reserve_ms)
+        child.expires_at = self.expires_at
+        return child
+
+    def remaining_ms(self):
+        """Milliseconds left before the deadline (infinite without a budget)."""
+        if self.expires_at is None:
+            return math.inf
+        return (self.expires_at - time.perf_counter()) * 1000.0
+
+    def expired(self):
+        """Check whether the budget is used up."""
+        return self.remaining_ms() <= 0
+
+    def nearly_spent(self):
+        """Check whether less than the reserve is left, so optional work should be skipped."""
+        return self.remaining_ms() < self.reserve_ms
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a stage of the request; repeated stages accumulate.
+
+        Args:
+            name: Stage name reported in the timings
+        """
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000.0
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed, 3)
+
+    def degrade(self, stage):
+        """
+        Record that a stage fell back to a cheaper answer.
+
+        Args:
+            stage: Name of the degraded stage
+        """
+        if stage not in self.degraded_stages:
+            logger.info(f"Deadline nearly spent, degrading {stage} ({self.remaining_ms():.1f} ms left)")
+            self.degraded_stages.append(stage)
+
+    def report(self):
+        """
+        Summarize the request for its response.
+
+        Returns:
+            Dictionary with the degraded marker, degraded stages and per-stage timings in milliseconds
+        """
+        return {
+            'degraded': bool(self.degraded_stages),
+            'degradedStages': list(self.degraded_stages),
+            'timings': {
+                **self.timings,
+                'total': round((time.perf_counter() - self.started_at) * 1000.0, 3)
+            }
+        }
@@ -0,0 +1,308 @@
+import json
+import os
+import time
+import logging
+import numpy as np
+import pandas as pd
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+ACTIVITY_COLUMNS = ['name', 'description', 'category', 'duration', 'cost']
+
+
+def read_chunks(path, chunksize=100_000):
+    """
+    Stream a CSV or JSONL export in DataFrame chunks.
+
+    Args:
+        path: Path to a .csv or .jsonl/.json (one document per line) file
+        chunksize: Rows per chunk
+
+    Returns:
+        Iterator of DataFrames
+    """
+    if path.endswith('.csv'):
+        return pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False)
+    return pd.read_json(path, lines=True, chunksize=chunksize, dtype=False)
+
+
+def normalize_ids(values):
+    """
+    Normalize an ID column, unwrapping mongoexport {"$oid": ...} values.
+
+    Args:
+        values: pandas Series of IDs
+
+    Returns:
+        Series of stripped string IDs (empty string when missing)
+    """
+    unwrapped = values.map(lambda value: value.get('$oid', '') if isinstance(value, dict) else value)
+    return unwrapped.fillna('').astype(str).str.strip()
+
+
+def normalize_list_column(values):
+    """
+    Normalize a list-valued column from JSON arrays or delimited CSV strings.
+
+    Args:
+        values: pandas Series of lists or strings
+
+    Returns:
+        Series of lists
+    """
+    def to_list(value):
+        if isinstance(value, list):
+            return value
+        if isinstance(value, str) and value:
+            if value.startswith('['):
+                try:
+                    return json.loads(value)
+                except ValueError:
+                    pass
+            return [item for item in value.replace(';', ',').split(',')]
+        return []
+
+    return values.map(to_list)
+
+
+class ProgressReporter:
+    """Logs row counts and throughput while a file is being ingested."""
+
+    def __init__(self, label, interval=5.0):
+        """
+        Initialize the reporter.
+
+        Args:
+            label: Name of the data being ingested
+            interval: Minimum seconds between progress log lines
+        """
+        self.label = label
+        self.interval = interval
+        self.rows = 0
+        self.rejected = 0
+        self.start = time.perf_counter()
+        self._last_report = 0.0
+
+    def update(self, rows, rejected=0):
+        """Record a processed chunk and log progress if the interval elapsed."""
+        self.rows += rows
+        self.rejected += rejected
+        elapsed = time.perf_counter() - self.start
+        if elapsed - self._last_report >= self.interval:
+            self._last_report = elapsed
+            logger.info(f"{self.label}: {self.rows} rows ({self.rejected} rejected), {self.rows / max(elapsed, 1e-9):,.0f} rows/s")
+
+    def finish(self):
+        """Log the final totals."""
+        elapsed = time.perf_counter() - self.start
+        logger.info(f"{self.label}: finished {self.rows} rows ({self.rejected} rejected) in {elapsed:.1f}s")
+
+
+class PreferenceIngestor:
+    """Builds a compact preference snapshot (IDs, binary embeddings, pace codes) chunk by chunk."""
+
+    def __init__(self, preference_model, initial_capacity=1 << 16):
+        """
+        Initialize the ingestor.
+
+        Args:
+            preference_model: PreferenceModel providing the embedding layout
+            initial_capacity: Initial number of user rows allocated
+        """
+        self.model = preference_model
+        self.user_index = {}
+        self.user_ids = []
+        self.embeddings = np.zeros((initial_capacity, preference_model.embedding_size), dtype=np.uint8)
+        self.pace = np.full(initial_capacity, preference_model.pace_index['moderate'], dtype=np.uint8)
+
+    def _rows_for(self, user_ids):
+        """
+        Map user IDs to snapshot rows, allocating rows for new users.
+
+        Args:
+            user_ids: pandas Series of normalized user IDs
+
+        Returns:
+            int64 array of rows
+        """
+        rows = user_ids.map(self.user_index)
+        missing = rows.isna()
+        if missing.any():
+            for user_id in pd.unique(user_ids[missing]):
+                self.user_index[user_id] = len(self.user_ids)
+                self.user_ids.append(user_id)
+            rows = user_ids.map(self.user_index)
+
+        needed = len(self.user_ids)
+        if needed > self.embeddings.shape[0]:
+            capacity = max(needed, self.embeddings.shape[0] * 2)
+            embeddings = np.zeros((capacity, self.embeddings.shape[1]), dtype=np.uint8)
+            embeddings[:self.embeddings.shape[0]] = self.embeddings
+            pace = np.full(capacity, self.model.pace_index['moderate'], dtype=np.uint8)
+            pace[:self.pace.shape[0]] = self.pace
+            self.embeddings, self.pace = embeddings, pace
+
+        return rows.to_numpy(dtype=np.int64)
+
+    def add_chunk(self, chunk):
+        """
+        Validate, normalize and index one chunk of preference documents.
+
+        Rows without a user ID are rejected; unknown or missing tiers and pace
+        fall back to the schema defaults; a later row for the same user
+        replaces the earlier one entirely.
+
+        Args:
+            chunk: DataFrame with userId, interests, accommodationType,
+                transportationPreference and pacePreference columns
+
+        Returns:
+            Tuple of (accepted rows, rejected rows)
+        """
+        model = self.model
+        user_ids = normalize_ids(chunk['userId']) if 'userId' in chunk else pd.Series('', index=chunk.index)
+        valid = (user_ids != '').to_numpy()
+        chunk, user_ids = chunk[valid], user_ids[valid]
+        if chunk.empty:
+            return 0, int((~valid).sum())
+
+        # Keep the last row per user within the chunk
+        last = ~user_ids.duplicated(keep='last').to_numpy()
+        chunk, user_ids = chunk[last], user_ids[last]
+        rows = self._rows_for(user_ids)
+
+        self.embeddings[rows] = 0
+
+        # Interests: explode to (row, category) pairs and scatter ones
+        if 'interests' in chunk:
+            interests = normalize_list_column(chunk['interests'])
+            exploded = pd.Series(rows, index=chunk.index).repeat(interests.map(len))
+            categories = pd.Series(
+                [item for items in interests for item in items], dtype=object
+            ).astype(str).str.strip().str.lower()
+            columns = categories.map(model.interest_index).to_numpy()
+            known = ~pd.isna(columns)
+            self.embeddings[exploded.to_numpy()[known], columns[known].astype(np.int64)] = 1
+
+        for field, index, default in (
+            ('accommodationType', model.accommodation_index, 'mid-range'),
+            ('transportationPreference', model.transportation_index, 'public')
+        ):
+            values = chunk[field] if field in chunk else pd.Series(default, index=chunk.index)
+            columns = values.astype(str).str.strip().str.lower().map(index).fillna(index[default])
+            self.embeddings[rows, columns.to_numpy(dtype=np.int64)] = 1
+
+        # Like the tiers, a missing pace resets to the default rather than keeping an earlier row's
+        pace = chunk['pacePreference'] if 'pacePreference' in chunk else pd.Series('moderate', index=chunk.index)
+        pace = pace.astype(str).str.strip().str.lower().map(model.pace_index)
+        self.pace[rows] = pace.fillna(model.pace_index['moderate']).to_numpy(dtype=np.uint8)
+
+        return len(chunk), int((~valid).sum() + (~last).sum())
+
+    def save(self, path):
+        """
+        Write the snapshot in the layout PreferenceModel.load_snapshot reads.
+
+        Args:
+            path: Output directory
+        """
+        os.makedirs(path, exist_ok=True)
+        count = len(self.user_ids)
+        np.save(os.path.join(path, 'user_ids.npy'), np.char.encode(np.array(self.user_ids, dtype=str), 'utf-8'))
+        np.save(os.path.join(path, 'embeddings.npy'), self.embeddings[:count])
+        np.save(os.path.join(path, 'pace.npy'), self.pace[:count])
+
+        logger.info(f"Saved preference snapshot with {count} users to {path}")
+
+
+def ingest_preferences(input_path, output_path, preference_model, chunksize=100_000):
+    """
+    Stream a preference export into a compact snapshot.
+
+    Args:
+        input_path: CSV or JSONL export (e.g. mongoexport of the Preference collection)
+        output_path: Snapshot output directory
+        preference_model: PreferenceModel providing the embedding layout
+        chunksize: Rows per chunk
+
+    Returns:
+        Number of users in the snapshot
+    """
+    ingestor = PreferenceIngestor(preference_model)
+    progress = ProgressReporter('preferences')
+
+    for chunk in read_chunks(input_path, chunksize):
+        accepted, rejected = ingestor.add_chunk(chunk)
+        progress.update(accepted + rejected, rejected)
+
+    progress.finish()
+    ingestor.save(output_path)
+
+    return len(ingestor.user_ids)
+
+
+def normalize_activity_chunk(chunk):
+    """
+    Validate and normalize one chunk of activity rows.
+
+    Args:
+        chunk: DataFrame with name, category and optional description, duration and cost
+
+    Returns:
+        Tuple of (normalized DataFrame, rejected row count)
+    """
+    for column in ACTIVITY_COLUMNS:
+        if column not in chunk:
+            chunk[column] = None
+
+    normalized = pd.DataFrame({
+        'name': chunk['name'].fillna('').astype(str).str.strip(),
+        'description': chunk['description'].fillna('').astype(str).str.strip(),
+        'category': chunk['category'].fillna('').astype(str).str.strip().str.lower(),
+        'duration': pd.to_numeric(chunk['duration'], errors='coerce').fillna(2).clip(lower=0),
+        'cost': pd.to_numeric(chunk['cost'], errors='coerce').fillna(0).clip(lower=0)
+    })
+
+    valid = (normalized['name'] != '') & (normalized['category'] != '')
+    return normalized[valid], int((~valid).sum())
+
+
+def ingest_activities(input_path, output_path, chunksize=100_000):
+    """
+    Stream an activity export into a catalog file grouped by category.
+
+    Args:
+        input_path: CSV or JSONL export of activities
+        output_path: Catalog output directory
+        chunksize: Rows per chunk
+
+    Returns:
+        Number of activities in the catalog
+    """
+    progress = ProgressReporter('activities')
+    frames = []
+
+    for chunk in read_chunks(input_path, chunksize):
+        normalized, rejected = normalize_activity_chunk(chunk)
+        frames.append(normalized)
+        progress.update(len(chunk), rejected)
+
+    progress.finish()
+
+    activities = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=ACTIVITY_COLUMNS)
+    activities = activities.drop_duplicates(subset=['category', 'name'], keep='last')
+    activities['duration'] = activities['duration'].round().astype(int)
+    activities['cost'] = activities['cost'].round().astype(int)
+
+    catalog = {
+        category: group.drop(columns=['category']).to_dict(orient='records')
+        for category, group in activities.groupby('category', sort=True)
+    }
+
+    os.makedirs(output_path, exist_ok=True)
+    with open(os.path.join(output_path, 'activities.json'), 'w') as f:
+        json.dump(catalog, f)
+
+    logger.info(f"Saved activity catalog with {len(activities)} activities to {output_path}")
+    return len(activities)
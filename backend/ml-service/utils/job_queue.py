@@ -0,0 +1,501 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import multiprocessing
+import logging
+from utils.serialization import RawJSON, get_serializer
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+# Lanes in priority order; queued interactive jobs are always claimed before bulk ones
+LANES = ('interactive', 'bulk')
+TERMINAL_STATES = ('succeeded', 'failed', 'cancelled')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    lane TEXT NOT NULL,
+    lane_rank INTEGER NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, lane_rank, priority, created_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+"""
+
+
+def _connect(path):
+    """Open the job database in autocommit mode with write-ahead logging."""
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once its cancellation has been requested."""
+
+
+class JobContext:
+    """Handle passed to a job function for reporting progress from its worker process."""
+
+    def __init__(self, connection, job_id):
+        """
+        Initialize the context.
+
+        Args:
+            connection: SQLite connection of the worker process
+            job_id: ID of the running job
+        """
+        self.connection = connection
+        self.job_id = job_id
+
+    def progress(self, done, total=1, message=None):
+        """
+        Record progress and stop the job if it was cancelled.
+
+        Args:
+            done: Units of work completed
+            total: Total units of work
+            message: Short description of the current step (optional)
+
+        Raises:
+            JobCancelled: If cancellation of the job was requested
+        """
+        fraction = min(1.0, done / total) if total else 0.0
+        self.connection.execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message), heartbeat_at = ? WHERE id = ?",
+            (fraction, message, time.time(), self.job_id)
+        )
+        row = self.connection.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (self.job_id,)).fetchone()
+        if row is None or row[0]:
+            raise JobCancelled(self.job_id)
+
+
+def _worker_main(connection, path, environment):
+    """
+    Worker process loop: run one job at a time and report back when done.
+
+    Job functions are received with each job, so the environment is applied
+    before the modules defining them are imported in this process.
+    """
+    os.environ.update(environment)
+    database = _connect(path)
+
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            # The dispatching process is gone
+            return
+        if message is None:
+            return
+        job_id, function, params = message
+
+        try:
+            result = function(params, JobContext(database, job_id))
+            database.execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, progress = 1, finished_at = ? "
+                "WHERE id = ? AND status = 'running'",
+                (get_serializer().dumps(result).decode('utf-8'), time.time(), job_id)
+            )
+        except JobCancelled:
+            database.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'running'",
+                (time.time(), job_id)
+            )
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            database.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ? AND status = 'running'",
+                (str(e), time.time(), job_id)
+            )
+
+        try:
+            connection.send(job_id)
+        except (BrokenPipeError, OSError):
+            return
+
+
+class _Worker:
+    """A worker process with the pipe used to hand it jobs."""
+
+    def __init__(self, context, path, environment):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_connection, path, environment), name='ml-job-worker', daemon=True
+        )
+        self.process.start()
+        self.job_id = None
+        self.lane = None
+
+    def stop(self, terminate=False):
+        """Stop the process, killing it if terminate is set or it does not exit promptly."""
+        if not terminate:
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(5.0)
+        self.connection.close()
+
+
+class JobQueue:
+    """
+    SQLite-backed queue of long-running jobs executed on a bounded pool of worker processes.
+
+    Jobs persist in the database, so queued jobs survive restarts, and running
+    jobs whose owning process stopped heartbeating are re-queued once their
+    lease expires. Several service processes may share one database; each
+    claims jobs atomically. One worker stays reserved for the interactive lane
+    so bulk jobs cannot starve it, and cancelling a running job replaces the
+    worker process executing it.
+    """
+
+    def __init__(self, path, handlers, workers=2, reserved_workers=1, lease_seconds=60.0,
+                 max_attempts=3, result_ttl=86400.0, poll_interval=0.5, worker_environment=None):
+        """
+        Initialize the queue and create its database.
+
+        Args:
+            path: SQLite database file
+            handlers: Dictionary mapping job types to module-level functions
+                taking (params, JobContext) and returning a JSON-serializable result
+            workers: Maximum number of worker processes
+            reserved_workers: Workers kept free of bulk jobs for the interactive lane
+            lease_seconds: Seconds without a heartbeat after which a running job is re-queued
+            max_attempts: Times a job is started before it is marked failed
+            result_ttl: Seconds finished jobs are kept
+            poll_interval: Seconds between dispatcher passes when idle
+            worker_environment: Environment variables set in worker processes
+        """
+        self.path = path
+        self.handlers = handlers
+        self.max_workers = workers
+        self.bulk_workers = max(1, workers - reserved_workers)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.worker_environment = dict(worker_environment or {})
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = _connect(path)
+        self.connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+        # Spawned workers avoid forking a process that is running other threads
+        self._context = multiprocessing.get_context('spawn')
+        self.workers = []
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the dispatcher thread; worker processes are spawned when jobs arrive."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='ml-job-dispatcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, job_type, params, lane='bulk', priority=0):
+        """
+        Queue a job.
+
+        Args:
+            job_type: Registered job type
+            params: JSON-serializable job parameters
+            lane: 'interactive' or 'bulk'
+            priority: Higher values run earlier within a lane
+
+        Returns:
+            Job status dictionary
+
+        Raises:
+            ValueError: If the job type or lane is unknown
+        """
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}. Expected one of {', '.join(self.handlers)}")
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane: {lane}. Expected one of {', '.join(LANES)}")
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self.connection.execute(
+                "INSERT INTO jobs (id, type, lane, lane_rank, priority, status, params, created_at) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, job_type, lane, LANES.index(lane), int(priority),
+                 get_serializer().dumps(params).decode('utf-8'), time.time())
+            )
+        self._wakeup.set()
+
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """
+        Get a job's status, with its result once it has succeeded.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job status dictionary, or None if the job is unknown
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT id, type, lane, status, progress, message, result, error, attempts, "
+                "created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            'id': row[0],
+            'type': row[1],
+            'lane': row[2],
+            'status': row[3],
+            'progress': row[4],
+            'message': row[5],
+            'attempts': row[8],
+            'createdAt': row[9],
+            'startedAt': row[10],
+            'finishedAt': row[11]
+        }
+        if row[3] == 'succeeded':
+            # Stored results are already JSON; splice them in without decoding
+            job['result'] = RawJSON(row[6])
+        if row[3] == 'failed':
+            job['error'] = row[7]
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. Queued jobs stop immediately; running ones once the dispatcher notices.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Job status dictionary, or None if the job is unknown
+        """
+        with self._lock:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+            self.connection.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,)
+            )
+        self._wakeup.set()
+
+        return self.get(job_id)
+
+    def _run(self):
+        """Dispatcher loop: collect finished jobs, apply cancellations and hand out queued jobs."""
+        while not self._stop_event.is_set():
+            try:
+                self._dispatch()
+            except Exception:
+                logger.exception("Error dispatching jobs")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _dispatch(self):
+        """One dispatcher pass; a failing step is logged without skipping the others."""
+        now = time.time()
+
+        for worker in list(self.workers):
+            try:
+                self._collect(worker)
+            except Exception:
+                logger.exception(f"Error collecting job {worker.job_id} from its worker")
+                if worker in self.workers:
+                    self._replace(worker, terminate=True)
+
+        try:
+            with self._lock:
+                running = {worker.job_id: worker for worker in self.workers if worker.job_id is not None}
+                if running:
+                    self._cancel_running(running, now)
+                    placeholders = ','.join('?' * len(running))
+                    self.connection.execute(
+                        f"UPDATE jobs SET heartbeat_at = ? WHERE id IN ({placeholders})", (now, *running)
+                    )
+        except Exception:
+            logger.exception("Error updating running jobs")
+
+        with self._lock:
+            self._expire_leases(now)
+            self.connection.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (now - self.result_ttl,)
+            )
+
+        self._claim_jobs(now)
+
+    def _collect(self, worker):
+        """Free a worker whose job finished, or release the job of a worker process that died."""
+        try:
+            if worker.connection.poll():
+                worker.connection.recv()
+                worker.job_id = worker.lane = None
+                return
+            if worker.process.is_alive():
+                return
+        except (EOFError, OSError):
+            # poll() reports a closed pipe as readable; recv() then fails
+            pass
+
+        if worker.job_id is not None:
+            logger.error(f"Worker process exited while running job {worker.job_id}")
+            self._release(worker.job_id, 'Worker process exited')
+        self._replace(worker, terminate=True)
+
+    def _cancel_running(self, running, now):
+        """Terminate workers whose jobs were cancelled and replace them."""
+        placeholders = ','.join('?' * len(running))
+        cancelled = self.connection.execute(
+            f"SELECT id FROM jobs WHERE id IN ({placeholders}) AND cancel_requested = 1", tuple(running)
+        ).fetchall()
+
+        for (job_id,) in cancelled:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'running'",
+                (now, job_id)
+            )
+            self._replace(running.pop(job_id), terminate=True)
+
+    def _expire_leases(self, now):
+        """Re-queue (or fail, after max_attempts) running jobs whose owner stopped heartbeating."""
+        expired = now - self.lease_seconds
+        self.connection.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Job exceeded its attempts', finished_at = ? "
+            "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+            (now, expired, self.max_attempts)
+        )
+        requeued = self.connection.execute(
+            "UPDATE jobs SET status = 'queued', owner = NULL WHERE status = 'running' AND heartbeat_at < ?",
+            (expired,)
+        ).rowcount
+        if requeued:
+            logger.warning(f"Re-queued {requeued} jobs with expired leases")
+
+    def _release(self, job_id, error):
+        """Return a job whose worker died to the queue, or fail it after max_attempts."""
+        with self._lock:
+            self.connection.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "error = ?, owner = NULL, finished_at = CASE WHEN attempts >= ? THEN ? END "
+                "WHERE id = ? AND status = 'running'",
+                (self.max_attempts, error, self.max_attempts, time.time(), job_id)
+            )
+
+    def _replace(self, worker, terminate=False):
+        """Stop a worker process and forget it; a fresh one is spawned when needed."""
+        worker.stop(terminate=terminate)
+        self.workers.remove(worker)
+
+    def _claim_jobs(self, now):
+        """Hand queued jobs to idle or new workers, keeping reserved workers free of bulk jobs."""
+        while True:
+            idle = [worker for worker in self.workers if worker.job_id is None]
+            if not idle and len(self.workers) >= self.max_workers:
+                return
+
+            bulk_running = sum(1 for worker in self.workers if worker.lane == 'bulk')
+            lanes = LANES if bulk_running < self.bulk_workers else ('interactive',)
+
+            job = self._claim(lanes, now)
+            if job is None:
+                return
+
+            worker = idle[0] if idle else self._spawn()
+            job_id, job_type, lane, params = job
+            worker.job_id, worker.lane = job_id, lane
+            try:
+                worker.connection.send((job_id, self.handlers[job_type], json.loads(params)))
+            except (BrokenPipeError, OSError):
+                logger.error(f"Worker process exited before receiving job {job_id}")
+                self._release(job_id, 'Worker process exited')
+                self._replace(worker, terminate=True)
+
+    def _claim(self, lanes, now):
+        """Atomically mark the next queued job in the given lanes as running for this process."""
+        placeholders = ','.join('?' * len(lanes))
+        with self._lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                row = self.connection.execute(
+                    f"SELECT id, type, lane, params FROM jobs WHERE status = 'queued' AND lane IN ({placeholders}) "
+                    "ORDER BY lane_rank, priority DESC, created_at LIMIT 1",
+                    lanes
+                ).fetchone()
+                if row is not None:
+                    self.connection.execute(
+                        "UPDATE jobs SET status = 'running', owner = ?, started_at = ?, heartbeat_at = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (self.owner, now, now, row[0])
+                    )
+                self.connection.execute('COMMIT')
+            except Exception:
+                self.connection.execute('ROLLBACK')
+                raise
+        return row
+
+    def _spawn(self):
+        """Start a new worker process."""
+        worker = _Worker(self._context, self.path, self.worker_environment)
+        self.workers.append(worker)
+        return worker
+
+    def close(self):
+        """Stop the dispatcher and worker processes, returning their running jobs to the queue."""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(5.0)
+        for worker in list(self.workers):
+            if worker.job_id is not None:
+                self._release(worker.job_id, 'Service stopped')
+            self._replace(worker, terminate=worker.job_id is not None)
+
+    def get_status(self):
+        """
+        Get status information about the queue.
+
+        Returns:
+            Status information
+        """
+        with self._lock:
+            counts = dict(self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+        return {
+            'jobs': counts,
+            'workers': len(self.workers),
+            'busy_workers': sum(1 for worker in self.workers if worker.job_id is not None),
+            'max_workers': self.max_workers,
+            'job_types': list(self.handlers)
+        }
@@ -0,0 +1,252 @@
+import cProfile
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+import logging
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('sample', 'cprofile')
+
+
+def _frame_label(code):
+    """
+    Build a flamegraph frame label for a code object.
+
+    Args:
+        code: Code object of the frame
+
+    Returns:
+        Label in the form "function (file:line)"
+    """
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Low-overhead sampler that periodically captures the stack of one thread."""
+
+    def __init__(self, thread_id, interval=0.005):
+        """
+        Initialize the stack sampler.
+
+        Args:
+            thread_id: Identifier of the thread to sample
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling in a background daemon thread."""
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread to exit."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        """Sampling loop: record the target thread's stack until stopped."""
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+
+            self.stacks[';'.join(reversed(labels))] += 1
+
+    def collapsed(self):
+        """
+        Get the samples as collapsed stacks.
+
+        Returns:
+            Dictionary mapping "root;...;leaf" stacks to sample counts
+        """
+        return dict(self.stacks)
+
+
+def _collapse_cprofile(profiler):
+    """
+    Convert cProfile statistics to collapsed caller;callee edges.
+
+    cProfile records call edges rather than full stacks, so each entry is a
+    two-frame stack weighted by the time spent in the callee, in microseconds.
+
+    Args:
+        profiler: Finished cProfile.Profile instance
+
+    Returns:
+        Dictionary mapping "caller;callee" stacks to weights
+    """
+    stats = pstats.Stats(profiler).stats
+    stacks = Counter()
+
+    for (filename, line, name), (_, _, tottime, _, callers) in stats.items():
+        callee = f"{name} ({os.path.basename(filename)}:{line})"
+        if not callers:
+            stacks[callee] += int(tottime * 1e6)
+            continue
+        for (c_file, c_line, c_name), caller_stats in callers.items():
+            caller = f"{c_name} ({os.path.basename(c_file)}:{c_line})"
+            stacks[f"{caller};{callee}"] += int(caller_stats[2] * 1e6)
+
+    return {stack: weight for stack, weight in stacks.items() if weight > 0}
+
+
+class RequestProfiler:
+    """On-demand request profiler storing results in a bounded ring buffer."""
+
+    def __init__(self, sample_rate=0.0, buffer_size=100, interval=0.005, default_mode='sample'):
+        """
+        Initialize the request profiler.
+
+        Args:
+            sample_rate: Fraction of requests (0-1) profiled without being asked
+            buffer_size: Maximum number of profiles kept
+            interval: Seconds between stack samples in 'sample' mode
+            default_mode: Mode used for randomly sampled requests
+        """
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.default_mode = default_mode if default_mode in PROFILE_MODES else 'sample'
+        self.profiles = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+
+    def select_mode(self, requested_mode=None):
+        """
+        Decide whether and how to profile a request.
+
+        Args:
+            requested_mode: Mode requested by the caller (e.g. via header), if any
+
+        Returns:
+            Profiling mode, or None if the request should not be profiled
+        """
+        if requested_mode:
+            requested_mode = requested_mode.lower()
+            return requested_mode if requested_mode in PROFILE_MODES else self.default_mode
+
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.default_mode
+
+        return None
+
+    @contextmanager
+    def profile(self, name, mode='sample'):
+        """
+        Profile the enclosed block and record the result.
+
+        Args:
+            name: Name of the profiled operation (e.g. endpoint name)
+            mode: Profiling mode ('sample' or 'cprofile')
+        """
+        started_at = datetime.now()
+        start = time.perf_counter()
+
+        if mode == 'cprofile':
+            collector = cProfile.Profile()
+            collector.enable()
+        else:
+            collector = StackSampler(threading.get_ident(), self.interval)
+            collector.start()
+
+        try:
+            yield
+        finally:
+            if mode == 'cprofile':
+                collector.disable()
+                stacks = _collapse_cprofile(collector)
+            else:
+                collector.stop()
+                stacks = collector.collapsed()
+
+            self._record({
+                'id': uuid.uuid4().hex,
+                'name': name,
+                'mode': mode,
+                'startedAt': started_at.isoformat(),
+                'durationMs': round((time.perf_counter() - start) * 1000, 3),
+                'stacks': stacks
+            })
+
+    def _record(self, profile):
+        """Append a finished profile to the ring buffer."""
+        with self._lock:
+            self.profiles.append(profile)
+        logger.info(f"Recorded {profile['mode']} profile for {profile['name']} ({profile['durationMs']} ms)")
+
+    def get_profiles(self, name=None, limit=None):
+        """
+        Get recorded profiles, newest first.
+
+        Args:
+            name: Only return profiles for this operation (optional)
+            limit: Maximum number of profiles to return (optional)
+
+        Returns:
+            List of profile dictionaries
+        """
+        with self._lock:
+            profiles = list(reversed(self.profiles))
+
+        if name:
+            profiles = [p for p in profiles if p['name'] == name]
+        if limit:
+            profiles = profiles[:limit]
+
+        return profiles
+
+    def get_collapsed(self, name=None, profile_id=None):
+        """
+        Merge recorded profiles into collapsed-stack text for flamegraph tools.
+
+        Args:
+            name: Only include profiles for this operation (optional)
+            profile_id: Only include the profile with this ID (optional)
+
+        Returns:
+            Collapsed stacks, one "frame;frame;frame count" line per stack
+        """
+        merged = Counter()
+        for profile in self.get_profiles(name=name):
+            if profile_id and profile['id'] != profile_id:
+                continue
+            merged.update(profile['stacks'])
+
+        return '\n'.join(f"{stack} {count}" for stack, count in sorted(merged.items()))
+
+    def clear(self):
+        """Remove all recorded profiles."""
+        with self._lock:
+            self.profiles.clear()
+
+    def get_status(self):
+        """
+        Get status information about the profiler.
+
+        Returns:
+            Status information
+        """
+        return {
+            'sample_rate': self.sample_rate,
+            'buffer_size': self.profiles.maxlen,
+            'profiles_recorded': len(self.profiles),
+            'default_mode': self.default_mode
+        }
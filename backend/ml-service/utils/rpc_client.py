@@ -0,0 +1,175 @@
+import http.client
+import itertools
+import logging
+from urllib.parse import urlsplit
+from utils.serialization import get_frame_codec, encode_frame, decode_frames
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+class RPCError(Exception):
+    """A call sent through the framed /rpc endpoint was rejected or failed."""
+
+    def __init__(self, operation, message):
+        super().__init__(f"{operation}: {message}")
+        self.operation = operation
+
+
+class RPCClient:
+    """
+    Client for the framed binary /rpc endpoint.
+
+    Calls are queued and sent together in one request, so a batch costs one
+    round trip over a kept-alive connection. Frames are MessagePack-encoded when
+    msgpack is installed and JSON-encoded otherwise.
+
+    Example:
+        client = RPCClient('http://localhost:5000/api/v1')
+        client.add('analyze', text='Beaches in Lisbon')
+        client.add('preferences', userId='u1', preferences={'interests': ['food']})
+        analysis, stored = client.send()
+    """
+
+    def __init__(self, base_url=None, test_client=None, content_type=None, timeout=30):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Base URL of the API blueprint (e.g. 'http://localhost:5000/api/v1')
+            test_client: Flask test client used instead of a network connection (for tests)
+            content_type: Frame content type (default: MessagePack when installed, else JSON)
+            timeout: Socket timeout in seconds
+        """
+        if (base_url is None) == (test_client is None):
+            raise ValueError("Pass exactly one of base_url and test_client")
+
+        self.codec = get_frame_codec(content_type)
+        if self.codec is None:
+            raise ValueError(f"Unsupported frame content type: {content_type}")
+
+        self.test_client = test_client
+        self.timeout = timeout
+        self.path = '/api/v1/rpc'
+        self.connection = None
+        if base_url is not None:
+            url = urlsplit(base_url)
+            self.scheme, self.netloc = url.scheme, url.netloc
+            self.path = url.path.rstrip('/') + '/rpc'
+
+        self.pending = []
+        self.ids = itertools.count(1)
+
+    def add(self, operation, **params):
+        """
+        Queue a call for the next send.
+
+        Args:
+            operation: Operation name (e.g. 'recommendations', 'analyze', 'preferences')
+            **params: Request payload, as sent to the equivalent JSON route
+
+        Returns:
+            Call ID
+        """
+        call_id = next(self.ids)
+        self.pending.append({'id': call_id, 'op': operation, 'params': params})
+        return call_id
+
+    def call(self, operation, **params):
+        """
+        Send a single call (together with any queued ones) and return its result.
+
+        Args:
+            operation: Operation name
+            **params: Request payload
+
+        Returns:
+            Result data of the call
+
+        Raises:
+            RPCError: If the call failed
+        """
+        self.add(operation, **params)
+        return self.send()[-1]
+
+    def send(self, raise_errors=True):
+        """
+        Send all queued calls in one request.
+
+        Args:
+            raise_errors: Raise RPCError for the first failed call instead of returning it
+
+        Returns:
+            List with the result data of each call in order; failed calls are
+            RPCError instances when raise_errors is False
+
+        Raises:
+            RPCError: If a call failed and raise_errors is True
+        """
+        calls, self.pending = self.pending, []
+        if not calls:
+            return []
+
+        body = b''.join(encode_frame(self.codec, call) for call in calls)
+        responses = {frame.get('id'): frame for frame in decode_frames(self._post(body), self.codec)}
+
+        results = []
+        for call in calls:
+            frame = responses.get(call['id'], {'status': 'error', 'message': 'No response frame'})
+            if frame.get('status') == 'success':
+                results.append(frame.get('data'))
+                continue
+
+            error = RPCError(call['op'], frame.get('message'))
+            if raise_errors:
+                raise error
+            results.append(error)
+
+        return results
+
+    def _post(self, body):
+        """POST a framed body and return the framed response body."""
+        headers = {'Content-Type': self.codec.content_type}
+
+        if self.test_client is not None:
+            response = self.test_client.post(self.path, data=body, headers=headers)
+            status, data = response.status_code, response.get_data()
+        else:
+            status, data = self._post_http(body, headers)
+
+        if status != 200:
+            raise RPCError('rpc', f"HTTP {status}: {data[:200]!r}")
+        return data
+
+    def _post_http(self, body, headers):
+        """
+        POST over the kept-alive connection, reconnecting once if the server closed it.
+
+        Only a request that failed while being sent is retried. Once it was
+        sent the server may have run its calls, and batches can hold writes
+        (e.g. preference updates), so later failures are raised instead.
+        """
+        for attempt in range(2):
+            if self.connection is None:
+                connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+                self.connection = connection_class(self.netloc, timeout=self.timeout)
+            try:
+                self.connection.request('POST', self.path, body=body, headers=headers)
+            except (ConnectionResetError, BrokenPipeError):
+                self.close()
+                if attempt:
+                    raise
+                continue
+
+            try:
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except Exception:
+                self.close()
+                raise
+
+    def close(self):
+        """Close the kept-alive connection."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,323 @@
+import json
+import struct
+import uuid
+from collections.abc import Mapping
+from datetime import date, datetime
+import logging
+from flask import Response
+
+# Optional fast encoder; the stdlib encoder is used when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional MessagePack codec for the framed binary transport
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+class RawJSON:
+    """Pre-serialized JSON fragment that is spliced into responses without re-encoding."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        """
+        Initialize the fragment.
+
+        Args:
+            data: Encoded JSON document (bytes or str)
+        """
+        self.data = data.encode('utf-8') if isinstance(data, str) else data
+
+    @classmethod
+    def from_obj(cls, obj):
+        """
+        Encode an object once and wrap it as a fragment.
+
+        Args:
+            obj: JSON-serializable object
+
+        Returns:
+            RawJSON fragment
+        """
+        return cls(get_serializer().dumps(obj))
+
+    def __repr__(self):
+        return f"RawJSON({len(self.data)} bytes)"
+
+
+def _default(obj):
+    """
+    Convert types the encoders do not handle natively.
+
+    Args:
+        obj: Object to convert
+
+    Returns:
+        JSON-serializable equivalent
+    """
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'tolist'):  # numpy arrays and scalars
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StdlibSerializer:
+    """JSON serializer based on the standard library encoder."""
+
+    name = 'stdlib'
+
+    def _encode(self, obj, default):
+        """Encode an object to bytes with the given fallback hook."""
+        return json.dumps(obj, default=default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def dumps(self, obj):
+        """
+        Encode an object as JSON, splicing in RawJSON fragments.
+
+        Args:
+            obj: Object to encode
+
+        Returns:
+            Encoded JSON as bytes
+        """
+        fragments = []
+        token = uuid.uuid4().hex
+
+        def default(value):
+            if isinstance(value, RawJSON):
+                fragments.append(value.data)
+                return f"__raw_{token}_{len(fragments) - 1}__"
+            return _default(value)
+
+        encoded = self._encode(obj, default)
+
+        # Replace each placeholder string with its pre-encoded fragment
+        for index, fragment in enumerate(fragments):
+            encoded = encoded.replace(f'"__raw_{token}_{index}__"'.encode('utf-8'), fragment, 1)
+
+        return encoded
+
+
+class OrjsonSerializer(StdlibSerializer):
+    """JSON serializer based on orjson, with native fragment support when available."""
+
+    name = 'orjson'
+
+    def __init__(self):
+        """Initialize the orjson serializer."""
+        self.options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        self.native_fragments = hasattr(orjson, 'Fragment')
+
+    def _encode(self, obj, default):
+        """Encode an object to bytes with the given fallback hook."""
+        return orjson.dumps(obj, default=default, option=self.options)
+
+    def dumps(self, obj):
+        """
+        Encode an object as JSON, splicing in RawJSON fragments.
+
+        Args:
+            obj: Object to encode
+
+        Returns:
+            Encoded JSON as bytes
+        """
+        # Older orjson releases lack Fragment and use placeholder splicing
+        if not self.native_fragments:
+            return super().dumps(obj)
+
+        def default(value):
+            if isinstance(value, RawJSON):
+                return orjson.Fragment(value.data)
+            return _default(value)
+
+        return self._encode(obj, default)
+
+
+_serializers = {
+    'stdlib': StdlibSerializer
+}
+if orjson is not None:
+    _serializers['orjson'] = OrjsonSerializer
+
+_active_serializer = None
+
+
+def set_serializer(name='auto'):
+    """
+    Select the serializer used for API responses.
+
+    Args:
+        name: Serializer name ('auto', 'orjson' or 'stdlib'); 'auto' prefers orjson
+
+    Returns:
+        Active serializer instance
+    """
+    global _active_serializer
+
+    if name == 'auto':
+        name = 'orjson' if 'orjson' in _serializers else 'stdlib'
+    elif name not in _serializers:
+        logger.warning(f"JSON serializer '{name}' is not available, falling back to stdlib")
+        name = 'stdlib'
+
+    _active_serializer = _serializers[name]()
+    logger.info(f"Using {name} JSON serializer")
+
+    return _active_serializer
+
+
+def get_serializer():
+    """
+    Get the active serializer, selecting the default one on first use.
+
+    Returns:
+        Active serializer instance
+    """
+    if _active_serializer is None:
+        set_serializer()
+    return _active_serializer
+
+
+def json_response(payload, status=200):
+    """
+    Build a JSON response using the active serializer.
+
+    Args:
+        payload: Response payload (may contain RawJSON fragments)
+        status: HTTP status code
+
+    Returns:
+        Flask Response
+    """
+    return Response(get_serializer().dumps(payload), status=status, mimetype='application/json')
+
+
+# Each frame of the binary transport is a 4-byte big-endian length followed by the payload
+FRAME_HEADER = struct.Struct('>I')
+
+
+class JSONFrameCodec:
+    """Frame payload codec using the active JSON serializer."""
+
+    name = 'json'
+    content_type = 'application/x-frames+json'
+
+    def encode(self, obj):
+        """Encode an object as one frame payload."""
+        return get_serializer().dumps(obj)
+
+    def decode(self, data):
+        """Decode one frame payload."""
+        return json.loads(data)
+
+
+class MsgpackFrameCodec:
+    """Frame payload codec using MessagePack."""
+
+    name = 'msgpack'
+    content_type = 'application/x-frames+msgpack'
+
+    def encode(self, obj):
+        """Encode an object as one frame payload."""
+        return msgpack.packb(obj, default=self._default, use_bin_type=True)
+
+    def decode(self, data):
+        """Decode one frame payload."""
+        return msgpack.unpackb(data, raw=False)
+
+    @staticmethod
+    def _default(obj):
+        """Convert types MessagePack does not handle natively."""
+        if isinstance(obj, RawJSON):
+            return json.loads(obj.data)
+        return _default(obj)
+
+
+_frame_codecs = {
+    JSONFrameCodec.content_type: JSONFrameCodec()
+}
+if msgpack is not None:
+    _frame_codecs[MsgpackFrameCodec.content_type] = MsgpackFrameCodec()
+
+
+def get_frame_codec(content_type=None):
+    """
+    Get the frame codec for a content type.
+
+    Args:
+        content_type: Content type of a framed body; None picks MessagePack when installed
+
+    Returns:
+        Frame codec, or None if the content type is not supported
+    """
+    if content_type is None:
+        content_type = MsgpackFrameCodec.content_type if msgpack is not None else JSONFrameCodec.content_type
+    return _frame_codecs.get(content_type)
+
+
+def encode_frame(codec, obj):
+    """
+    Encode an object as one length-prefixed frame.
+
+    Args:
+        codec: Frame codec
+        obj: Object to encode
+
+    Returns:
+        Frame bytes
+    """
+    payload = codec.encode(obj)
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def decode_frames(data, codec, max_frames=None):
+    """
+    Decode a body of concatenated length-prefixed frames.
+
+    Args:
+        data: Body bytes
+        codec: Frame codec
+        max_frames: Maximum number of frames accepted (optional)
+
+    Returns:
+        List of decoded frame objects
+
+    Raises:
+        ValueError: If the body is truncated, a payload does not decode or there are too many frames
+    """
+    view = memoryview(data)
+    frames = []
+    offset = 0
+
+    while offset < len(view):
+        if max_frames is not None and len(frames) >= max_frames:
+            raise ValueError(f"At most {max_frames} frames are accepted per request")
+        if offset + FRAME_HEADER.size > len(view):
+            raise ValueError("Truncated frame header")
+
+        (length,) = FRAME_HEADER.unpack_from(view, offset)
+        offset += FRAME_HEADER.size
+        if offset + length > len(view):
+            raise ValueError("Truncated frame payload")
+
+        try:
+            frames.append(codec.decode(view[offset:offset + length].tobytes()))
+        except Exception as e:
+            raise ValueError(f"Invalid {codec.name} frame: {e}") from e
+        offset += length
+
+    return frames
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import logging
+from utils.serialization import get_serializer
+
+# File locks are only available on POSIX; cross-worker coalescing is disabled elsewhere
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Initialize logging
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Raised when waiting on an in-flight computation exceeds the timeout."""
+
+
+def canonical_key(*parts):
+    """
+    Build a stable key from JSON-serializable request parts.
+
+    Args:
+        parts: Values identifying the request
+
+    Returns:
+        Hex digest identifying the request
+    """
+    encoded = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+class _Call:
+    """An in-flight computation shared by concurrent callers."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single computation."""
+
+    def __init__(self, timeout=30.0, lock_dir=None, result_ttl=2.0):
+        """
+        Initialize the single-flight group.
+
+        Args:
+            timeout: Seconds a caller waits for an in-flight computation
+            lock_dir: Directory for cross-worker lock/result files (optional)
+            result_ttl: Seconds a result written by another worker may be reused
+        """
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self.lock_dir = lock_dir if fcntl is not None else None
+        self.calls = {}
+        self.coalesced_count = 0
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+
+        if lock_dir and fcntl is None:
+            logger.warning("File locks unavailable, cross-worker request coalescing disabled")
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def do(self, key, fn, timeout=None):
+        """
+        Run fn once for all concurrent callers sharing the same key.
+
+        Args:
+            key: Canonical request key
+            fn: Zero-argument callable producing the result
+            timeout: Seconds this caller waits for an in-flight computation (default: the group's timeout)
+
+        Returns:
+            Result of fn, shared with concurrent callers
+
+        Raises:
+            SingleFlightTimeout: If the in-flight computation does not finish in time
+            Exception: Any exception raised by fn, re-raised for every caller
+        """
+        with self._lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self.calls[key] = call
+            else:
+                self.coalesced_count += 1
+
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        if not leader:
+            if not call.done.wait(timeout):
+                raise SingleFlightTimeout(f"Timed out waiting for in-flight request {key}")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if self.lock_dir:
+                call.result = self._do_across_workers(key, fn, timeout)
+            else:
+                call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self.calls[key]
+            call.done.set()
+
+        return call.result
+
+    def _do_across_workers(self, key, fn, timeout):
+        """
+        Coordinate with other worker processes through a lock file.
+
+        The first worker to take the lock computes the result and writes it
+        next to the lock file; workers that were blocked on the lock reuse it
+        if it is fresher than result_ttl. The lock file is removed on release
+        and result files once they are stale, so the directory does not grow.
+
+        Args:
+            key: Canonical request key
+            fn: Zero-argument callable producing the result
+            timeout: Seconds to wait for the lock
+
+        Returns:
+            Result of fn, possibly computed by another worker
+
+        Raises:
+            SingleFlightTimeout: If another worker holds the lock for longer than timeout
+        """
+        lock_path = os.path.join(self.lock_dir, f"{key}.lock")
+        result_path = os.path.join(self.lock_dir, f"{key}.json")
+        self._sweep_results()
+
+        deadline = time.monotonic() + timeout
+        lock_file = None
+        while lock_file is None:
+            lock_file = self._lock_file(lock_path, key, deadline)
+
+        with lock_file:
+            try:
+                cached = self._read_fresh_result(result_path)
+                if cached is not None:
+                    with self._lock:
+                        self.coalesced_count += 1
+                    return cached
+
+                result = fn()
+
+                # Write atomically so readers never see a partial file
+                tmp_path = f"{result_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(get_serializer().dumps(result))
+                os.replace(tmp_path, result_path)
+
+                return result
+            finally:
+                # Unlink before unlocking; waiters holding the old file notice and reopen
+                try:
+                    os.unlink(lock_path)
+                except OSError:
+                    pass
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _lock_file(self, lock_path, key, deadline):
+        """
+        Open and lock a lock file.
+
+        Args:
+            lock_path: Path of the lock file
+            key: Canonical request key
+            deadline: time.monotonic() value after which to give up
+
+        Returns:
+            The locked file, or None if it was unlinked by its previous holder and must be reopened
+
+        Raises:
+            SingleFlightTimeout: If the lock is not acquired before deadline
+        """
+        lock_file = open(lock_path, 'a')
+        try:
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise SingleFlightTimeout(f"Timed out waiting for worker lock on {key}")
+                    time.sleep(0.005)
+
+            try:
+                current = os.stat(lock_path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(lock_file.fileno()).st_ino:
+                return lock_file
+        except BaseException:
+            lock_file.close()
+            raise
+
+        lock_file.close()
+        return None
+
+    def _sweep_results(self):
+        """Delete result files older than result_ttl (and abandoned temporary files), at most once per result_ttl."""
+        now = time.time()
+        with self._lock:
+            if now - self._swept_at < self.result_ttl:
+                return
+            self._swept_at = now
+
+        try:
+            names = os.listdir(self.lock_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith('.json'):
+                ttl = self.result_ttl
+            elif name.endswith('.tmp'):
+                ttl = self.timeout
+            else:
+                continue
+            path = os.path.join(self.lock_dir, name)
+            try:
+                if now - os.path.getmtime(path) > ttl:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+    def _read_fresh_result(self, result_path):
+        """
+        Read a result written by another worker if it is still fresh.
+
+        Args:
+            result_path: Path of the result file
+
+        Returns:
+            Decoded result, or None if missing or stale
+        """
+        try:
+            if time.time() - os.path.getmtime(result_path) > self.result_ttl:
+                return None
+            with open(result_path, 'rb') as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def get_status(self):
+        """
+        Get status information about request coalescing.
+
+        Returns:
+            Status information
+        """
+        with self._lock:
+            in_flight = len(self.calls)
+
+        return {
+            'in_flight': in_flight,
+            'coalesced_requests': self.coalesced_count,
+            'timeout_seconds': self.timeout,
+            'cross_worker': bool(self.lock_dir)
+        }
@@ -41,12 +41,25 @@ def extract_entities(text):
     
     return entities
 
-def analyze_sentiment(text):
+# Default (English) sentiment lexicon
+POSITIVE_WORDS = frozenset([
+    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
+    'enjoy', 'like', 'love', 'happy', 'excited', 'beautiful', 'best'
+])
+
+NEGATIVE_WORDS = frozenset([
+    'bad', 'terrible', 'awful', 'horrible', 'poor', 'disappointing',
+    'dislike', 'hate', 'unhappy', 'sad', 'worst', 'annoying'
+])
+
+def analyze_sentiment(text, positive_words=POSITIVE_WORDS, negative_words=NEGATIVE_WORDS):
     """
     Analyze sentiment of text.
     
     Args:
         text: Text to analyze
+        positive_words: Positive lexicon (default: English)
+        negative_words: Negative lexicon (default: English)
         
     Returns:
         Sentiment analysis results
@@ -56,17 +69,6 @@ def analyze_sentiment(text):
     # This is a simple placeholder for more advanced sentiment analysis
     # In a real implementation, use a trained model
     
-    # List of positive and negative words
-    positive_words = [
-        'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
-        'enjoy', 'like', 'love', 'happy', 'excited', 'beautiful', 'best'
-    ]
-    
-    negative_words = [
-        'bad', 'terrible', 'awful', 'horrible', 'poor', 'disappointing',
-        'dislike', 'hate', 'unhappy', 'sad', 'worst', 'annoying'
-    ]
-    
     # Normalize text
     text = text.lower()
     words = re.findall(r'\b\w+\b', text)